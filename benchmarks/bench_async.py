@@ -0,0 +1,144 @@
+"""
+Benchmark FTP backendů: vlákna (ftplib) vs. asyncio
+Nahraje stejnou sadu souborů přes K souběžných spojení - jednou jako K vláken,
+každé s vlastním FTPHandler, jednou jako AsyncFTPHandler.upload_many
+s K spojeními na jedné smyčce událostí. Měří čas, MB/s, špičku paměti
+alokované Pythonem (tracemalloc) a počet vláken procesu.
+
+Použití (z kořene repozitáře):
+    python -m benchmarks.bench_async
+    python -m benchmarks.bench_async --connections 1 4 16 --files 200 --latency 20
+"""
+
+import argparse
+import os
+import queue
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+from core.async_ftp import AsyncFTPHandler
+from core.ftp_handler import FTPHandler
+from benchmarks.ftp_server import LocalFTPServer
+
+
+def make_payloads(count: int, small: int, large: int, large_every: int) -> List[Tuple[bytes, str]]:
+    """Syntetické soubory: převážně malé (thumbnaily), každý large_every-tý velký"""
+    payloads = []
+    for i in range(count):
+        size = large if large_every and i % large_every == 0 else small
+        payloads.append((os.urandom(size), f"file_{i:05d}.bin"))
+    return payloads
+
+
+def upload_threaded(server: LocalFTPServer, payloads, connections: int) -> List[bool]:
+    """K vláken, každé s vlastním FTPHandler, bere soubory ze sdílené fronty"""
+    work = queue.Queue()
+    for item in payloads:
+        work.put(item)
+    results = []
+    
+    def worker():
+        handler = FTPHandler()
+        handler.connect('127.0.0.1', server.port, server.user, server.password)
+        while True:
+            try:
+                data, name = work.get_nowait()
+            except queue.Empty:
+                break
+            results.append(handler.upload_bytes(data, f"/threaded/{name}")[0])
+        handler.disconnect()
+    
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def upload_async(server: LocalFTPServer, payloads, connections: int) -> List[bool]:
+    """K spojení na jedné smyčce událostí"""
+    handler = AsyncFTPHandler()
+    handler.connect('127.0.0.1', server.port, server.user, server.password)
+    results = handler.upload_many([(data, f"/async/{name}") for data, name in payloads], connections)
+    handler.disconnect()
+    return [success for success, msg in results]
+
+
+def client_threads() -> int:
+    """Počet vláken procesu bez vláken lokálního serveru"""
+    return sum(1 for thread in threading.enumerate() if 'process_request' not in thread.name)
+
+
+def measure(func, server: LocalFTPServer, payloads, connections: int) -> Dict:
+    """Změří jeden běh (čas, propustnost, paměť, vlákna)"""
+    peak_threads = [client_threads()]
+    sampling = [True]
+    
+    def sample_threads():
+        while sampling[0]:
+            peak_threads[0] = max(peak_threads[0], client_threads())
+            time.sleep(0.005)
+    
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    base_threads = client_threads()
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = func(server, payloads, connections)
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    sampling[0] = False
+    sampler.join()
+    
+    total = sum(len(data) for data, name in payloads)
+    return {
+        'seconds': seconds,
+        'files_per_s': len(payloads) / seconds,
+        'mb_per_s': total / seconds / 1024 / 1024,
+        'peak_kib': peak / 1024,
+        'threads': peak_threads[0] - base_threads,
+        'ok': sum(results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FTP backendů (vlákna vs. asyncio)")
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--files', type=int, default=120, help="počet souborů")
+    parser.add_argument('--small', type=int, default=40, help="velikost malého souboru (KiB)")
+    parser.add_argument('--large', type=int, default=2048, help="velikost velkého souboru (KiB)")
+    parser.add_argument('--large-every', type=int, default=10, help="každý N-tý soubor je velký (0 = žádný)")
+    parser.add_argument('--latency', type=float, default=20.0, help="latence odpovědí serveru (ms)")
+    parser.add_argument('--bandwidth', type=float, default=0, help="limit přenosu na spojení (MB/s), 0 = bez limitu")
+    args = parser.parse_args()
+    
+    payloads = make_payloads(args.files, args.small * 1024, args.large * 1024, args.large_every)
+    total_mb = sum(len(data) for data, name in payloads) / 1024 / 1024
+    bandwidth = int(args.bandwidth * 1024 * 1024) if args.bandwidth else None
+    print(f"{len(payloads)} souborů, {total_mb:.1f} MB, latence {args.latency:.0f} ms, "
+          f"limit {args.bandwidth or '-'} MB/s\n")
+    
+    root = tempfile.mkdtemp(prefix="photo_uploader_bench_async_")
+    print(f"{'backend':<10}{'spojení':>9}{'čas s':>9}{'soub./s':>10}{'MB/s':>9}{'paměť KiB':>12}{'vláken':>8}{'ok':>6}")
+    with LocalFTPServer(root, latency=args.latency / 1000, bandwidth=bandwidth) as server:
+        for connections in args.connections:
+            for name, func in (('ftplib', upload_threaded), ('asyncio', upload_async)):
+                server.clear()
+                os.makedirs(os.path.join(root, 'threaded'))
+                os.makedirs(os.path.join(root, 'async'))
+                result = measure(func, server, payloads, connections)
+                print(f"{name:<10}{connections:>9}{result['seconds']:>9.2f}{result['files_per_s']:>10.1f}"
+                      f"{result['mb_per_s']:>9.1f}{result['peak_kib']:>12.0f}{result['threads']:>8}"
+                      f"{result['ok']:>6}")
+        server.clear()
+    os.rmdir(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark úsilí kodéru (fast / balanced / max)
+Pro každou variantu (thumbnail, compress) ukáže poměr času kódování a velikosti
+výstupu, včetně vlivu progresivního JPEG a podvzorkování barev.
+
+Použití (z kořene repozitáře):
+    python -m benchmarks.bench_effort
+    python -m benchmarks.bench_effort --photos /cesta/k/referencnim/fotkam --format webp
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from core.image_processor import ImageProcessor
+from benchmarks.corpus import generate_corpus, load_photo_set
+
+
+# (popis, úsilí, progressive, subsampling)
+CONFIGURATIONS = [
+    ("fast", 'fast', None, None),
+    ("balanced", 'balanced', None, None),
+    ("max", 'max', None, None),
+    ("balanced + progressive", 'balanced', True, None),
+    ("balanced 4:4:4", 'balanced', None, '4:4:4'),
+]
+
+
+def bench_variant(processor: ImageProcessor, paths, variant: str, output_format: str, repeat: int):
+    """Vrátí (celkový čas, celková velikost) pro danou variantu"""
+    elapsed = 0.0
+    total_bytes = 0
+    
+    for _ in range(repeat):
+        for path in paths:
+            start = time.perf_counter()
+            if variant == 'thumbnail':
+                success, data, msg = processor.create_thumbnail(path, output_format)
+            else:
+                success, data, msg = processor.compress_image(path, output_format)
+            elapsed += time.perf_counter() - start
+            if success:
+                total_bytes += len(data)
+    
+    return elapsed / repeat, total_bytes // repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark úsilí kodéru ImageProcessor")
+    parser.add_argument('--photos', help="složka s referenčními fotkami (jinak syntetické)")
+    parser.add_argument('--count', type=int, default=6, help="počet syntetických fotek")
+    parser.add_argument('--format', default='jpeg', choices=['jpeg', 'webp', 'avif', 'png'])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    if args.photos:
+        paths = load_photo_set(args.photos)
+    else:
+        corpus_dir = os.path.join(tempfile.gettempdir(), "photo_uploader_bench_corpus")
+        paths = generate_corpus(corpus_dir, count=args.count)
+    
+    print(f"{len(paths)} fotek, formát {args.format}, {args.repeat} opakování\n")
+    
+    processor = ImageProcessor()
+    # Zahřátí (načtení souborů do cache OS), aby první konfigurace nebyla znevýhodněna
+    bench_variant(processor, paths, 'thumbnail', args.format, 1)
+    
+    for variant in ('thumbnail', 'compress'):
+        print(f"{variant:<26}{'čas s':>10}{'ms/fotka':>10}{'kB':>10}{'vs fast':>10}")
+        baseline = None
+        for label, effort, progressive, subsampling in CONFIGURATIONS:
+            processor.set_encoder_effort(variant, effort, progressive, subsampling)
+            elapsed, total_bytes = bench_variant(processor, paths, variant, args.format, args.repeat)
+            if baseline is None:
+                baseline = total_bytes
+            print(f"{label:<26}{elapsed:>10.2f}{elapsed / len(paths) * 1000:>10.1f}"
+                  f"{total_bytes / 1024:>10.0f}{total_bytes / baseline:>9.1%}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
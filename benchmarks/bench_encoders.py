@@ -0,0 +1,75 @@
+"""
+Benchmark výstupních kodérů (JPEG / WebP / AVIF)
+Měří čas kódování a velikost výstupu thumbnailů i komprimovaných verzí.
+
+Použití (z kořene repozitáře):
+    python -m benchmarks.bench_encoders
+    python -m benchmarks.bench_encoders --photos /cesta/k/fotkam --formats jpeg webp
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from core.image_processor import ImageProcessor
+from benchmarks.corpus import generate_corpus, load_photo_set
+
+
+def bench_format(processor: ImageProcessor, paths, output_format: str, repeat: int):
+    """Vrátí (čas thumbnailů, bajty thumbnailů, čas komprese, bajty komprese)"""
+    thumb_time = comp_time = 0.0
+    thumb_bytes = comp_bytes = 0
+    
+    for _ in range(repeat):
+        for path in paths:
+            start = time.perf_counter()
+            success, data, msg = processor.create_thumbnail(path, output_format)
+            thumb_time += time.perf_counter() - start
+            if success:
+                thumb_bytes += len(data)
+            
+            start = time.perf_counter()
+            success, data, msg = processor.compress_image(path, output_format)
+            comp_time += time.perf_counter() - start
+            if success:
+                comp_bytes += len(data)
+    
+    return thumb_time / repeat, thumb_bytes // repeat, comp_time / repeat, comp_bytes // repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark výstupních formátů ImageProcessor")
+    parser.add_argument('--photos', help="složka s referenčními fotkami (jinak syntetické)")
+    parser.add_argument('--count', type=int, default=4, help="počet syntetických fotek")
+    parser.add_argument('--formats', nargs='+', default=['jpeg', 'webp', 'avif'])
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+    
+    if args.photos:
+        paths = load_photo_set(args.photos)
+    else:
+        corpus_dir = os.path.join(tempfile.gettempdir(), "photo_uploader_bench_corpus")
+        paths = generate_corpus(corpus_dir, count=args.count)
+    
+    source_bytes = sum(os.path.getsize(p) for p in paths)
+    print(f"{len(paths)} fotek, {source_bytes / 1e6:.1f} MB zdrojových dat\n")
+    print(f"{'formát':<8}{'thumb s':>10}{'thumb kB':>10}{'comp s':>10}{'comp kB':>10}{'vs JPEG':>10}")
+    
+    processor = ImageProcessor()
+    baseline = None
+    for output_format in args.formats:
+        if not processor.is_format_available(output_format):
+            print(f"{output_format:<8}není podporován touto instalací Pillow")
+            continue
+        
+        thumb_time, thumb_bytes, comp_time, comp_bytes = bench_format(
+            processor, paths, output_format, args.repeat)
+        if baseline is None:
+            baseline = comp_bytes + thumb_bytes
+        ratio = (comp_bytes + thumb_bytes) / baseline if baseline else 0
+        print(f"{output_format:<8}{thumb_time:>10.2f}{thumb_bytes / 1024:>10.0f}"
+              f"{comp_time:>10.2f}{comp_bytes / 1024:>10.0f}{ratio:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
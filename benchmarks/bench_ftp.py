@@ -0,0 +1,209 @@
+"""
+End-to-end benchmark nahrávání proti lokálnímu FTP serveru
+Spustí LocalFTPServer s umělou latencí a omezením rychlosti, vygeneruje
+syntetický korpus fotek (různé velikosti, JPEG i PNG) a změří scénáře
+nahrání (thumbnail + compress + original, stejně jako záložka Nahrát),
+výpisu složek, generování index.php a mazání. Výsledky (fotky/s, MB/s)
+lze uložit do JSON označeného commitem a porovnat s jiným během.
+
+Použití (z kořene repozitáře):
+    python -m benchmarks.bench_ftp
+    python -m benchmarks.bench_ftp --latency 30 --bandwidth 4 --output results/base.json
+    python -m benchmarks.bench_ftp --compare results/base.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+from typing import Dict, List
+from core.ftp_handler import FTPHandler
+from core.image_processor import ImageProcessor
+from core.index_builder import build_index_php
+from benchmarks.corpus import generate_corpus, load_photo_set
+from benchmarks.ftp_server import LocalFTPServer
+
+
+GALLERY = "/bench_gallery"
+
+
+def git_commit() -> str:
+    """Zkrácený hash aktuálního commitu (pro porovnání výsledků)"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def scenario_upload(handler: FTPHandler, processor: ImageProcessor, paths: List[str]):
+    """Nahraje fotky se všemi variantami. Returns: (bajty, filenames, variants)"""
+    handler.create_directory(GALLERY)
+    handler.change_directory(GALLERY)
+    for folder in ('thumbnail', 'original', 'compress'):
+        handler.create_directory(folder)
+    
+    total_bytes = 0
+    filenames = []
+    variants = {}
+    for path in paths:
+        filename = os.path.basename(path)
+        photo_variants = {'thumbnail': {}, 'compress': {}}
+        for output_format in processor.get_output_formats(path):
+            success, data, msg = processor.create_thumbnail(path, output_format)
+            if success:
+                name = processor.output_filename(filename, output_format)
+                handler.upload_bytes(data, f"thumbnail/{name}")
+                photo_variants['thumbnail'][output_format] = name
+                total_bytes += len(data)
+            
+            success, data, output_format, msg = processor.compress_variant(path, output_format)
+            if success:
+                name = processor.output_filename(filename, output_format)
+                handler.upload_bytes(data, f"compress/{name}")
+                photo_variants['compress'][output_format] = name
+                total_bytes += len(data)
+        
+        handler.upload_file(path, f"original/{filename}")
+        total_bytes += os.path.getsize(path)
+        filenames.append(filename)
+        variants[filename] = photo_variants
+    
+    return total_bytes, filenames, variants
+
+
+def scenario_listing(handler: FTPHandler, repeat: int) -> int:
+    """Opakovaně vypíše strukturu galerie. Returns: počet položek"""
+    entries = 0
+    for _ in range(repeat):
+        handler.has_photo_structure(GALLERY)
+        for folder in ('thumbnail', 'original', 'compress'):
+            entries += len(handler.list_directory(f"{GALLERY}/{folder}"))
+    handler.change_directory(GALLERY)
+    return entries
+
+
+def scenario_index(handler: FTPHandler, filenames: List[str], variants: Dict) -> int:
+    """Vygeneruje a nahraje index.php. Returns: velikost v bajtech"""
+    php_bytes = build_index_php(filenames, variants).encode('utf-8')
+    handler.upload_bytes(php_bytes, f"{GALLERY}/index.php")
+    return len(php_bytes)
+
+
+def scenario_delete(handler: FTPHandler, filenames: List[str], variants: Dict) -> int:
+    """Smaže všechny varianty fotek. Returns: počet smazaných souborů"""
+    deleted = 0
+    for filename in filenames:
+        for folder in ('thumbnail', 'compress'):
+            for name in variants[filename][folder].values():
+                deleted += handler.delete_file(f"{GALLERY}/{folder}/{name}")[0]
+        deleted += handler.delete_file(f"{GALLERY}/original/{filename}")[0]
+    return deleted
+
+
+def run(paths: List[str], latency: float, bandwidth, listing_repeat: int) -> Dict[str, Dict]:
+    """Spustí všechny scénáře proti čerstvému serveru"""
+    root = tempfile.mkdtemp(prefix="photo_uploader_bench_ftp_")
+    results = {}
+    
+    with LocalFTPServer(root, latency=latency, bandwidth=bandwidth) as server:
+        handler = FTPHandler()
+        success, msg = handler.connect('127.0.0.1', server.port, server.user, server.password)
+        if not success:
+            raise RuntimeError(msg)
+        processor = ImageProcessor()
+        photos = len(paths)
+        
+        def measure(name, func, *args, photos=photos, size=None):
+            start = time.perf_counter()
+            value = func(*args)
+            seconds = time.perf_counter() - start
+            transferred = size(value) if size else 0
+            results[name] = {
+                'seconds': round(seconds, 4),
+                'photos': photos,
+                'photos_per_s': round(photos / seconds, 3),
+                'bytes': transferred,
+                'mb_per_s': round(transferred / seconds / 1024 / 1024, 3),
+            }
+            return value
+        
+        uploaded_bytes, filenames, variants = measure(
+            'upload', scenario_upload, handler, processor, paths, size=lambda value: value[0])
+        measure('listing', scenario_listing, handler, listing_repeat, photos=photos * listing_repeat)
+        measure('index', scenario_index, handler, filenames, variants, size=lambda value: value)
+        measure('delete', scenario_delete, handler, filenames, variants)
+        
+        handler.disconnect()
+        server.clear()
+    
+    os.rmdir(root)
+    return results
+
+
+def print_results(results: Dict[str, Dict], baseline: Dict[str, Dict] = None):
+    """Vypíše tabulku výsledků (případně s poměrem vůči baseline)"""
+    header = f"{'scénář':<10}{'čas s':>10}{'fotek/s':>10}{'MB/s':>10}"
+    if baseline:
+        header += f"{'vs baseline':>14}"
+    print(header)
+    for name, result in results.items():
+        line = (f"{name:<10}{result['seconds']:>10.2f}{result['photos_per_s']:>10.2f}"
+                f"{result['mb_per_s']:>10.2f}")
+        if baseline and name in baseline:
+            speedup = baseline[name]['seconds'] / result['seconds'] if result['seconds'] else 0
+            line += f"{speedup:>13.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end FTP benchmark s lokálním serverem")
+    parser.add_argument('--photos', help="složka s referenčními fotkami (jinak syntetické)")
+    parser.add_argument('--count', type=int, default=12, help="počet syntetických fotek")
+    parser.add_argument('--latency', type=float, default=10.0, help="latence odpovědí serveru (ms)")
+    parser.add_argument('--bandwidth', type=float, default=0, help="limit přenosu (MB/s), 0 = bez limitu")
+    parser.add_argument('--listing-repeat', type=int, default=5)
+    parser.add_argument('--output', help="uložit výsledky do JSON")
+    parser.add_argument('--compare', help="porovnat s dříve uloženým JSON")
+    args = parser.parse_args()
+    
+    if args.photos:
+        paths = load_photo_set(args.photos)
+    else:
+        corpus_dir = os.path.join(tempfile.gettempdir(), "photo_uploader_bench_corpus_mixed")
+        paths = generate_corpus(corpus_dir, sizes=[(4000, 3000), (1920, 1280), (1200, 1600), (800, 600)],
+                                formats=('jpg', 'jpg', 'png'), count=args.count)
+    
+    bandwidth = int(args.bandwidth * 1024 * 1024) if args.bandwidth else None
+    print(f"{len(paths)} fotek, latence {args.latency:.0f} ms, "
+          f"limit {args.bandwidth or '-'} MB/s, commit {git_commit()}\n")
+    
+    results = run(paths, args.latency / 1000, bandwidth, args.listing_repeat)
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compared = json.load(f)
+        baseline = compared['scenarios']
+        print(f"Baseline: commit {compared.get('commit')}\n")
+    print_results(results, baseline)
+    
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        report = {
+            'commit': git_commit(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'photos': len(paths),
+            'latency_ms': args.latency,
+            'bandwidth_mb_s': args.bandwidth,
+            'scenarios': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"\nVýsledky uloženy do {args.output}")
+
+
+if __name__ == "__main__":
+    main()
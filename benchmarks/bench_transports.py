@@ -0,0 +1,128 @@
+"""
+Benchmark režie na soubor pro jednotlivé transporty
+Nahraje sadu malých souborů (thumbnaily) a několik velkých (originály) přes
+FTP, FTPS bez obnovy TLS session, FTPS s obnovou session a SFTP
+(pipelinované i nepipelinované zápisy). Měří čas připojení, režii na malý
+soubor (ms) a propustnost velkých souborů (MB/s). FTPS používá lokální
+FTP server se self-signed certifikátem (vyžaduje příkaz openssl), SFTP
+lokální server nad paramiko (vyžaduje balíček paramiko).
+
+Použití (z kořene repozitáře):
+    python -m benchmarks.bench_transports
+    python -m benchmarks.bench_transports --small-count 200 --latency 5
+"""
+
+import argparse
+import ftplib
+import os
+import ssl
+import tempfile
+import time
+from typing import Dict, List
+from core.ftp_handler import FTPHandler, FTPSHandler
+from core.sftp_handler import SFTPHandler, paramiko
+from benchmarks.ftp_server import LocalFTPServer, make_self_signed_cert
+
+
+class _NoReuseFTPSHandler(FTPSHandler):
+    """FTPS bez obnovy TLS session - každé datové spojení dělá plný handshake"""
+    
+    def _create_ftp(self) -> ftplib.FTP:
+        ftp = super()._create_ftp()
+        ftp.reuse_session = False
+        return ftp
+
+
+def unverified_context() -> ssl.SSLContext:
+    """Klientský kontext pro self-signed certifikát lokálního serveru"""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def run_transport(handler, server, small: List[bytes], large: List[bytes]) -> Dict:
+    """Připojí se a nahraje malé a velké soubory. Returns: výsledky měření"""
+    start = time.perf_counter()
+    success, msg = handler.connect('127.0.0.1', server.port, server.user, server.password)
+    if not success:
+        raise RuntimeError(msg)
+    connect_seconds = time.perf_counter() - start
+    handler.create_directory('/bench')
+    
+    start = time.perf_counter()
+    for i, data in enumerate(small):
+        handler.upload_bytes(data, f"/bench/small_{i:05d}.bin")
+    small_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for i, data in enumerate(large):
+        handler.upload_bytes(data, f"/bench/large_{i:03d}.bin")
+    large_seconds = time.perf_counter() - start
+    
+    handler.disconnect()
+    return {
+        'connect_ms': connect_seconds * 1000,
+        'per_file_ms': small_seconds * 1000 / len(small),
+        'large_mb_s': sum(len(data) for data in large) / large_seconds / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Režie na soubor: FTP vs. FTPS vs. SFTP")
+    parser.add_argument('--small-count', type=int, default=100, help="počet malých souborů")
+    parser.add_argument('--small-size', type=int, default=30, help="velikost malého souboru (KiB)")
+    parser.add_argument('--large-count', type=int, default=4, help="počet velkých souborů")
+    parser.add_argument('--large-size', type=int, default=8, help="velikost velkého souboru (MiB)")
+    parser.add_argument('--latency', type=float, default=0.0, help="latence odpovědí serveru (ms)")
+    args = parser.parse_args()
+    
+    small = [os.urandom(args.small_size * 1024) for _ in range(args.small_count)]
+    large = [os.urandom(args.large_size * 1024 * 1024) for _ in range(args.large_count)]
+    print(f"{len(small)} x {args.small_size} KiB + {len(large)} x {args.large_size} MiB, "
+          f"latence {args.latency:.0f} ms\n")
+    print(f"{'transport':<22}{'připojení ms':>14}{'ms/soubor':>12}{'velké MB/s':>12}{'TLS obnov.':>12}")
+    
+    def report(name, result, resumed='-'):
+        print(f"{name:<22}{result['connect_ms']:>14.1f}{result['per_file_ms']:>12.2f}"
+              f"{result['large_mb_s']:>12.1f}{resumed:>12}")
+    
+    root = tempfile.mkdtemp(prefix="photo_uploader_bench_transports_")
+    certdir = tempfile.mkdtemp(prefix="photo_uploader_bench_cert_")
+    try:
+        tls = make_self_signed_cert(certdir)
+    except (OSError, Exception) as e:
+        tls = None
+        print(f"(FTPS přeskočeno - nelze vytvořit certifikát: {e})")
+    
+    with LocalFTPServer(root, latency=args.latency / 1000, tls=tls) as server:
+        report('ftp', run_transport(FTPHandler(), server, small, large))
+        if tls:
+            for name, handler_class in (('ftps (bez obnovy)', _NoReuseFTPSHandler),
+                                        ('ftps (obnova session)', FTPSHandler)):
+                server.clear()
+                before = server.stats
+                result = run_transport(handler_class(ssl_context=unverified_context()), server, small, large)
+                after = server.stats
+                resumed = after['tls_data_resumed'] - before['tls_data_resumed']
+                total = after['tls_data'] - before['tls_data']
+                report(name, result, f"{resumed}/{total}")
+    
+    if paramiko is None:
+        print("(SFTP přeskočeno - není nainstalován paramiko)")
+    else:
+        from benchmarks.sftp_server import LocalSFTPServer
+        server.clear()
+        with LocalSFTPServer(root, latency=args.latency / 1000) as sftp_server:
+            for name, pipelined in (('sftp (bez pipeline)', False), ('sftp (pipeline)', True)):
+                sftp_server.clear()
+                handler = SFTPHandler(known_hosts_file=os.path.join(certdir, "known_hosts"))
+                handler.pipelined = pipelined
+                report(name, run_transport(handler, sftp_server, small, large))
+    
+    server.clear()
+    os.rmdir(root)
+
+
+if __name__ == "__main__":
+    main()
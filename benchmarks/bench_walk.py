@@ -0,0 +1,102 @@
+"""
+Benchmark inventury vzdáleného webu (RemoteWalker)
+Vytvoří na lokálním FTP serveru web s N galeriemi (thumbnail/original/compress,
+několik malých souborů v každé) a změří, za jak dlouho RemoteWalker najde
+všechny galerie při různém počtu spojení. Pro srovnání projde web i jedno
+spojení postaru (has_photo_structure + list_directory každé složky zvlášť).
+
+Použití (z kořene repozitáře):
+    python -m benchmarks.bench_walk
+    python -m benchmarks.bench_walk --galleries 300 --connections 1 4 8 16 --latency 20
+"""
+
+import argparse
+import os
+import posixpath
+import shutil
+import tempfile
+import time
+from core.ftp_handler import create_ftp_handler
+from core.remote_walk import RemoteWalker, VARIANT_FOLDERS
+from benchmarks.bench_transports import unverified_context
+from benchmarks.ftp_server import LocalFTPServer, make_self_signed_cert
+
+
+def make_site(root: str, galleries: int, photos: int, per_year: int = 50):
+    """Web ve tvaru /RRRR/galerie_NNN/{thumbnail,original,compress}/foto.jpg"""
+    for i in range(galleries):
+        gallery = os.path.join(root, f"{2000 + i // per_year}", f"galerie_{i:04d}")
+        for folder in VARIANT_FOLDERS:
+            os.makedirs(os.path.join(gallery, folder))
+            for j in range(photos):
+                with open(os.path.join(gallery, folder, f"foto_{j:03d}.jpg"), 'wb') as f:
+                    f.write(b'\xff' * (1000 + j))
+        with open(os.path.join(gallery, 'index.php'), 'wb') as f:
+            f.write(b'<?php ?>')
+
+
+def walk_sequential(handler, root: str = '/') -> int:
+    """Průchod jedním spojením složku po složce (původní způsob). Returns: počet galerií"""
+    found = 0
+    pending = [root]
+    while pending:
+        path = pending.pop(0)
+        has_structure, folders = handler.has_photo_structure(path)
+        if has_structure:
+            found += 1
+            for folder in VARIANT_FOLDERS:
+                handler.list_directory(posixpath.join(path, folder))
+        items = handler.list_directory(path)
+        pending.extend(posixpath.join(path, entry.name) for entry in items.dirs()
+                       if not has_structure or entry.name.lower() not in VARIANT_FOLDERS)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inventury vzdáleného webu")
+    parser.add_argument('--galleries', type=int, default=200, help="počet galerií")
+    parser.add_argument('--photos', type=int, default=5, help="fotek v galerii")
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--latency', type=float, default=20.0, help="latence odpovědí serveru (ms)")
+    parser.add_argument('--backend', default='ftplib', choices=['ftplib', 'asyncio', 'ftps'])
+    parser.add_argument('--skip-sequential', action='store_true', help="vynechat průchod jedním spojením")
+    args = parser.parse_args()
+    
+    root = tempfile.mkdtemp(prefix="photo_uploader_bench_walk_")
+    make_site(root, args.galleries, args.photos)
+    print(f"{args.galleries} galerií po {args.photos} fotkách, latence {args.latency:.0f} ms, "
+          f"backend {args.backend}\n")
+    
+    tls = None
+    if args.backend == 'ftps':
+        tls = make_self_signed_cert(tempfile.mkdtemp(prefix="photo_uploader_bench_cert_"))
+    
+    print(f"{'způsob':<14}{'spojení':>9}{'čas s':>9}{'složek':>9}{'složek/s':>10}{'galerií':>9}{'MB':>8}")
+    with LocalFTPServer(root, latency=args.latency / 1000, tls=tls) as server:
+        handler = create_ftp_handler(args.backend)
+        if tls:
+            handler.ssl_context = unverified_context()
+        success, msg = handler.connect('127.0.0.1', server.port, server.user, server.password)
+        if not success:
+            raise RuntimeError(msg)
+        
+        if not args.skip_sequential:
+            start = time.perf_counter()
+            found = walk_sequential(handler)
+            seconds = time.perf_counter() - start
+            print(f"{'sekvenčně':<14}{1:>9}{seconds:>9.2f}{'-':>9}{'-':>10}{found:>9}{'-':>8}")
+        
+        for connections in args.connections:
+            walker = RemoteWalker(handler, connections)
+            galleries = walker.walk('/')
+            stats = walker.stats
+            total_mb = sum(gallery['bytes'] for gallery in galleries) / 1024 / 1024
+            print(f"{'RemoteWalker':<14}{stats['connections']:>9}{stats['seconds']:>9.2f}"
+                  f"{stats['directories']:>9}{stats['directories'] / stats['seconds']:>10.1f}"
+                  f"{len(galleries):>9}{total_mb:>8.1f}")
+        handler.disconnect()
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Syntetické fotky pro benchmarky
+Obrázky kombinují přechody, tvary a šum, aby se kodéry chovaly podobně
+jako u skutečných fotografií (čistě jednobarevné plochy by výsledky zkreslily).
+"""
+
+import os
+import random
+from typing import List, Tuple
+from PIL import Image, ImageDraw, ImageFilter
+
+
+def make_photo(width: int, height: int, seed: int = 0, noise: float = 12.0) -> Image.Image:
+    """Vytvoří syntetickou "fotku" zadané velikosti"""
+    rng = random.Random(seed)
+    
+    # Barevný přechod jako pozadí (obloha, stěna...)
+    top = tuple(rng.randint(40, 220) for _ in range(3))
+    bottom = tuple(rng.randint(20, 200) for _ in range(3))
+    gradient = Image.linear_gradient('L').resize((width, height))
+    img = Image.composite(Image.new('RGB', (width, height), top),
+                          Image.new('RGB', (width, height), bottom), gradient)
+    
+    # Tvary s ostrými hranami
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x0, y0 = rng.randint(0, width), rng.randint(0, height)
+        x1, y1 = x0 + rng.randint(width // 20, width // 3), y0 + rng.randint(height // 20, height // 3)
+        color = tuple(rng.randint(0, 255) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+        else:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+    img = img.filter(ImageFilter.GaussianBlur(radius=max(1, width // 800)))
+    
+    # Šum senzoru
+    if noise > 0:
+        grain = Image.effect_noise((width, height), noise).convert('RGB')
+        img = Image.blend(img, grain, 0.08)
+    
+    return img
+
+
+def generate_corpus(target_dir: str, sizes: List[Tuple[int, int]] = None,
+                    formats: Tuple[str, ...] = ('jpg',), count: int = 4) -> List[str]:
+    """
+    Vygeneruje sadu fotek do složky (již existující soubory přeskočí)
+    Returns: seznam cest k vytvořeným souborům
+    """
+    sizes = sizes or [(4000, 3000), (1920, 1280), (1200, 1600)]
+    os.makedirs(target_dir, exist_ok=True)
+    paths = []
+    
+    for i in range(count):
+        width, height = sizes[i % len(sizes)]
+        ext = formats[i % len(formats)]
+        path = os.path.join(target_dir, f"photo_{i:04d}_{width}x{height}.{ext}")
+        paths.append(path)
+        if os.path.exists(path):
+            continue
+        
+        img = make_photo(width, height, seed=i, noise=6.0 + (i % 4) * 8)
+        if ext == 'png':
+            img.save(path, format='PNG')
+        else:
+            img.save(path, format='JPEG', quality=92)
+    
+    return paths
+
+
+def load_photo_set(folder: str) -> List[str]:
+    """Vrátí seznam obrázků v referenční složce"""
+    from core.image_processor import ImageProcessor
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                  if ImageProcessor.is_image(name))
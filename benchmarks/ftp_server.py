@@ -0,0 +1,440 @@
+"""
+Lokální FTP server pro benchmarky
+Minimální vícevláknový FTP server nad dočasnou složkou s umělou latencí
+(zpoždění každé odpovědi řídicího spojení) a omezením rychlosti datových
+přenosů. Podporuje příkazy, které používá FTPHandler (PASV/EPSV, LIST, MLSD,
+MLST, STOR, RETR, MKD, RMD, DELE, RNFR/RNTO, ...) a s tls=(cert, klíč) i explicitní
+FTPS (AUTH TLS, PBSZ, PROT P) včetně počítání obnovených TLS session.
+
+Použití:
+    with LocalFTPServer(root, latency=0.02, bandwidth=2 * 1024 * 1024) as server:
+        handler.connect('127.0.0.1', server.port, server.user, server.password)
+"""
+
+import os
+import posixpath
+import shutil
+import socket
+import socketserver
+import ssl
+import subprocess
+import threading
+import time
+from typing import Optional, Tuple
+
+
+class _Throttle:
+    """Omezení rychlosti přenosu (bajty/s) pro jedno datové spojení"""
+    
+    def __init__(self, bandwidth: Optional[int]):
+        self.bandwidth = bandwidth
+        self.start = time.perf_counter()
+        self.transferred = 0
+    
+    def consume(self, size: int):
+        """Počká, aby přenos nepřekročil nastavenou rychlost"""
+        if not self.bandwidth:
+            return
+        self.transferred += size
+        delay = self.transferred / self.bandwidth - (time.perf_counter() - self.start)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _FTPSession(socketserver.StreamRequestHandler):
+    """Jedno řídicí spojení FTP"""
+    
+    CHUNK_SIZE = 64 * 1024
+    
+    def setup(self):
+        # Odpovědi jsou krátké zápisy - bez Nagle, jinak každý příkaz čeká na zpožděný ACK
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().setup()
+        self.config = self.server.config
+        self.cwd = '/'
+        self.logged_in = False
+        self.username = None
+        self.data_listener = None
+        self.rename_from = None
+        self.protected = False  # PROT P - šifrovaná datová spojení
+    
+    def reply(self, text: str):
+        """Odešle odpověď (s umělou latencí)"""
+        if self.config['latency']:
+            time.sleep(self.config['latency'])
+        self.wfile.write((text + "\r\n").encode('utf-8'))
+    
+    def handle(self):
+        self.reply("220 Local benchmark FTP server")
+        # rfile se po AUTH TLS vymění, proto readline místo iterace
+        for raw in iter(lambda: self.rfile.readline(), b''):
+            line = raw.decode('utf-8', 'replace').rstrip("\r\n")
+            command, _, argument = line.partition(' ')
+            command = command.upper()
+            
+            if not self.logged_in and command not in ('USER', 'PASS', 'QUIT', 'FEAT', 'SYST', 'OPTS', 'AUTH'):
+                self.reply("530 Please login with USER and PASS")
+                continue
+            
+            method = getattr(self, f"ftp_{command}", None)
+            self.server.count_command(command)
+            if method is None:
+                self.reply(f"502 Command {command} not implemented")
+                continue
+            try:
+                if method(argument) is False:
+                    break
+            except (FileNotFoundError, NotADirectoryError, IsADirectoryError, PermissionError) as e:
+                self.reply(f"550 {e.strerror or e}")
+            except OSError as e:
+                self.reply(f"451 {e}")
+        self._close_listener()
+    
+    # --- Cesty ---
+    
+    def _virtual(self, argument: str) -> str:
+        """Virtuální absolutní cesta"""
+        path = posixpath.normpath(posixpath.join(self.cwd, argument or '.'))
+        return '/' + path.lstrip('/') if path != '/' else '/'
+    
+    def _real(self, argument: str) -> str:
+        """Skutečná cesta uvnitř kořenové složky serveru"""
+        virtual = self._virtual(argument)
+        return os.path.join(self.config['root'], *[part for part in virtual.split('/') if part])
+    
+    # --- Datové spojení ---
+    
+    def _close_listener(self):
+        if self.data_listener is not None:
+            self.data_listener.close()
+            self.data_listener = None
+    
+    def _open_listener(self) -> int:
+        self._close_listener()
+        self.data_listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.data_listener.bind(('127.0.0.1', 0))
+        self.data_listener.listen(1)
+        self.data_listener.settimeout(10)
+        return self.data_listener.getsockname()[1]
+    
+    def _accept_data(self) -> Optional[socket.socket]:
+        if self.data_listener is None:
+            self.reply("425 Use PASV or EPSV first")
+            return None
+        self.reply("150 Opening data connection")
+        connection, _ = self.data_listener.accept()
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._close_listener()
+        if self.protected:
+            connection = self.server.tls_context.wrap_socket(connection, server_side=True)
+            self.server.count('tls_data', connection.session_reused)
+        return connection
+    
+    def _finish_data(self, connection: socket.socket):
+        """Ukončí TLS na datovém spojení (klient čeká na close_notify)"""
+        if isinstance(connection, ssl.SSLSocket):
+            try:
+                connection.unwrap()
+            except (ssl.SSLError, OSError):
+                pass
+    
+    def _send_data(self, data_source):
+        """Odešle data (iterátor bloků bajtů) datovým spojením"""
+        connection = self._accept_data()
+        if connection is None:
+            return
+        throttle = _Throttle(self.config['bandwidth'])
+        with connection:
+            for block in data_source:
+                throttle.consume(len(block))
+                connection.sendall(block)
+            self._finish_data(connection)
+        self.reply("226 Transfer complete")
+    
+    def _read_file(self, path: str):
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(self.CHUNK_SIZE)
+                if not block:
+                    break
+                yield block
+    
+    # --- Příkazy ---
+    
+    def ftp_USER(self, argument):
+        self.username = argument
+        self.reply("331 Password required")
+    
+    def ftp_PASS(self, argument):
+        if self.username == self.config['user'] and argument == self.config['password']:
+            self.logged_in = True
+            self.reply("230 Login successful")
+        else:
+            self.reply("530 Login incorrect")
+    
+    def ftp_QUIT(self, argument):
+        self.reply("221 Goodbye")
+        return False
+    
+    def ftp_SYST(self, argument):
+        self.reply("215 UNIX Type: L8")
+    
+    def ftp_FEAT(self, argument):
+        self.wfile.write(b"211-Features:\r\n MLSD\r\n MLST type*;size*;modify*;\r\n SIZE\r\n MDTM\r\n UTF8\r\n EPSV\r\n")
+        if self.server.tls_context:
+            self.wfile.write(b" AUTH TLS\r\n PBSZ\r\n PROT\r\n")
+        self.reply("211 End")
+    
+    def ftp_AUTH(self, argument):
+        if not self.server.tls_context or argument.upper() not in ('TLS', 'SSL'):
+            self.reply("504 AUTH not supported")
+            return
+        self.reply("234 AUTH TLS successful")
+        self.connection = self.server.tls_context.wrap_socket(self.connection, server_side=True)
+        self.rfile = self.connection.makefile('rb', self.rbufsize)
+        self.wfile = socketserver._SocketWriter(self.connection)
+    
+    def ftp_PBSZ(self, argument):
+        self.reply("200 PBSZ=0")
+    
+    def ftp_PROT(self, argument):
+        if not isinstance(self.connection, ssl.SSLSocket):
+            self.reply("503 Use AUTH TLS first")
+            return
+        self.protected = argument.upper() == 'P'
+        self.reply(f"200 Protection level set to {argument.upper()}")
+    
+    def ftp_OPTS(self, argument):
+        self.reply("200 OK")
+    
+    def ftp_NOOP(self, argument):
+        self.reply("200 OK")
+    
+    def ftp_TYPE(self, argument):
+        self.reply(f"200 Type set to {argument}")
+    
+    def ftp_PWD(self, argument):
+        self.reply(f'257 "{self.cwd}" is the current directory')
+    
+    ftp_XPWD = ftp_PWD
+    
+    def ftp_CWD(self, argument):
+        if os.path.isdir(self._real(argument)):
+            self.cwd = self._virtual(argument)
+            self.reply("250 Directory changed")
+        else:
+            self.reply("550 No such directory")
+    
+    def ftp_CDUP(self, argument):
+        self.ftp_CWD('..')
+    
+    def ftp_MKD(self, argument):
+        os.mkdir(self._real(argument))
+        self.reply(f'257 "{self._virtual(argument)}" created')
+    
+    def ftp_RMD(self, argument):
+        os.rmdir(self._real(argument))
+        self.reply("250 Directory removed")
+    
+    def ftp_DELE(self, argument):
+        os.remove(self._real(argument))
+        self.reply("250 File deleted")
+    
+    def ftp_SIZE(self, argument):
+        self.reply(f"213 {os.path.getsize(self._real(argument))}")
+    
+    def ftp_MDTM(self, argument):
+        modified = time.gmtime(os.path.getmtime(self._real(argument)))
+        self.reply(f"213 {time.strftime('%Y%m%d%H%M%S', modified)}")
+    
+    def ftp_RNFR(self, argument):
+        path = self._real(argument)
+        if not os.path.exists(path):
+            self.reply("550 No such file")
+            return
+        self.rename_from = path
+        self.reply("350 Ready for RNTO")
+    
+    def ftp_RNTO(self, argument):
+        if self.rename_from is None:
+            self.reply("503 RNFR required first")
+            return
+        os.replace(self.rename_from, self._real(argument))
+        self.rename_from = None
+        self.reply("250 Rename successful")
+    
+    def ftp_PASV(self, argument):
+        port = self._open_listener()
+        self.reply(f"227 Entering Passive Mode (127,0,0,1,{port >> 8},{port & 0xFF})")
+    
+    def ftp_EPSV(self, argument):
+        port = self._open_listener()
+        self.reply(f"229 Entering Extended Passive Mode (|||{port}|)")
+    
+    def _entries(self, argument: str):
+        path = self._real(argument if argument and not argument.startswith('-') else '')
+        with os.scandir(path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                yield entry, entry.stat()
+    
+    def ftp_LIST(self, argument):
+        lines = []
+        for entry, info in self._entries(argument):
+            kind = 'drwxr-xr-x' if entry.is_dir() else '-rw-r--r--'
+            modified = time.strftime('%b %d %H:%M', time.localtime(info.st_mtime))
+            lines.append(f"{kind} 1 owner group {info.st_size:>12} {modified} {entry.name}\r\n")
+        self._send_data([''.join(lines).encode('utf-8')])
+    
+    def ftp_NLST(self, argument):
+        names = ''.join(f"{entry.name}\r\n" for entry, info in self._entries(argument))
+        self._send_data([names.encode('utf-8')])
+    
+    def ftp_MLSD(self, argument):
+        lines = []
+        for entry, info in self._entries(argument):
+            kind = 'dir' if entry.is_dir() else 'file'
+            modified = time.strftime('%Y%m%d%H%M%S', time.gmtime(info.st_mtime))
+            lines.append(f"type={kind};size={info.st_size};modify={modified}; {entry.name}\r\n")
+        self._send_data([''.join(lines).encode('utf-8')])
+    
+    def ftp_MLST(self, argument):
+        path = self._real(argument)
+        info = os.stat(path)
+        kind = 'dir' if os.path.isdir(path) else 'file'
+        modified = time.strftime('%Y%m%d%H%M%S', time.gmtime(info.st_mtime))
+        self.reply(f"250-Listing {self._virtual(argument)}\r\n"
+                   f" type={kind};size={info.st_size};modify={modified}; {self._virtual(argument)}\r\n"
+                   f"250 End")
+    
+    def ftp_RETR(self, argument):
+        path = self._real(argument)
+        if not os.path.isfile(path):
+            self.reply("550 No such file")
+            return
+        self._send_data(self._read_file(path))
+    
+    def ftp_STOR(self, argument):
+        path = self._real(argument)
+        if not os.path.isdir(os.path.dirname(path)):
+            self.reply("553 No such directory")
+            return
+        connection = self._accept_data()
+        if connection is None:
+            return
+        throttle = _Throttle(self.config['bandwidth'])
+        with connection, open(path, 'wb') as f:
+            while True:
+                block = connection.recv(self.CHUNK_SIZE)
+                if not block:
+                    break
+                throttle.consume(len(block))
+                f.write(block)
+            self._finish_data(connection)
+        self.reply("226 Transfer complete")
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128  # Mnoho souběžných spojení (výchozích 5 vede k opakování SYN)
+    
+    tls_context = None
+    
+    def count(self, name: str, resumed: bool):
+        """Počítadlo TLS handshaků datových spojení (celkem / obnovených)"""
+        with self.stats_lock:
+            self.stats[name] += 1
+            self.stats[f"{name}_resumed"] += resumed
+    
+    def count_command(self, command: str):
+        """Počítadlo příkazů řídicího spojení (= počet round tripů)"""
+        with self.stats_lock:
+            self.commands[command] = self.commands.get(command, 0) + 1
+
+
+def make_self_signed_cert(directory: str) -> Tuple[str, str]:
+    """
+    Vygeneruje self-signed certifikát pro localhost (přes příkaz openssl)
+    Returns: (certfile, keyfile)
+    """
+    certfile = os.path.join(directory, "localhost.pem")
+    keyfile = os.path.join(directory, "localhost.key")
+    if not (os.path.exists(certfile) and os.path.exists(keyfile)):
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+                        '-keyout', keyfile, '-out', certfile, '-days', '2', '-subj', '/CN=localhost'],
+                       check=True, capture_output=True)
+    return certfile, keyfile
+
+
+class LocalFTPServer:
+    """Lokální FTP server běžící ve vlákně"""
+    
+    def __init__(self, root: str, latency: float = 0.0, bandwidth: Optional[int] = None,
+                 user: str = 'bench', password: str = 'bench', tls: Optional[Tuple[str, str]] = None):
+        """
+        Args:
+            root: kořenová složka serveru (vytvoří se, pokud neexistuje)
+            latency: zpoždění každé odpovědi řídicího spojení (s)
+            bandwidth: limit rychlosti datového spojení (bajty/s), None = bez limitu
+            tls: (certfile, keyfile) pro FTPS, None = jen nešifrované FTP
+        """
+        self.root = root
+        self.user = user
+        self.password = password
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.tls = tls
+        self.server = None
+        self.thread = None
+        self.port = None
+    
+    def start(self):
+        """Spustí server na náhodném volném portu"""
+        os.makedirs(self.root, exist_ok=True)
+        self.server = _ThreadingServer(('127.0.0.1', 0), _FTPSession)
+        self.server.config = {
+            'root': self.root,
+            'user': self.user,
+            'password': self.password,
+            'latency': self.latency,
+            'bandwidth': self.bandwidth,
+        }
+        self.server.stats = {'tls_data': 0, 'tls_data_resumed': 0}
+        self.server.stats_lock = threading.Lock()
+        self.server.commands = {}
+        if self.tls:
+            self.server.tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.server.tls_context.load_cert_chain(*self.tls)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        """Zastaví server"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+    
+    @property
+    def stats(self) -> dict:
+        """Počet šifrovaných datových spojení a kolik z nich obnovilo TLS session"""
+        return dict(self.server.stats) if self.server else {}
+    
+    @property
+    def commands(self) -> dict:
+        """Počet přijatých příkazů řídicího spojení podle názvu"""
+        return dict(self.server.commands) if self.server else {}
+    
+    def clear(self):
+        """Smaže obsah kořenové složky"""
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root)
+        os.makedirs(self.root, exist_ok=True)
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,242 @@
+"""
+Lokální SFTP server pro benchmarky (vyžaduje paramiko)
+Minimální SSH/SFTP server nad dočasnou složkou s přihlášením heslem.
+Rozhraní odpovídá LocalFTPServer (root, port, user, password, clear()).
+Latence se přidává ke všem datům od serveru ke klientovi (jako zpoždění
+odpovědí u LocalFTPServer), aniž by se serializovaly pipelinované požadavky.
+
+Použití:
+    with LocalSFTPServer(root) as server:
+        handler.connect('127.0.0.1', server.port, server.user, server.password)
+"""
+
+import logging
+import os
+import posixpath
+import queue
+import shutil
+import socket
+import threading
+import time
+import paramiko
+
+# Odpojení klienta loguje paramiko jako chybu transportu - pro benchmark jen šum
+logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+
+
+class _SSHServer(paramiko.ServerInterface):
+    """Přihlášení heslem a jen kanál typu session (subsystém sftp)"""
+    
+    def __init__(self, config: dict):
+        self.config = config
+    
+    def get_allowed_auths(self, username):
+        return 'password'
+    
+    def check_auth_password(self, username, password):
+        if username == self.config['user'] and password == self.config['password']:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+    
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+
+class _SFTPHandle(paramiko.SFTPHandle):
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+
+class _SFTPRoot(paramiko.SFTPServerInterface):
+    """SFTP operace nad kořenovou složkou serveru"""
+    
+    def __init__(self, server: _SSHServer, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.root = server.config['root']
+    
+    def _real(self, path: str) -> str:
+        virtual = self.canonicalize(path)
+        return os.path.join(self.root, *[part for part in virtual.split('/') if part])
+    
+    def canonicalize(self, path):
+        return posixpath.normpath('/' + path.lstrip('/'))
+    
+    def list_folder(self, path):
+        try:
+            real = self._real(path)
+            items = []
+            for name in os.listdir(real):
+                attr = paramiko.SFTPAttributes.from_stat(os.stat(os.path.join(real, name)))
+                attr.filename = name
+                items.append(attr)
+            return items
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+    
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._real(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+    
+    lstat = stat
+    
+    def open(self, path, flags, attr):
+        try:
+            fd = os.open(self._real(path), flags | getattr(os, 'O_BINARY', 0), 0o644)
+            if flags & os.O_WRONLY:
+                mode = 'ab' if flags & os.O_APPEND else 'wb'
+            elif flags & os.O_RDWR:
+                mode = 'a+b' if flags & os.O_APPEND else 'r+b'
+            else:
+                mode = 'rb'
+            f = os.fdopen(fd, mode)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        handle = _SFTPHandle(flags)
+        handle.filename = path
+        handle.readfile = f
+        handle.writefile = f
+        return handle
+    
+    def remove(self, path):
+        try:
+            os.remove(self._real(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+    
+    def rename(self, oldpath, newpath):
+        try:
+            os.rename(self._real(oldpath), self._real(newpath))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+    
+    def posix_rename(self, oldpath, newpath):
+        try:
+            os.replace(self._real(oldpath), self._real(newpath))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+    
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self._real(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+    
+    def rmdir(self, path):
+        try:
+            os.rmdir(self._real(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+
+def _delayed_relay(source: socket.socket, target: socket.socket, latency: float):
+    """Přeposílá data ze source do target, každý blok doručí až po latency sekundách"""
+    pending = queue.Queue()
+    
+    def receive():
+        while True:
+            try:
+                data = source.recv(65536)
+            except OSError:
+                data = b''
+            pending.put((time.perf_counter() + latency, data))
+            if not data:
+                break
+    
+    threading.Thread(target=receive, daemon=True).start()
+    while True:
+        due, data = pending.get()
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            if not data:
+                target.shutdown(socket.SHUT_WR)
+                break
+            target.sendall(data)
+        except OSError:
+            break
+
+
+class LocalSFTPServer:
+    """Lokální SFTP server běžící ve vlákně (jedno vlákno paramiko na spojení)"""
+    
+    def __init__(self, root: str, latency: float = 0.0, user: str = 'bench', password: str = 'bench'):
+        """
+        Args:
+            root: kořenová složka serveru (vytvoří se, pokud neexistuje)
+            latency: zpoždění dat od serveru ke klientovi (s)
+        """
+        self.root = root
+        self.latency = latency
+        self.user = user
+        self.password = password
+        self.host_key = None
+        self.listener = None
+        self.thread = None
+        self.transports = []
+        self.port = None
+    
+    def start(self):
+        """Spustí server na náhodném volném portu"""
+        os.makedirs(self.root, exist_ok=True)
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(128)
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self.thread.start()
+        return self
+    
+    def _accept_loop(self):
+        config = {'root': self.root, 'user': self.user, 'password': self.password}
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                break
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.latency:
+                connection = self._with_latency(connection)
+            transport = paramiko.Transport(connection)
+            transport.add_server_key(self.host_key)
+            transport.set_subsystem_handler('sftp', paramiko.SFTPServer, _SFTPRoot)
+            transport.start_server(server=_SSHServer(config))
+            self.transports.append(transport)
+    
+    def _with_latency(self, connection: socket.socket) -> socket.socket:
+        """Vloží mezi klienta a paramiko relay se zpožděním odpovědí"""
+        client_side, server_side = socket.socketpair()
+        threading.Thread(target=_delayed_relay, args=(connection, client_side, 0.0), daemon=True).start()
+        threading.Thread(target=_delayed_relay, args=(client_side, connection, self.latency), daemon=True).start()
+        return server_side
+    
+    def stop(self):
+        """Zastaví server"""
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+        for transport in self.transports:
+            transport.close()
+        self.transports = []
+    
+    def clear(self):
+        """Smaže obsah kořenové složky"""
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root)
+        os.makedirs(self.root, exist_ok=True)
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,739 @@
+import asyncio
+import ftplib
+import os
+import posixpath
+import re
+import threading
+import time
+from typing import Iterable, List, Tuple, Callable, Optional, Union
+from core.ftp_listing import Listing, parse_feat, parse_list, parse_mlsd, parse_mlst, unsupported_reply
+from core.rate_limiter import RateLimiter
+from core.remote_dirs import RemoteDirCache
+from core.remote_entry import RemoteListing
+
+
+class AsyncFTPClient:
+    """
+    FTP klient nad asyncio (jedno řídicí spojení)
+    Datová spojení (PASV) se otevírají na stejné smyčce událostí, takže jedna
+    smyčka obslouží libovolný počet klientů bez vlákna na spojení.
+    Chyby hlásí výjimkami ftplib (error_perm, error_temp, error_reply).
+    Každé čekání na síť má timeout (jako socket timeout ve FTPHandler),
+    takže zaseknutý server skončí TimeoutError místo věčného čekání.
+    """
+    
+    def __init__(self, blocksize: int = 256 * 1024, timeout: float = 10):
+        self.blocksize = blocksize
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.host = None
+        self.binary = False
+        self.features = None  # FEAT - zjišťuje se jednou za spojení
+        self.lock = asyncio.Lock()  # Jeden příkaz na řídicím spojení najednou
+    
+    async def connect(self, host: str, port: int, timeout: float = 10):
+        """Otevře řídicí spojení a přečte uvítání"""
+        self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        self.host = self.writer.get_extra_info('peername')[0]
+        await self._response()
+    
+    async def login(self, username: str, password: str):
+        """Přihlásí uživatele"""
+        code, text = await self.command(f"USER {username}")
+        if code == 331:
+            await self.command(f"PASS {password}")
+    
+    async def quit(self):
+        """Ukončí spojení"""
+        try:
+            await self.command("QUIT")
+        finally:
+            self.writer.close()
+    
+    async def _io(self, awaitable):
+        """Počká na síťovou operaci nejvýše self.timeout sekund (jinak TimeoutError)"""
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Server neodpověděl do {self.timeout:g} s") from None
+    
+    async def _readline(self) -> str:
+        line = await self._io(self.reader.readline())
+        if not line:
+            raise EOFError("Spojení ukončeno serverem")
+        return line.decode('utf-8', 'replace').rstrip("\r\n")
+    
+    async def _response(self) -> Tuple[int, str]:
+        """Přečte (i víceřádkovou) odpověď serveru"""
+        line = await self._readline()
+        lines = [line]
+        if line[3:4] == '-':
+            code = line[:3]
+            while True:
+                line = await self._readline()
+                lines.append(line)
+                if line[:3] == code and line[3:4] == ' ':
+                    break
+        text = "\n".join(lines)
+        code = int(lines[0][:3])
+        if 400 <= code < 500:
+            raise ftplib.error_temp(text)
+        if code >= 500:
+            raise ftplib.error_perm(text)
+        return code, text
+    
+    async def command(self, line: str) -> Tuple[int, str]:
+        """Odešle příkaz a vrátí odpověď"""
+        self.writer.write((line + "\r\n").encode('utf-8'))
+        await self._io(self.writer.drain())
+        return await self._response()
+    
+    async def pwd(self) -> str:
+        code, text = await self.command("PWD")
+        return ftplib.parse257(text)
+    
+    async def cwd(self, path: str):
+        await self.command(f"CWD {path}")
+    
+    async def mkd(self, path: str):
+        await self.command(f"MKD {path}")
+    
+    async def rmd(self, path: str):
+        await self.command(f"RMD {path}")
+    
+    async def delete(self, path: str):
+        await self.command(f"DELE {path}")
+    
+    async def rename(self, source: str, target: str):
+        """
+        RNFR/RNTO (volat pod zámkem); odmítne-li server RNTO na existující
+        cíl, cíl se smaže a přejmenování zopakuje. Po chybě RNFR se cíl nemaže.
+        """
+        await self.command(f"RNFR {source}")
+        try:
+            await self.command(f"RNTO {target}")
+        except ftplib.error_perm as e:
+            if not await self._file_exists(target):
+                raise
+            try:
+                await self.delete(target)
+            except ftplib.error_perm:
+                raise e
+            await self.command(f"RNFR {source}")
+            await self.command(f"RNTO {target}")
+    
+    async def _file_exists(self, path: str) -> bool:
+        """Existuje soubor path? (volat pod zámkem; MLST, jinak SIZE)"""
+        try:
+            if 'MLST' in await self.feat():
+                code, text = await self.command(f"MLST {path}")
+                return parse_mlst(text).get('type') == 'file'
+            if not self.binary:
+                await self.command("TYPE I")
+                self.binary = True
+            await self.command(f"SIZE {path}")
+            return True
+        except ftplib.error_perm:
+            return False
+    
+    async def _open_data(self, line: str):
+        """PASV + otevření datového spojení + odeslání příkazu přenosu"""
+        if not self.binary:
+            await self.command("TYPE I")
+            self.binary = True
+        
+        code, text = await self.command("PASV")
+        numbers = re.search(r'(\d+),(\d+),(\d+),(\d+),(\d+),(\d+)', text)
+        if not numbers:
+            raise ftplib.error_proto(text)
+        port = (int(numbers.group(5)) << 8) + int(numbers.group(6))
+        
+        # Stejně jako ftplib - adresu z PASV ignorujeme, použijeme adresu serveru
+        reader, writer = await self._io(asyncio.open_connection(self.host, port))
+        try:
+            code, text = await self.command(line)
+            if code >= 200:
+                raise ftplib.error_reply(text)
+        except Exception:
+            writer.close()
+            raise
+        return reader, writer
+    
+    async def _finish_data(self, writer):
+        """Zavře datové spojení a počká na potvrzení přenosu"""
+        writer.close()
+        try:
+            await self._io(writer.wait_closed())
+        except (ConnectionError, OSError, asyncio.TimeoutError):
+            pass
+        await self._response()
+    
+    async def stor_bytes(self, remote_path: str, data: Union[bytes, memoryview], throttle=None, report=None):
+        """Nahraje data (po řezech memoryview)"""
+        view = memoryview(data).cast('B')
+        async with self.lock:
+            reader, writer = await self._open_data(f"STOR {remote_path}")
+            for offset in range(0, view.nbytes, self.blocksize):
+                block = view[offset:offset + self.blocksize]
+                writer.write(block)
+                await self._io(writer.drain())
+                if throttle:
+                    await throttle(len(block))
+                if report:
+                    report(offset + len(block))
+            await self._finish_data(writer)
+    
+    async def stor_file(self, remote_path: str, local_path: str, throttle=None, report=None):
+        """Nahraje soubor přes loop.sendfile (po blocích - timeout platí na blok)"""
+        loop = asyncio.get_running_loop()
+        file_size = os.path.getsize(local_path)
+        async with self.lock:
+            reader, writer = await self._open_data(f"STOR {remote_path}")
+            with open(local_path, 'rb') as f:
+                sent = 0
+                while sent < file_size:
+                    count = await self._io(loop.sendfile(writer.transport, f, sent,
+                                                         min(self.blocksize, file_size - sent)))
+                    if not count:
+                        break
+                    sent += count
+                    if throttle:
+                        await throttle(count)
+                    if report:
+                        report(sent)
+            await self._finish_data(writer)
+    
+    async def retr(self, remote_path: str, throttle=None) -> bytes:
+        """Stáhne soubor"""
+        chunks = []
+        async with self.lock:
+            reader, writer = await self._open_data(f"RETR {remote_path}")
+            while True:
+                chunk = await self._io(reader.read(self.blocksize))
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if throttle:
+                    await throttle(len(chunk))
+            await self._finish_data(writer)
+        return b"".join(chunks)
+    
+    async def _read_listing(self, line: str) -> List[str]:
+        reader, writer = await self._open_data(line)
+        chunks = []
+        while True:
+            chunk = await self._io(reader.read(self.blocksize))
+            if not chunk:
+                break
+            chunks.append(chunk)
+        await self._finish_data(writer)
+        return b"".join(chunks).decode('utf-8', 'replace').splitlines()
+    
+    async def feat(self) -> dict:
+        """Schopnosti serveru podle FEAT (volat pod zámkem)"""
+        if self.features is None:
+            try:
+                code, text = await self.command("FEAT")
+                self.features = parse_feat(text)
+            except ftplib.error_perm:
+                self.features = {}
+        return self.features
+    
+    async def listdir(self, path: str) -> Listing:
+        """Výpis složky path s fakty (MLSD, pokud jej server umí, jinak LIST)"""
+        async with self.lock:
+            if 'MLSD' in await self.feat():
+                try:
+                    return parse_mlsd(await self._read_listing(f"MLSD {path}"))
+                except ftplib.error_perm as e:
+                    if not unsupported_reply(e):
+                        raise
+                    del self.features['MLSD']
+            return parse_list(await self._read_listing(f"LIST {path}"))
+    
+    async def mlst(self, path: str) -> Optional[dict]:
+        """
+        Fakta jedné položky přes MLST
+        Returns: fakta, None (neexistuje) nebo {} (server MLST neumí)
+        """
+        async with self.lock:
+            if 'MLST' not in await self.feat():
+                return {}
+            try:
+                code, text = await self.command(f"MLST {path}")
+                return parse_mlst(text)
+            except ftplib.error_perm as e:
+                if not unsupported_reply(e):
+                    return None
+                del self.features['MLST']
+                return {}
+
+
+class AsyncFTPHandler:
+    """
+    FTP backend nad asyncio se stejným rozhraním jako FTPHandler
+    Smyčka událostí běží v jednom vlákně na pozadí; synchronní metody na ni
+    jen předávají korutiny, takže je lze volat z GUI i z pracovních vláken.
+    upload_many() nahrává přes více řídicích spojení na téže smyčce.
+    """
+    
+    backend = 'asyncio'
+    
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        self.client = None
+        self.connected = False
+        self.current_path = "/"
+        self.credentials = None
+        
+        # Sdílené omezení rychlosti (core.rate_limiter.RateLimiter), None = bez omezení
+        self.rate_limiter = rate_limiter
+        self.connection_name = f"ftp-{id(self):x}"
+        
+        self.blocksize = 256 * 1024
+        self.progress_interval = 0.1
+        
+        # Složky, o kterých víme, že na serveru existují (šetří MKD)
+        self.dir_cache = RemoteDirCache()
+        
+        # Nahrávat pod dočasným názvem a přejmenovat (RNFR/RNTO) - viz FTPHandler
+        self.atomic_publish = True
+        
+        self.loop = None
+        self.loop_thread = None
+    
+    def _run(self, coroutine):
+        """Spustí korutinu na smyčce na pozadí a počká na výsledek"""
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+            self.loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+    
+    async def _open_client(self) -> AsyncFTPClient:
+        host, port, username, password = self.credentials
+        client = AsyncFTPClient(self.blocksize)
+        await client.connect(host, port)
+        try:
+            await client.login(username, password)
+        except Exception:
+            client.writer.close()
+            raise
+        return client
+    
+    def connect(self, host: str, port: int, username: str, password: str) -> Tuple[bool, str]:
+        """
+        Připojí se k FTP serveru
+        Returns: (success, message)
+        """
+        async def connect():
+            self.client = await self._open_client()
+            return await self.client.pwd()
+        
+        try:
+            self.disconnect()
+            self.credentials = (host, port, username, password)
+            self.current_path = self._run(connect())
+            self.dir_cache.clear()
+            self.dir_cache.add(self.current_path)
+            self.connected = True
+            return True, "Připojeno úspěšně"
+        except ftplib.error_perm as e:
+            return False, f"Chyba přihlášení: {str(e)}"
+        except Exception as e:
+            return False, f"Chyba připojení: {str(e)}"
+    
+    def spawn(self) -> Optional['AsyncFTPHandler']:
+        """
+        Otevře další spojení ke stejnému serveru (vlastní smyčka událostí,
+        nemění current_path tohoto spojení)
+        Returns: připojený handler nebo None
+        """
+        if not self.credentials:
+            return None
+        handler = AsyncFTPHandler(self.rate_limiter)
+        handler.blocksize = self.blocksize
+        handler.progress_interval = self.progress_interval
+        handler.atomic_publish = self.atomic_publish
+        success, message = handler.connect(*self.credentials)
+        if not success:
+            print(f"Další spojení se nepodařilo: {message}")
+            handler.disconnect()
+            return None
+        return handler
+    
+    def disconnect(self):
+        """Odpojí se od FTP serveru a zastaví smyčku událostí (další connect ji spustí znovu)"""
+        if self.client and self.connected:
+            try:
+                self._run(self.client.quit())
+            except:
+                pass
+            finally:
+                self.connected = False
+                if self.rate_limiter:
+                    self.rate_limiter.release(self.connection_name)
+                self.client = None
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop_thread.join()
+            self.loop.close()
+            self.loop = None
+    
+    def set_blocksize(self, blocksize: int):
+        """Nastaví velikost bloku přenosu (bajty)"""
+        self.blocksize = max(int(blocksize), 4096)
+        if self.client:
+            self.client.blocksize = self.blocksize
+    
+    def _throttle_for(self, connection: str, priority: str):
+        """
+        Asynchronní omezení rychlosti (čekání na token bucket mimo smyčku)
+        Limity se kontrolují u každého bloku - limit zapnutý v GUI během
+        dlouhého přenosu platí hned, bez limitu se do executoru nechodí.
+        """
+        async def throttle(size: int):
+            limiter = self.rate_limiter
+            if not limiter or not any(limiter.get_limits()):
+                return
+            await asyncio.get_running_loop().run_in_executor(
+                None, limiter.consume, size, connection, priority)
+        return throttle
+    
+    def _progress_reporter(self, progress_callback: Optional[Callable[[int, int], None]], total: int):
+        """Hlášení průběhu nejvýše jednou za progress_interval (a vždy na konci)"""
+        if not progress_callback:
+            return None
+        last = [0.0]
+        
+        def report(done: int):
+            now = time.monotonic()
+            if done >= total or now - last[0] >= self.progress_interval:
+                last[0] = now
+                progress_callback(done, total)
+        return report
+    
+    def _absolute(self, path: Optional[str]) -> str:
+        """Absolutní cesta na serveru (relativní vůči current_path, bez dotazu na server)"""
+        return self.dir_cache.absolute(path or '.', self.current_path)
+    
+    def _stat(self, path: str) -> Optional[dict]:
+        """Fakta jedné položky bez CWD (MLST, jinak výpis nadřazené složky). Returns: fakta nebo None"""
+        path = self._absolute(path)
+        if path == '/':
+            return {'type': 'dir'}
+        facts = self._run(self.client.mlst(path))
+        if facts != {}:
+            return facts
+        
+        parent, name = posixpath.split(path)
+        for entry_name, facts in self.list_entries(parent):
+            if entry_name == name:
+                return facts
+        return None
+    
+    def list_entries(self, path: str = None) -> Listing:
+        """
+        Vrátí obsah adresáře i s metadaty (fakta ve tvaru MLSD)
+        Returns: List of (name, facts); při chybě prázdný seznam
+        """
+        if not self.connected:
+            return []
+        
+        try:
+            return self.fetch_entries(path)
+        except Exception as e:
+            print(f"Chyba při listování adresáře: {e}")
+            return []
+    
+    def fetch_entries(self, path: str = None) -> Listing:
+        """Jako list_entries, ale chybu výpisu hlásí výjimkou"""
+        if not self.connected:
+            raise ConnectionError("Nepřipojeno")
+        
+        directory = self._absolute(path)
+        entries = self._run(self.client.listdir(directory))
+        self.dir_cache.add_listing(directory, [(name, facts.get('type') == 'dir') for name, facts in entries])
+        return entries
+    
+    def list_directory(self, path: str = None) -> RemoteListing:
+        """
+        Vrátí seznam souborů a složek v daném adresáři (složky první, podle názvu)
+        Returns: RemoteListing - položky se rozbalí i jako (name, is_directory)
+        """
+        return RemoteListing.from_listing(self.list_entries(path)).sorted_by('name')
+    
+    def _locked(self, method, *args):
+        """Spustí jednoduchý příkaz klienta pod zámkem řídicího spojení"""
+        async def call():
+            async with self.client.lock:
+                return await method(*args)
+        return self._run(call())
+    
+    def create_directory(self, dirname: str) -> Tuple[bool, str]:
+        """Vytvoří nový adresář"""
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        path = self._absolute(dirname)
+        try:
+            self._locked(self.client.mkd, path)
+            self.dir_cache.add(path)
+            return True, f"Složka '{dirname}' vytvořena"
+        except ftplib.error_perm as e:
+            if "exists" in str(e).lower():
+                self.dir_cache.add(path)
+                return True, f"Složka '{dirname}' již existuje"
+            return False, f"Chyba: {str(e)}"
+        except Exception as e:
+            return False, f"Chyba při vytváření složky: {str(e)}"
+    
+    def makedirs(self, paths: Iterable[str]) -> Tuple[bool, str]:
+        """
+        Vytvoří vzdálené složky včetně rodičů (relativní cesty vůči aktuální složce)
+        MKD jen pro složky, které nejsou v dir_cache, od kořene dolů.
+        """
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        missing = self.dir_cache.missing(paths, self.current_path)
+        for path in missing:
+            success, message = self.create_directory(path)
+            if not success:
+                if not self.path_exists(path):
+                    return False, message
+                self.dir_cache.add(path)
+        return True, f"Vytvořeno složek: {len(missing)}"
+    
+    def upload_file(self, local_path: str, remote_path: str,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    priority: str = 'bulk') -> Tuple[bool, str]:
+        """
+        Nahraje soubor na FTP
+        progress_callback: funkce(bytes_uploaded, total_bytes)
+        """
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        try:
+            report = self._progress_reporter(progress_callback, os.path.getsize(local_path))
+            self._run(self._store(self.client, local_path, self._absolute(remote_path),
+                                  self._throttle_for(self.connection_name, priority), report))
+            return True, "Nahráno"
+        except Exception as e:
+            return False, f"Chyba při nahrávání: {str(e)}"
+    
+    def upload_bytes(self, data: Union[bytes, memoryview], remote_path: str,
+                     progress_callback: Optional[Callable[[int, int], None]] = None,
+                     priority: str = 'bulk') -> Tuple[bool, str]:
+        """
+        Nahraje data (bytes nebo memoryview) na FTP
+        """
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        try:
+            report = self._progress_reporter(progress_callback, memoryview(data).nbytes)
+            self._run(self._store(self.client, data, self._absolute(remote_path),
+                                  self._throttle_for(self.connection_name, priority), report))
+            return True, "Nahráno"
+        except Exception as e:
+            return False, f"Chyba při nahrávání: {str(e)}"
+    
+    def _staging_path(self, remote_path: str) -> str:
+        """Kam se soubor skutečně nahrává (při atomic_publish skrytý dočasný název)"""
+        if not self.atomic_publish:
+            return remote_path
+        directory, name = posixpath.split(remote_path)
+        return posixpath.join(directory, f".{name}.part")
+    
+    async def _store(self, client: AsyncFTPClient, source: Union[str, bytes, memoryview],
+                     remote_path: str, throttle=None, report=None):
+        """
+        Nahraje soubor (cesta) nebo data na absolutní remote_path
+        Při atomic_publish pod dočasným názvem a hotový soubor přejmenuje;
+        po chybě dočasný soubor smaže.
+        """
+        staging_path = self._staging_path(remote_path)
+        try:
+            if isinstance(source, str):
+                await client.stor_file(staging_path, source, throttle, report)
+            else:
+                await client.stor_bytes(staging_path, source, throttle, report)
+            if staging_path != remote_path:
+                async with client.lock:
+                    await client.rename(staging_path, remote_path)
+        except Exception as e:
+            # Po vypršení limitu server neodpovídá - mazání by jen čekalo další timeout
+            if staging_path != remote_path and not isinstance(e, TimeoutError):
+                try:
+                    async with client.lock:
+                        await client.delete(staging_path)
+                except Exception:
+                    pass
+            raise
+    
+    def rename(self, from_path: str, to_path: str) -> Tuple[bool, str]:
+        """Přejmenuje soubor (RNFR/RNTO); existující cíl se přepíše"""
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        try:
+            self._locked(self.client.rename, self._absolute(from_path), self._absolute(to_path))
+            return True, "Přejmenováno"
+        except Exception as e:
+            return False, f"Chyba při přejmenování: {str(e)}"
+    
+    def upload_many(self, items: List[Tuple[Union[str, bytes, memoryview], str]],
+                    connections: int = 4, priority: str = 'bulk') -> List[Tuple[bool, str]]:
+        """
+        Nahraje více souborů souběžně přes několik řídicích spojení na jedné smyčce
+        Args:
+            items: [(lokální cesta nebo data, vzdálená cesta)]
+            connections: počet souběžných spojení
+        Returns: [(success, message)] ve stejném pořadí jako items
+        """
+        if not self.connected:
+            return [(False, "Nepřipojeno")] * len(items)
+        
+        async def upload_all():
+            work = asyncio.Queue()
+            for position, item in enumerate(items):
+                work.put_nowait((position, item))
+            results = [(False, "Nenahráno")] * len(items)
+            connect_errors = []
+            
+            async def worker(number: int):
+                try:
+                    client = await self._open_client()
+                except Exception as e:
+                    # Ostatní spojení převezmou jeho díl fronty
+                    connect_errors.append(e)
+                    return
+                connection = f"{self.connection_name}-{number}"
+                throttle = self._throttle_for(connection, priority)
+                try:
+                    while not work.empty():
+                        position, (source, remote_path) = work.get_nowait()
+                        try:
+                            await self._store(client, source, remote_path, throttle)
+                            results[position] = (True, "Nahráno")
+                        except Exception as e:
+                            results[position] = (False, f"Chyba při nahrávání: {str(e)}")
+                finally:
+                    try:
+                        await client.quit()
+                    except Exception:
+                        pass
+                    if self.rate_limiter:
+                        self.rate_limiter.release(connection)
+            
+            await asyncio.gather(*(worker(n) for n in range(max(1, min(connections, len(items))))),
+                                 return_exceptions=True)
+            
+            # Žádné spojení se neotevřelo - zbylé položky nesou chybu připojení
+            while not work.empty():
+                position, item = work.get_nowait()
+                results[position] = (False, f"Chyba připojení: {connect_errors[-1] if connect_errors else 'neznámá'}")
+            return results
+        
+        # Relativní cesty jsou vůči current_path hlavního spojení
+        items = [(source, self._absolute(path)) for source, path in items]
+        return self._run(upload_all())
+    
+    def download_file(self, remote_path: str, local_path: str = None,
+                      priority: str = 'interactive') -> Tuple[bool, bytes, str]:
+        """
+        Stáhne soubor z FTP
+        Returns: (success, data, message)
+        """
+        if not self.connected:
+            return False, b"", "Nepřipojeno"
+        
+        try:
+            data = self._run(self.client.retr(self._absolute(remote_path), self._throttle_for(self.connection_name, priority)))
+            
+            if local_path:
+                with open(local_path, 'wb') as f:
+                    f.write(data)
+            
+            return True, data, "Staženo"
+        except Exception as e:
+            return False, b"", f"Chyba při stahování: {str(e)}"
+    
+    def delete_file(self, remote_path: str) -> Tuple[bool, str]:
+        """Smaže soubor z FTP"""
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        try:
+            self._locked(self.client.delete, self._absolute(remote_path))
+            return True, "Smazáno"
+        except Exception as e:
+            return False, f"Chyba při mazání: {str(e)}"
+    
+    def delete_directory(self, dirname: str) -> Tuple[bool, str]:
+        """Smaže prázdný adresář"""
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        try:
+            path = self._absolute(dirname)
+            self._locked(self.client.rmd, path)
+            self.dir_cache.discard(path)
+            return True, "Složka smazána"
+        except Exception as e:
+            return False, f"Chyba při mazání složky: {str(e)}"
+    
+    def change_directory(self, path: str) -> Tuple[bool, str]:
+        """Změní aktuální adresář (jen na straně klienta, známá složka nestojí žádný příkaz)"""
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        try:
+            target = self._absolute(path)
+            if not self.dir_cache.is_known(target):
+                facts = self._stat(target)
+                if not facts or facts.get('type', '').lower() != 'dir':
+                    return False, f"Chyba: složka '{target}' neexistuje"
+                self.dir_cache.add(target)
+            self.current_path = target
+            return True, self.current_path
+        except Exception as e:
+            return False, f"Chyba: {str(e)}"
+    
+    def get_current_path(self) -> str:
+        """Vrátí aktuální cestu"""
+        return self.current_path if self.connected else ""
+    
+    def path_exists(self, path: str) -> bool:
+        """Zkontroluje, zda cesta existuje (a je to složka)"""
+        if not self.connected:
+            return False
+        
+        try:
+            if self.dir_cache.is_known(path, self.current_path):
+                return True
+            facts = self._stat(path)
+            return bool(facts) and facts.get('type', '').lower() == 'dir'
+        except:
+            return False
+    
+    def has_photo_structure(self, path: str = None) -> Tuple[bool, List[str]]:
+        """
+        Zkontroluje, zda složka obsahuje strukturu thumbnail/original/compress
+        Returns: (has_structure, list_of_found_folders)
+        """
+        if not self.connected:
+            return False, []
+        
+        try:
+            items = self.list_directory(path)
+            folder_names = [name.lower() for name in items.dirs().names()]
+            
+            expected = ['thumbnail', 'original', 'compress']
+            found = [f for f in expected if f in folder_names]
+            
+            return len(found) == 3, found
+        except:
+            return False, []
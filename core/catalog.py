@@ -0,0 +1,153 @@
+import json
+import posixpath
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from core.remote_walk import RemoteWalker
+
+
+class SiteCatalog:
+    """
+    Katalog všech galerií webu (catalog.json v kořenové složce webu)
+    Front-end načte seznam alb jedním požadavkem. Po nahrání nebo mazání se
+    znovu projde jen dotčená galerie a katalog se nahraje znovu; celý web
+    se prochází jen tehdy, když katalog na serveru ještě neexistuje.
+    """
+    
+    FILENAME = 'catalog.json'
+    
+    def __init__(self, root: str = '/'):
+        self.root = root
+        self.albums = None  # {cesta vůči root: album}, None = ještě nenačteno ze serveru
+        self._lock = threading.Lock()
+    
+    def reset(self, root: str = '/'):
+        """Nové spojení - katalog se při další změně načte ze serveru"""
+        with self._lock:
+            self.root = root
+            self.albums = None
+    
+    @property
+    def remote_path(self) -> str:
+        return posixpath.join(self.root, self.FILENAME)
+    
+    def _relative(self, path: str) -> str:
+        """Cesta galerie vůči kořeni webu ('' = kořen, mimo kořen zůstane absolutní)"""
+        relative = posixpath.relpath(path, self.root)
+        if relative == '.':
+            return ''
+        return path if relative.startswith('..') else relative
+    
+    @staticmethod
+    def _iso_time(modify: Optional[str]) -> Optional[str]:
+        """YYYYMMDDHHMMSS (UTC) -> ISO 8601"""
+        if not modify:
+            return None
+        try:
+            return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.strptime(modify[:14], '%Y%m%d%H%M%S'))
+        except ValueError:
+            return None
+    
+    def _album(self, gallery: Dict) -> Dict:
+        """Záznam alba z výsledku RemoteWalker"""
+        path = self._relative(gallery['path'])
+        cover = gallery.get('cover')
+        return {
+            'path': path,
+            'title': posixpath.basename(gallery['path'].rstrip('/')) or '/',
+            'photos': gallery['photos'],
+            'cover': posixpath.join(path, cover) if cover else None,
+            'updated': self._iso_time(gallery.get('updated')),
+            'bytes': gallery['bytes'],
+        }
+    
+    def load(self, handler) -> bool:
+        """
+        Načte katalog ze serveru
+        Returns: True, pokud na serveru existoval
+        """
+        success, data, msg = handler.download_file(self.remote_path, priority='interactive')
+        self.albums = {}
+        if not success:
+            return False
+        try:
+            for album in json.loads(data.decode('utf-8')).get('albums', []):
+                self.albums[album['path']] = album
+            return True
+        except (ValueError, KeyError, AttributeError) as e:
+            print(f"Poškozený katalog {self.remote_path}, sestaví se znovu: {e}")
+            self.albums = {}
+            return False
+    
+    def to_json(self) -> str:
+        """Obsah catalog.json (alba seřazená podle cesty)"""
+        albums = [self.albums[path] for path in sorted(self.albums or {})]
+        return json.dumps({
+            'generated': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'count': len(albums),
+            'photos': sum(album['photos'] for album in albums),
+            'bytes': sum(album['bytes'] for album in albums),
+            'albums': albums,
+        }, ensure_ascii=False, indent=1)
+    
+    def publish(self, handler) -> Tuple[bool, str]:
+        """Nahraje katalog na server"""
+        data = self.to_json().encode('utf-8')
+        return handler.upload_bytes(data, self.remote_path, priority='interactive')
+    
+    @staticmethod
+    def _walk_failed(stats: Dict) -> Optional[str]:
+        """Důvod, proč výsledek procházení nelze zveřejnit (None = úplný)"""
+        if not stats.get('connections'):
+            return "Procházení webu selhalo, katalog nezměněn"
+        if stats.get('errors'):
+            return f"Nepodařilo se vypsat složek: {stats['errors']}, katalog nezměněn"
+        return None
+    
+    def rebuild(self, handler, galleries: List[Dict], stats: Optional[Dict] = None) -> Tuple[bool, str]:
+        """
+        Sestaví katalog z výsledku procházení celého webu a nahraje jej
+        stats: RemoteWalker.stats - neúplné procházení se nezveřejní (chybějící
+            galerie by z katalogu zmizely)
+        """
+        reason = self._walk_failed(stats) if stats is not None else None
+        if reason:
+            return False, reason
+        
+        with self._lock:
+            self.albums = {}
+            for gallery in galleries:
+                album = self._album(gallery)
+                if not album['path'].startswith('/'):
+                    self.albums[album['path']] = album
+            return self.publish(handler)
+    
+    def refresh(self, handler, path: str, connections: int = 2) -> Tuple[bool, str]:
+        """
+        Aktualizuje katalog po změně galerie path (a galerií pod ní) a nahraje jej
+        Chybí-li katalog na serveru, projde se jednou celý web od root. Bez
+        dalších spojení (limit spojení na uživatele) se prochází přes handler.
+        Selže-li výpis kterékoli složky, katalog se nemění.
+        """
+        prefix = self._relative(path)
+        if prefix.startswith('/'):
+            return True, "Galerie je mimo kořen katalogu"
+        
+        with self._lock:
+            if self.albums is None and not self.load(handler):
+                path, prefix = self.root, ''
+            
+            walker = RemoteWalker(handler, connections)
+            galleries = walker.walk(path)
+            reason = self._walk_failed(walker.stats)
+            if reason:
+                return False, reason
+            
+            # Alba pod path nahradí aktuální stav (smazané galerie zmizí)
+            for key in list(self.albums):
+                if not prefix or key == prefix or key.startswith(prefix.rstrip('/') + '/'):
+                    del self.albums[key]
+            for gallery in galleries:
+                album = self._album(gallery)
+                self.albums[album['path']] = album
+            return self.publish(handler)
@@ -29,7 +29,8 @@ class FTPConfig:
         except Exception as e:
             print(f"Chyba při ukládání konfigurace: {e}")
     
-    def add_config(self, name: str, host: str, port: int, username: str, password: str) -> bool:
+    def add_config(self, name: str, host: str, port: int, username: str, password: str,
+                   backend: str = 'ftplib') -> bool:
         """Přidá novou konfiguraci"""
         # Zkontroluj, zda název již neexistuje
         if any(cfg['name'] == name for cfg in self.configs):
@@ -40,7 +41,8 @@ class FTPConfig:
             'host': host,
             'port': port,
             'username': username,
-            'password': password
+            'password': password,
+            'backend': backend
         }
         self.configs.append(config)
         self._save_configs()
@@ -56,7 +58,7 @@ class FTPConfig:
         return False
     
     def update_config(self, old_name: str, name: str, host: str, port: int, 
-                     username: str, password: str) -> bool:
+                     username: str, password: str, backend: str = 'ftplib') -> bool:
         """Aktualizuje existující konfiguraci"""
         for cfg in self.configs:
             if cfg['name'] == old_name:
@@ -65,6 +67,7 @@ class FTPConfig:
                 cfg['port'] = port
                 cfg['username'] = username
                 cfg['password'] = password
+                cfg['backend'] = backend
                 self._save_configs()
                 return True
         return False
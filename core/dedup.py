@@ -0,0 +1,117 @@
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional
+
+
+class DuplicateDetector:
+    """
+    Hledání byte-identických souborů před nahráním
+    Postupuje od nejlevnějšího kroku: velikost souboru -> částečný hash
+    (začátek + konec souboru) -> plný hash. Soubory s unikátní velikostí
+    se vůbec nečtou.
+    """
+    
+    def __init__(self, known: Optional[Dict[str, dict]] = None,
+                 partial_size: int = 64 * 1024, chunk_size: int = 1024 * 1024):
+        """
+        Args:
+            known: soubory již nahrané na server {klíč: {'size', 'partial', 'hash'}}
+            partial_size: kolik bajtů ze začátku a konce souboru tvoří částečný hash
+            chunk_size: velikost bloku při streamovaném čtení
+        """
+        self.partial_size = partial_size
+        self.chunk_size = chunk_size
+        
+        # klíč -> otisk {'size', 'partial', 'hash', 'path'}; chybějící hashe se dopočítají
+        self.fingerprints: Dict[str, dict] = {}
+        self.by_size: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()  # check() běží v kodéru, forget() a fingerprint() v nahrávacím vlákně
+        
+        for key, entry in (known or {}).items():
+            if entry.get('size') is not None and entry.get('hash'):
+                self._register(key, {'size': entry['size'], 'partial': entry.get('partial'),
+                                     'hash': entry['hash'], 'path': None})
+    
+    def _register(self, key: str, fingerprint: dict):
+        """Zaeviduje soubor pod klíčem"""
+        self.fingerprints[key] = fingerprint
+        self.by_size.setdefault(fingerprint['size'], []).append(key)
+    
+    def _partial_hash(self, fingerprint: dict) -> Optional[str]:
+        """Hash začátku a konce souboru (u malých souborů celého souboru)"""
+        if fingerprint.get('partial') is None and fingerprint.get('path'):
+            hasher = hashlib.blake2b(digest_size=16)
+            with open(fingerprint['path'], 'rb') as f:
+                hasher.update(f.read(self.partial_size))
+                if fingerprint['size'] > 2 * self.partial_size:
+                    f.seek(-self.partial_size, os.SEEK_END)
+                    hasher.update(f.read(self.partial_size))
+                elif fingerprint['size'] > self.partial_size:
+                    hasher.update(f.read())
+            fingerprint['partial'] = hasher.hexdigest()
+        return fingerprint.get('partial')
+    
+    def _full_hash(self, fingerprint: dict) -> Optional[str]:
+        """Streamovaný hash celého souboru"""
+        if fingerprint.get('hash') is None and fingerprint.get('path'):
+            hasher = hashlib.blake2b()
+            buffer = bytearray(self.chunk_size)
+            view = memoryview(buffer)
+            with open(fingerprint['path'], 'rb') as f:
+                while True:
+                    read = f.readinto(buffer)
+                    if not read:
+                        break
+                    hasher.update(view[:read])
+            fingerprint['hash'] = hasher.hexdigest()
+        return fingerprint.get('hash')
+    
+    def check(self, path: str, key: str) -> Optional[str]:
+        """
+        Zjistí, zda je soubor duplikátem dříve viděného souboru, a zaeviduje ho
+        Returns: klíč původního souboru, nebo None pokud je soubor nový
+        """
+        with self._lock:
+            return self._check(path, key)
+    
+    def _check(self, path: str, key: str) -> Optional[str]:
+        fingerprint = {'size': os.path.getsize(path), 'partial': None, 'hash': None, 'path': path}
+        candidates = [k for k in self.by_size.get(fingerprint['size'], []) if k != key]
+        
+        # Stejný klíč (např. opakované nahrání téhož souboru) porovnáváme také
+        if key in self.fingerprints and self.fingerprints[key]['size'] == fingerprint['size']:
+            candidates.insert(0, key)
+        
+        duplicate_of = None
+        for candidate in candidates:
+            other = self.fingerprints[candidate]
+            if self._partial_hash(fingerprint) != self._partial_hash(other) and other.get('partial'):
+                continue
+            if self._full_hash(fingerprint) == self._full_hash(other):
+                duplicate_of = candidate
+                break
+        
+        if duplicate_of is None:
+            if key in self.fingerprints:
+                self.by_size[self.fingerprints[key]['size']].remove(key)
+            self._register(key, fingerprint)
+        return duplicate_of
+    
+    def forget(self, key: str):
+        """
+        Vyřadí soubor z evidence - jeho nahrání selhalo, takže další
+        identický soubor už se za duplikát nepovažuje a nahraje se
+        """
+        with self._lock:
+            fingerprint = self.fingerprints.pop(key, None)
+            if fingerprint is not None:
+                self.by_size[fingerprint['size']].remove(key)
+    
+    def fingerprint(self, key: str) -> dict:
+        """Vrátí úplný otisk souboru pro uložení do indexu (dopočítá chybějící hashe)"""
+        with self._lock:
+            fingerprint = self.fingerprints[key]
+            self._partial_hash(fingerprint)
+            self._full_hash(fingerprint)
+            return {'size': fingerprint['size'], 'partial': fingerprint['partial'], 'hash': fingerprint['hash']}
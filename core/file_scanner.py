@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+from core.image_processor import ImageProcessor
+
+
+class FolderScanner:
+    """
+    Rekurzivní vyhledávání obrázků ve zdrojové složce
+    Běží ve vlákně mimo UI a výsledky posílá po dávkách, takže seznam
+    se plní průběžně a nahrávání může začít ještě před koncem skenování.
+    """
+    
+    def __init__(self, batch_size: int = 500, batch_interval: float = 0.2):
+        """
+        Args:
+            batch_size: maximální počet souborů v jedné dávce
+            batch_interval: nejdelší doba (s) před odesláním neúplné dávky
+        """
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._cancelled = threading.Event()
+        self._thread = None
+    
+    @staticmethod
+    def iter_images(root: str, recursive: bool = True) -> Iterator[str]:
+        """
+        Prochází složku pomocí os.scandir a vrací relativní cesty k obrázkům
+        Cesty používají '/' jako oddělovač, aby šly přímo použít na FTP.
+        Skryté soubory a složky (začínající tečkou) se přeskakují.
+        """
+        stack = ['']
+        while stack:
+            relative_dir = stack.pop()
+            current = os.path.join(root, relative_dir) if relative_dir else root
+            
+            subdirs = []
+            files = []
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive:
+                                    subdirs.append(relative)
+                            elif ImageProcessor.is_image(entry.name):
+                                files.append(relative)
+                        except OSError:
+                            continue
+            except OSError as e:
+                print(f"Chyba při čtení složky {current}: {e}")
+                continue
+            
+            files.sort(key=str.lower)
+            yield from files
+            
+            # Podsložky v abecedním pořadí (zásobník je obrací)
+            stack.extend(sorted(subdirs, key=str.lower, reverse=True))
+    
+    def start(self, root: str, on_batch: Callable[[List[str]], None],
+              on_done: Optional[Callable[[int], None]] = None, recursive: bool = True):
+        """
+        Spustí skenování ve vlákně
+        on_batch: funkce(seznam_relativních_cest) - volá se z vlákna skeneru
+        on_done: funkce(celkový_počet) - volá se po dokončení nebo zrušení
+        """
+        self.cancel()
+        self._cancelled = threading.Event()
+        cancelled = self._cancelled
+        
+        def run():
+            batch = []
+            total = 0
+            last_flush = time.monotonic()
+            
+            for relative in self.iter_images(root, recursive):
+                if cancelled.is_set():
+                    break
+                batch.append(relative)
+                total += 1
+                
+                if len(batch) >= self.batch_size or time.monotonic() - last_flush >= self.batch_interval:
+                    on_batch(batch)
+                    batch = []
+                    last_flush = time.monotonic()
+            
+            if batch and not cancelled.is_set():
+                on_batch(batch)
+            if on_done:
+                on_done(total)
+        
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+    
+    def cancel(self):
+        """Zruší probíhající skenování"""
+        self._cancelled.set()
+    
+    def is_running(self) -> bool:
+        """Vrátí True, pokud skenování stále běží"""
+        return self._thread is not None and self._thread.is_alive()
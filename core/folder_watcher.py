@@ -0,0 +1,244 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from core.file_scanner import FolderScanner
+from core.image_processor import ImageProcessor
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    _libc.inotify_init1
+except (OSError, AttributeError):  # inotify je jen na Linuxu - jinak se složka prochází periodicky
+    _libc = None
+
+# Konstanty z <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+
+_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class _Inotify:
+    """Tenký obal nad inotify (ctypes) - sleduje složky a vrací názvy změněných položek"""
+    
+    MASK = IN_CREATE | IN_CLOSE_WRITE | IN_MOVED_TO | IN_ONLYDIR
+    
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.paths = {}  # {wd: relativní cesta složky}
+    
+    @classmethod
+    def create(cls) -> Optional['_Inotify']:
+        """Returns: instance nebo None, pokud inotify není k dispozici"""
+        if _libc is None:
+            return None
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            print(f"inotify nedostupné: {os.strerror(ctypes.get_errno())}")
+            return None
+        return cls(fd)
+    
+    def add_watch(self, path: str, relative_dir: str) -> bool:
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            print(f"Nelze sledovat {path}: {os.strerror(ctypes.get_errno())}")
+            return False
+        self.paths[wd] = relative_dir
+        return True
+    
+    def read(self, timeout: float) -> List[Tuple[str, int]]:
+        """
+        Počká nejvýše timeout sekund na události
+        Returns: [(relativní cesta položky, maska)]; ('', IN_Q_OVERFLOW) = události se ztratily
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        
+        events = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            
+            if mask & IN_Q_OVERFLOW:
+                events.append(('', IN_Q_OVERFLOW))
+            elif mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+            elif wd in self.paths and name:
+                relative_dir = self.paths[wd]
+                events.append((f"{relative_dir}/{name}" if relative_dir else name, mask))
+        return events
+    
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """
+    Sledování zdrojové složky (hot folder) - hlásí nově přibylé obrázky
+    Na Linuxu přes inotify (ctypes), jinde periodickým procházením složky.
+    Soubor se ohlásí až poté, co se jeho velikost a čas změny settle sekund
+    nemění, takže se nenahrávají napůl zapsané fotky.
+    """
+    
+    def __init__(self, settle: float = 1.5, poll_interval: float = 2.0, batch_interval: float = 1.0):
+        """
+        Args:
+            settle: jak dlouho (s) se soubor nesmí měnit, než se ohlásí
+            poll_interval: interval procházení složky bez inotify (s)
+            batch_interval: jak dlouho (s) sbírat hotové soubory do jedné dávky
+        """
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.batch_interval = batch_interval
+        self.backend = None  # 'inotify' nebo 'polling' (po start)
+        self._stopped = threading.Event()
+        self._thread = None
+    
+    def start(self, root: str, on_batch: Callable[[List[str]], None],
+              known: Optional[Iterable[str]] = None, recursive: bool = True, use_inotify: bool = True):
+        """
+        Spustí sledování ve vlákně
+        on_batch: funkce(seznam_relativních_cest) - volá se z vlákna sledování
+        known: relativní cesty, které se neohlašují (již vybrané fotky);
+            None = vše, co ve složce právě je
+        """
+        self.stop()
+        self._stopped = threading.Event()
+        stopped = self._stopped
+        seen = set(FolderScanner.iter_images(root, recursive) if known is None else known)
+        
+        inotify = _Inotify.create() if use_inotify else None
+        self.backend = 'inotify' if inotify else 'polling'
+        
+        def run():
+            try:
+                self._run(root, on_batch, seen, recursive, inotify, stopped)
+            finally:
+                if inotify:
+                    inotify.close()
+        
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+    
+    def _run(self, root: str, on_batch, seen: Set[str], recursive: bool,
+             inotify: Optional[_Inotify], stopped: threading.Event):
+        """Smyčka sledování: sběr kandidátů -> kontrola ustálení -> dávky"""
+        pending = {}  # {relativní cesta: (velikost, mtime_ns, od kdy beze změny)}
+        batch = []
+        batch_started = None
+        
+        def rescan():
+            """Všechny obrázky, které ještě nebyly ohlášeny (a u inotify sleduj i podsložky)"""
+            if inotify:
+                self._watch_tree(inotify, root, '', recursive)
+            for relative in FolderScanner.iter_images(root, recursive):
+                if relative not in seen:
+                    pending.setdefault(relative, None)
+        
+        rescan()
+        last_poll = time.monotonic()
+        while not stopped.is_set():
+            if inotify:
+                # S čekajícími soubory se ustálení kontroluje častěji
+                for relative, mask in inotify.read(0.25 if pending or batch else 1.0):
+                    if mask & IN_Q_OVERFLOW:
+                        rescan()
+                    elif mask & IN_ISDIR:
+                        if recursive and not os.path.basename(relative).startswith('.'):
+                            # Nová (nebo přesunutá) podsložka může už obsahovat fotky
+                            self._watch_tree(inotify, root, relative, recursive)
+                            for name in FolderScanner.iter_images(os.path.join(root, *relative.split('/'))):
+                                if f"{relative}/{name}" not in seen:
+                                    pending.setdefault(f"{relative}/{name}", None)
+                    elif relative not in seen and self._is_candidate(relative):
+                        pending.setdefault(relative, None)
+            else:
+                stopped.wait(0.25)
+                if time.monotonic() - last_poll >= self.poll_interval:
+                    rescan()
+                    last_poll = time.monotonic()
+            
+            now = time.monotonic()
+            for relative in self._settled(root, pending, now):
+                seen.add(relative)
+                batch.append(relative)
+                batch_started = batch_started or now
+            
+            if batch and (now - batch_started >= self.batch_interval or stopped.is_set()):
+                batch.sort(key=str.lower)
+                on_batch(batch)
+                batch = []
+                batch_started = None
+    
+    @staticmethod
+    def _is_candidate(relative: str) -> bool:
+        """Obrázek mimo skryté soubory a složky (stejná pravidla jako FolderScanner)"""
+        return (ImageProcessor.is_image(relative)
+                and not any(part.startswith('.') for part in relative.split('/')))
+    
+    def _settled(self, root: str, pending: Dict[str, Optional[tuple]], now: float) -> List[str]:
+        """Vyřadí z pending soubory, které se settle sekund nezměnily. Returns: jejich cesty"""
+        ready = []
+        for relative, previous in list(pending.items()):
+            try:
+                info = os.stat(os.path.join(root, *relative.split('/')))
+            except OSError:
+                del pending[relative]  # Smazán nebo přejmenován dřív, než se dopsal
+                continue
+            
+            signature = (info.st_size, info.st_mtime_ns)
+            if previous is None or previous[:2] != signature:
+                pending[relative] = signature + (now,)
+            elif info.st_size and now - previous[2] >= self.settle:
+                del pending[relative]
+                ready.append(relative)
+        return ready
+    
+    @staticmethod
+    def _watch_tree(inotify: _Inotify, root: str, relative_dir: str, recursive: bool):
+        """Přidá sledování složky relative_dir (a jejích podsložek)"""
+        stack = [relative_dir]
+        watched = set(inotify.paths.values())
+        while stack:
+            current = stack.pop()
+            path = os.path.join(root, *current.split('/')) if current else root
+            if current not in watched:
+                inotify.add_watch(path, current)
+            if not recursive:
+                continue
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if not entry.name.startswith('.') and entry.is_dir(follow_symlinks=False):
+                            stack.append(f"{current}/{entry.name}" if current else entry.name)
+            except OSError as e:
+                print(f"Chyba při čtení složky {path}: {e}")
+    
+    def stop(self):
+        """Ukončí sledování (dávka rozpracovaná v tu chvíli se ještě odešle)"""
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+    
+    def is_running(self) -> bool:
+        """Vrátí True, pokud sledování běží"""
+        return self._thread is not None and self._thread.is_alive()
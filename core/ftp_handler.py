@@ -1,16 +1,56 @@
 import ftplib
 import os
-from typing import List, Tuple, Callable, Optional
+import posixpath
+import socket
+import ssl
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple, Callable, Optional, Union
 from io import BytesIO
+from core.ftp_listing import Listing, parse_feat, parse_list, parse_mlst, unsupported_reply
+from core.rate_limiter import RateLimiter
+from core.remote_dirs import RemoteDirCache
+from core.remote_entry import RemoteListing
 
 
 class FTPHandler:
-    """Třída pro práci s FTP serverem"""
+    """
+    Třída pro práci s FTP serverem
+    Všechny příkazy dostávají absolutní cesty; current_path je jen výchozí
+    složka pro relativní cesty na straně klienta (na serveru se nikdy neposílá
+    CWD). Řídicí spojení je chráněné zámkem, operace lze volat z více vláken.
+    """
     
-    def __init__(self):
+    backend = 'ftplib'
+    
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
         self.ftp = None
         self.connected = False
         self.current_path = "/"
+        self.lock = threading.RLock()  # Jeden příkaz na řídicím spojení najednou
+        self._binary = False  # Je nastaven TYPE I? (výpisy přepínají ftplib na TYPE A)
+        
+        # Sdílené omezení rychlosti (core.rate_limiter.RateLimiter), None = bez omezení
+        self.rate_limiter = rate_limiter
+        self.connection_name = f"ftp-{id(self):x}"
+        
+        # Velikost bloku přenosu (ftplib má výchozích 8 KiB) a minimální
+        # interval mezi voláními progress_callback (s)
+        self.blocksize = 256 * 1024
+        self.progress_interval = 0.1
+        
+        # Složky, o kterých víme, že na serveru existují (šetří MKD)
+        self.dir_cache = RemoteDirCache()
+        
+        # Schopnosti serveru z FEAT (None = ještě nezjištěno, platí pro jedno spojení)
+        self.features = None
+        
+        # (host, port, username, password) posledního úspěšného připojení - pro spawn()
+        self.credentials = None
+        
+        # Atomické zveřejnění: nahrává se pod dočasným názvem a teprve hotový
+        # soubor se přejmenuje na cílový (návštěvník nikdy nedostane půlku souboru)
+        self.atomic_publish = True
     
     def connect(self, host: str, port: int, username: str, password: str) -> Tuple[bool, str]:
         """
@@ -18,132 +58,352 @@ class FTPHandler:
         Returns: (success, message)
         """
         try:
-            self.ftp = ftplib.FTP()
-            self.ftp.connect(host, port, timeout=10)
-            self.ftp.login(username, password)
-            self.connected = True
-            self.current_path = self.ftp.pwd()
+            with self.lock:
+                self.ftp = self._create_ftp()
+                self.ftp.connect(host, port, timeout=10)
+                self.ftp.login(username, password)
+                self.connected = True
+                self.credentials = (host, port, username, password)
+                # Domovská složka - jediný PWD za spojení
+                self.current_path = self.ftp.pwd()
+                self.features = None
+                self._binary = False
+                self.dir_cache.clear()
+                self.dir_cache.add(self.current_path)
             return True, "Připojeno úspěšně"
         except ftplib.error_perm as e:
             return False, f"Chyba přihlášení: {str(e)}"
         except Exception as e:
             return False, f"Chyba připojení: {str(e)}"
     
+    def _create_ftp(self) -> ftplib.FTP:
+        """Vytvoří klienta ftplib (FTPSHandler vrací FTP_TLS)"""
+        return ftplib.FTP()
+    
     def disconnect(self):
         """Odpojí se od FTP serveru"""
         if self.ftp and self.connected:
             try:
-                self.ftp.quit()
+                with self.lock:
+                    self.ftp.quit()
             except:
                 pass
             finally:
                 self.connected = False
+                if self.rate_limiter:
+                    self.rate_limiter.release(self.connection_name)
                 self.ftp = None
     
-    def list_directory(self, path: str = None) -> List[Tuple[str, bool]]:
+    def _clone(self) -> 'FTPHandler':
+        """Nepřipojený handler se stejným nastavením"""
+        handler = type(self)(self.rate_limiter)
+        handler.blocksize = self.blocksize
+        handler.progress_interval = self.progress_interval
+        handler.atomic_publish = self.atomic_publish
+        return handler
+    
+    def spawn(self) -> Optional['FTPHandler']:
+        """
+        Otevře další spojení ke stejnému serveru (paralelní práce, která
+        nemění current_path tohoto spojení)
+        Returns: připojený handler nebo None
+        """
+        if not self.credentials:
+            return None
+        handler = self._clone()
+        success, message = handler.connect(*self.credentials)
+        if not success:
+            print(f"Další spojení se nepodařilo: {message}")
+            return None
+        return handler
+    
+    def _absolute(self, path: Optional[str]) -> str:
+        """Absolutní cesta na serveru (relativní vůči current_path, bez dotazu na server)"""
+        return self.dir_cache.absolute(path or '.', self.current_path)
+    
+    def get_features(self) -> Dict[str, str]:
         """
-        Vrátí seznam souborů a složek v daném adresáři
-        Returns: List of (name, is_directory)
+        Schopnosti serveru podle FEAT ({FUNKCE: parametry})
+        Zjišťuje se jednou za spojení; server bez FEAT má prázdný slovník.
+        """
+        if self.features is None:
+            try:
+                with self.lock:
+                    self.features = parse_feat(self.ftp.sendcmd('FEAT'))
+            except ftplib.error_perm:
+                self.features = {}
+        return self.features
+    
+    def _stat(self, path: str) -> Optional[Dict[str, str]]:
+        """
+        Fakta jedné položky bez CWD: MLST, pokud jej server umí, jinak výpis
+        nadřazené složky
+        Returns: fakta nebo None (položka neexistuje)
+        """
+        path = self._absolute(path)
+        if path == '/':
+            return {'type': 'dir'}
+        
+        if 'MLST' in self.get_features():
+            try:
+                with self.lock:
+                    return parse_mlst(self.ftp.sendcmd(f'MLST {path}'))
+            except ftplib.error_perm as e:
+                if not unsupported_reply(e):
+                    return None
+                del self.features['MLST']
+        
+        parent, name = posixpath.split(path)
+        for entry_name, facts in self.list_entries(parent):
+            if entry_name == name:
+                return facts
+        return None
+    
+    def list_entries(self, path: str = None) -> Listing:
+        """
+        Vrátí obsah adresáře i s metadaty
+        MLSD, pokud jej server inzeruje ve FEAT, jinak LIST s rozborem Unix/DOS
+        formátu - v obou případech fakta 'type', 'size' a 'modify' ve tvaru MLSD.
+        Returns: List of (name, facts); při chybě prázdný seznam
         """
         if not self.connected:
             return []
         
         try:
-            if path:
-                self.ftp.cwd(path)
-                self.current_path = self.ftp.pwd()
-            
-            items = []
-            
-            # Použijeme MLSD pokud je k dispozici, jinak LIST
-            try:
-                for name, facts in self.ftp.mlsd():
-                    if name in ['.', '..']:
-                        continue
-                    is_dir = facts.get('type', '') == 'dir'
-                    items.append((name, is_dir))
-            except:
-                # Fallback na starší metodu
-                lines = []
-                self.ftp.dir(lines.append)
-                for line in lines:
-                    parts = line.split()
-                    if len(parts) >= 9:
-                        name = ' '.join(parts[8:])
-                        is_dir = line.startswith('d')
-                        items.append((name, is_dir))
-            
-            return sorted(items, key=lambda x: (not x[1], x[0].lower()))
+            return self.fetch_entries(path)
         except Exception as e:
             print(f"Chyba při listování adresáře: {e}")
             return []
     
+    def fetch_entries(self, path: str = None) -> Listing:
+        """
+        Jako list_entries, ale chybu výpisu hlásí výjimkou - prázdnou složku
+        tak lze odlišit od neúspěšného LIST (procházení webu, katalog)
+        """
+        if not self.connected:
+            raise ConnectionError("Nepřipojeno")
+        
+        directory = self._absolute(path)
+        entries = None
+        with self.lock:
+            self._binary = False  # mlsd/retrlines posílají TYPE A
+            if 'MLSD' in self.get_features():
+                try:
+                    entries = [(name, facts) for name, facts in self.ftp.mlsd(directory)
+                               if name not in ('.', '..') and facts.get('type') not in ('cdir', 'pdir')]
+                except ftplib.error_perm as e:
+                    if not unsupported_reply(e):
+                        raise
+                    # Server MLSD inzeruje, ale neumí - dál už jen LIST
+                    del self.features['MLSD']
+            
+            if entries is None:
+                lines = []
+                self.ftp.retrlines(f'LIST {directory}', lines.append)
+                entries = parse_list(lines)
+        
+        self.dir_cache.add_listing(directory, [(name, facts.get('type') == 'dir') for name, facts in entries])
+        return entries
+    
+    def list_directory(self, path: str = None) -> RemoteListing:
+        """
+        Vrátí seznam souborů a složek v daném adresáři (složky první, podle názvu)
+        Returns: RemoteListing - položky se rozbalí i jako (name, is_directory)
+        """
+        return RemoteListing.from_listing(self.list_entries(path)).sorted_by('name')
+    
     def create_directory(self, dirname: str) -> Tuple[bool, str]:
         """Vytvoří nový adresář"""
         if not self.connected:
             return False, "Nepřipojeno"
         
+        path = self._absolute(dirname)
         try:
-            self.ftp.mkd(dirname)
+            with self.lock:
+                self.ftp.mkd(path)
+            self.dir_cache.add(path)
             return True, f"Složka '{dirname}' vytvořena"
         except ftplib.error_perm as e:
             if "exists" in str(e).lower():
+                self.dir_cache.add(path)
                 return True, f"Složka '{dirname}' již existuje"
             return False, f"Chyba: {str(e)}"
         except Exception as e:
             return False, f"Chyba při vytváření složky: {str(e)}"
     
+    def makedirs(self, paths: Iterable[str]) -> Tuple[bool, str]:
+        """
+        Vytvoří vzdálené složky včetně rodičů (relativní cesty vůči aktuální složce)
+        MKD se posílá jen pro složky, které nejsou v dir_cache, od kořene dolů -
+        na každou chybějící úroveň jeden příkaz, známé složky nestojí nic.
+        """
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        missing = self.dir_cache.missing(paths, self.current_path)
+        for path in missing:
+            success, message = self.create_directory(path)
+            # Ne každý server říká "exists" - ověř, zda složka přesto existuje
+            if not success:
+                if not self.path_exists(path):
+                    return False, message
+                self.dir_cache.add(path)
+        return True, f"Vytvořeno složek: {len(missing)}"
+    
+    def set_blocksize(self, blocksize: int):
+        """Nastaví velikost bloku přenosu (bajty)"""
+        self.blocksize = max(int(blocksize), 4096)
+    
+    def _progress_reporter(self, progress_callback: Optional[Callable[[int, int], None]], total: int):
+        """
+        Obalí progress_callback tak, aby se volal nejvýše jednou za progress_interval
+        (a vždy na konci přenosu)
+        """
+        if not progress_callback:
+            return None
+        last = [0.0]
+        
+        def report(done: int):
+            now = time.monotonic()
+            if done >= total or now - last[0] >= self.progress_interval:
+                last[0] = now
+                progress_callback(done, total)
+        return report
+    
+    def _throttling(self) -> bool:
+        """Je aktivní nějaké omezení rychlosti?"""
+        return bool(self.rate_limiter and any(self.rate_limiter.get_limits()))
+    
+    def _throttle(self, size: int, priority: str):
+        """Počká na volnou kapacitu v omezení rychlosti"""
+        if self.rate_limiter:
+            self.rate_limiter.consume(size, self.connection_name, priority)
+    
     def upload_file(self, local_path: str, remote_path: str, 
-                   progress_callback: Optional[Callable[[int, int], None]] = None) -> Tuple[bool, str]:
+                   progress_callback: Optional[Callable[[int, int], None]] = None,
+                   priority: str = 'bulk') -> Tuple[bool, str]:
         """
         Nahraje soubor na FTP
         progress_callback: funkce(bytes_uploaded, total_bytes)
+        priority: 'bulk' (hromadné nahrávání) nebo 'interactive' (přednost při omezení rychlosti)
         """
         if not self.connected:
             return False, "Nepřipojeno"
         
+        staging_path = self._staging_path(remote_path)
         try:
             file_size = os.path.getsize(local_path)
-            uploaded = [0]  # Použijeme list kvůli closure
+            report = self._progress_reporter(progress_callback, file_size)
             
-            def callback(data):
-                uploaded[0] += len(data)
-                if progress_callback:
-                    progress_callback(uploaded[0], file_size)
+            with open(local_path, 'rb') as f, self.lock:
+                self._send_file(f, file_size, f'STOR {staging_path}', report, priority)
             
-            with open(local_path, 'rb') as f:
-                self.ftp.storbinary(f'STOR {remote_path}', f, callback=callback)
-            
-            return True, "Nahráno"
+            return self._publish_staged(staging_path, remote_path)
         except Exception as e:
+            self._discard_staged(staging_path, remote_path)
             return False, f"Chyba při nahrávání: {str(e)}"
     
-    def upload_bytes(self, data: bytes, remote_path: str,
-                    progress_callback: Optional[Callable[[int, int], None]] = None) -> Tuple[bool, str]:
+    def upload_bytes(self, data: Union[bytes, memoryview], remote_path: str,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    priority: str = 'bulk') -> Tuple[bool, str]:
         """
-        Nahraje data (bytes) na FTP
+        Nahraje data (bytes nebo memoryview) na FTP
+        Data se posílají po řezech memoryview, bez kopie do BytesIO.
+        priority: 'bulk' (hromadné nahrávání) nebo 'interactive' (přednost při omezení rychlosti)
         """
         if not self.connected:
             return False, "Nepřipojeno"
         
+        staging_path = self._staging_path(remote_path)
         try:
-            file_size = len(data)
-            uploaded = [0]
+            view = memoryview(data).cast('B')
+            file_size = view.nbytes
+            report = self._progress_reporter(progress_callback, file_size)
             
-            def callback(chunk):
-                uploaded[0] += len(chunk)
-                if progress_callback:
-                    progress_callback(uploaded[0], file_size)
-            
-            bio = BytesIO(data)
-            self.ftp.storbinary(f'STOR {remote_path}', bio, callback=callback)
-            return True, "Nahráno"
+            with self.lock:
+                self._binary_mode()
+                with self.ftp.transfercmd(f'STOR {staging_path}') as conn:
+                    for offset in range(0, file_size, self.blocksize):
+                        block = view[offset:offset + self.blocksize]
+                        conn.sendall(block)
+                        self._throttle(len(block), priority)
+                        if report:
+                            report(offset + len(block))
+                    
+                    # FTP_TLS - ukonči TLS na datovém spojení stejně jako storbinary
+                    if hasattr(conn, 'unwrap'):
+                        conn.unwrap()
+                self.ftp.voidresp()
+            return self._publish_staged(staging_path, remote_path)
         except Exception as e:
+            self._discard_staged(staging_path, remote_path)
             return False, f"Chyba při nahrávání: {str(e)}"
     
-    def download_file(self, remote_path: str, local_path: str = None) -> Tuple[bool, bytes, str]:
+    def _staging_path(self, remote_path: str) -> str:
+        """
+        Absolutní cesta, kam se soubor skutečně nahrává - při atomic_publish
+        skrytý dočasný název ve stejné složce (bez přípony obrázku, takže ho
+        univerzální index ani prohlížení nevypíší)
+        """
+        path = self._absolute(remote_path)
+        if not self.atomic_publish:
+            return path
+        directory, name = posixpath.split(path)
+        return posixpath.join(directory, f".{name}.part")
+    
+    def _publish_staged(self, staging_path: str, remote_path: str) -> Tuple[bool, str]:
+        """Přejmenuje dokončený dočasný soubor na cílový název (jeden RNFR/RNTO)"""
+        target = self._absolute(remote_path)
+        if staging_path == target:
+            return True, "Nahráno"
+        success, message = self.rename(staging_path, target)
+        if not success:
+            self.delete_file(staging_path)
+            return False, message
+        return True, "Nahráno"
+    
+    def _discard_staged(self, staging_path: str, remote_path: str):
+        """Smaže nedokončený dočasný soubor po neúspěšném přenosu"""
+        if staging_path != self._absolute(remote_path):
+            self.delete_file(staging_path)
+    
+    def _binary_mode(self):
+        """Přepne na TYPE I, jen pokud ho výpis mezitím nezměnil (ušetří příkaz na soubor)"""
+        if not self._binary:
+            self.ftp.voidcmd('TYPE I')
+            self._binary = True
+    
+    def _send_file(self, f, file_size: int, command: str, report, priority: str):
+        """
+        Odešle otevřený soubor datovým spojením přes socket.sendfile (os.sendfile)
+        bez kopírování do Pythonu. Po blocích jen pokud je potřeba omezení
+        rychlosti nebo hlášení průběhu, jinak jedním voláním.
+        """
+        self._binary_mode()
+        with self.ftp.transfercmd(command) as conn:
+            if report is None and not self._throttling():
+                conn.sendfile(f)
+            else:
+                sent = 0
+                while sent < file_size:
+                    count = conn.sendfile(f, sent, min(self.blocksize, file_size - sent))
+                    if not count:
+                        break
+                    sent += count
+                    self._throttle(count, priority)
+                    if report:
+                        report(sent)
+            
+            # FTP_TLS - ukonči TLS na datovém spojení stejně jako storbinary
+            if hasattr(conn, 'unwrap'):
+                conn.unwrap()
+        self.ftp.voidresp()
+    
+    def download_file(self, remote_path: str, local_path: str = None,
+                      priority: str = 'interactive') -> Tuple[bool, bytes, str]:
         """
         Stáhne soubor z FTP
+        priority: náhledy jsou interaktivní a mají přednost před hromadným nahráváním
         Returns: (success, data, message)
         """
         if not self.connected:
@@ -151,7 +411,14 @@ class FTPHandler:
         
         try:
             bio = BytesIO()
-            self.ftp.retrbinary(f'RETR {remote_path}', bio.write)
+            
+            def callback(chunk):
+                self._throttle(len(chunk), priority)
+                bio.write(chunk)
+            
+            with self.lock:
+                self.ftp.retrbinary(f'RETR {self._absolute(remote_path)}', callback, self.blocksize)
+                self._binary = True
             data = bio.getvalue()
             
             if local_path:
@@ -168,30 +435,71 @@ class FTPHandler:
             return False, "Nepřipojeno"
         
         try:
-            self.ftp.delete(remote_path)
+            with self.lock:
+                self.ftp.delete(self._absolute(remote_path))
             return True, "Smazáno"
         except Exception as e:
             return False, f"Chyba při mazání: {str(e)}"
     
+    def rename(self, from_path: str, to_path: str) -> Tuple[bool, str]:
+        """
+        Přejmenuje soubor (RNFR/RNTO); existující cíl se přepíše
+        Servery, které cíl nepřepíší (např. IIS), odmítnou RNTO - pak se
+        existující cíl smaže a přejmenování zopakuje. Selže-li už RNFR
+        (zdroj chybí, chybí práva), cíl se nikdy nemaže.
+        """
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        source, target = self._absolute(from_path), self._absolute(to_path)
+        try:
+            with self.lock:
+                self.ftp.sendcmd(f'RNFR {source}')
+                try:
+                    self.ftp.voidcmd(f'RNTO {target}')
+                except ftplib.error_perm as e:
+                    if (self._stat(target) or {}).get('type') != 'file':
+                        raise
+                    try:
+                        self.ftp.delete(target)
+                    except ftplib.error_perm:
+                        raise e
+                    self.ftp.sendcmd(f'RNFR {source}')
+                    self.ftp.voidcmd(f'RNTO {target}')
+            return True, "Přejmenováno"
+        except Exception as e:
+            return False, f"Chyba při přejmenování: {str(e)}"
+    
     def delete_directory(self, dirname: str) -> Tuple[bool, str]:
         """Smaže prázdný adresář"""
         if not self.connected:
             return False, "Nepřipojeno"
         
         try:
-            self.ftp.rmd(dirname)
+            path = self._absolute(dirname)
+            with self.lock:
+                self.ftp.rmd(path)
+            self.dir_cache.discard(path)
             return True, "Složka smazána"
         except Exception as e:
             return False, f"Chyba při mazání složky: {str(e)}"
     
     def change_directory(self, path: str) -> Tuple[bool, str]:
-        """Změní aktuální adresář"""
+        """
+        Změní aktuální adresář (jen na straně klienta - známá složka nestojí
+        žádný příkaz, jinak jeden MLST nebo výpis nadřazené složky)
+        """
         if not self.connected:
             return False, "Nepřipojeno"
         
         try:
-            self.ftp.cwd(path)
-            self.current_path = self.ftp.pwd()
+            target = self._absolute(path)
+            if not self.dir_cache.is_known(target):
+                facts = self._stat(target)
+                if not facts or facts.get('type', '').lower() != 'dir':
+                    return False, f"Chyba: složka '{target}' neexistuje"
+                self.dir_cache.add(target)
+            self.current_path = target
             return True, self.current_path
         except Exception as e:
             return False, f"Chyba: {str(e)}"
@@ -201,15 +509,15 @@ class FTPHandler:
         return self.current_path if self.connected else ""
     
     def path_exists(self, path: str) -> bool:
-        """Zkontroluje, zda cesta existuje"""
+        """Zkontroluje, zda cesta existuje (a je to složka)"""
         if not self.connected:
             return False
         
         try:
-            current = self.ftp.pwd()
-            self.ftp.cwd(path)
-            self.ftp.cwd(current)
-            return True
+            if self.dir_cache.is_known(path, self.current_path):
+                return True
+            facts = self._stat(path)
+            return bool(facts) and facts.get('type', '').lower() == 'dir'
         except:
             return False
     
@@ -222,19 +530,84 @@ class FTPHandler:
             return False, []
         
         try:
-            if path:
-                current = self.ftp.pwd()
-                self.ftp.cwd(path)
-            
-            items = self.list_directory()
-            folder_names = [name.lower() for name, is_dir in items if is_dir]
+            items = self.list_directory(path)
+            folder_names = [name.lower() for name in items.dirs().names()]
             
             expected = ['thumbnail', 'original', 'compress']
             found = [f for f in expected if f in folder_names]
             
-            if path:
-                self.ftp.cwd(current)
-            
             return len(found) == 3, found
         except:
             return False, []
+
+
+class _ReusedSessionFTP_TLS(ftplib.FTP_TLS):
+    """
+    FTP_TLS, které na datových spojeních obnovuje TLS session řídicího spojení
+    Ušetří plný handshake na každý přenesený soubor; servery s require_ssl_reuse
+    (vsftpd, ProFTPD, FileZilla Server) jej navíc vyžadují.
+    """
+    
+    reuse_session = True
+    
+    def ntransfercmd(self, cmd, rest=None):
+        conn, size = ftplib.FTP.ntransfercmd(self, cmd, rest)
+        if self._prot_p:
+            # close_notify po datech je malý zápis - s Nagle by čekal na zpožděný ACK (~40 ms/soubor)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = self.context.wrap_socket(conn, server_hostname=self.host,
+                                            session=self.sock.session if self.reuse_session else None)
+        return conn, size
+
+
+class FTPSHandler(FTPHandler):
+    """FTP přes TLS (explicitní AUTH TLS, šifrovaná i datová spojení)"""
+    
+    backend = 'ftps'
+    
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        super().__init__(rate_limiter)
+        self.ssl_context = ssl_context or ssl.create_default_context()
+    
+    def _create_ftp(self) -> ftplib.FTP:
+        return _ReusedSessionFTP_TLS(context=self.ssl_context)
+    
+    def _clone(self) -> 'FTPSHandler':
+        handler = super()._clone()
+        handler.ssl_context = self.ssl_context
+        return handler
+    
+    def connect(self, host: str, port: int, username: str, password: str) -> Tuple[bool, str]:
+        """
+        Připojí se k FTPS serveru (login() provede AUTH TLS, PROT P šifruje data)
+        Returns: (success, message)
+        """
+        success, message = super().connect(host, port, username, password)
+        if not success:
+            return success, message
+        
+        try:
+            self.ftp.prot_p()
+            return True, message
+        except Exception as e:
+            self.disconnect()
+            return False, f"Chyba TLS: {str(e)}"
+
+
+def create_ftp_handler(backend: str = 'ftplib', rate_limiter: Optional[RateLimiter] = None):
+    """
+    Vytvoří FTP handler pro zvolený backend
+    Args:
+        backend: 'ftplib' (vlákna, výchozí), 'asyncio' (core.async_ftp),
+                 'ftps' (FTP přes TLS) nebo 'sftp' (core.sftp_handler, vyžaduje paramiko)
+    """
+    if backend == 'asyncio':
+        from core.async_ftp import AsyncFTPHandler
+        return AsyncFTPHandler(rate_limiter)
+    if backend == 'ftps':
+        return FTPSHandler(rate_limiter)
+    if backend == 'sftp':
+        from core.sftp_handler import SFTPHandler
+        return SFTPHandler(rate_limiter)
+    return FTPHandler(rate_limiter)
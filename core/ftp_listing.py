@@ -0,0 +1,166 @@
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Výpis složky jako [(název, fakta)], fakta ve tvaru MLSD:
+# 'type' (file/dir/OS.unix=slink), 'size' (bajty), 'modify' (YYYYMMDDHHMMSS)
+Listing = List[Tuple[str, Dict[str, str]]]
+
+MONTHS = {name: number for number, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)}
+
+# drwxr-xr-x   2 owner  group   4096 Jan  5 12:00 název s  mezerami
+# -rw-r--r--   1 owner          1234 Jan  5  2020 název (bez skupiny)
+# crw-rw-rw-   1 root   root   1,  3 Jan  5  2020 null (zařízení - velikost "major, minor")
+_UNIX_RE = re.compile(
+    r'^(?P<mode>[-dlbcps][-rwxsStTlL]{9})[+@.]?\s+'
+    r'.*?(?P<size>\d+)\s+'
+    r'(?P<month>[^\W\d_]{3,4})\.?\s+(?P<day>\d{1,2})\s+'
+    r'(?:(?P<hour>\d{1,2}):(?P<minute>\d{2})|(?P<year>\d{4}))\s'
+    r'(?P<name>.+)$'
+)
+
+# 01-15-20  03:45PM       <DIR>          název
+# 01-15-2020  15:45           12345 název
+_DOS_RE = re.compile(
+    r'^(?P<month>\d{2})-(?P<day>\d{2})-(?P<year>\d{2}|\d{4})\s+'
+    r'(?P<hour>\d{1,2}):(?P<minute>\d{2})\s*(?P<ampm>[AaPp][Mm])?\s+'
+    r'(?P<size><DIR>|\d+)\s+(?P<name>.+)$'
+)
+
+
+def parse_feat(response: str) -> Dict[str, str]:
+    """
+    Rozebere odpověď na FEAT
+    Returns: {FUNKCE: parametry}, např. {'MLSD': '', 'MLST': 'type*;size*;modify*;'}
+    """
+    features = {}
+    for line in response.splitlines()[1:]:
+        if line[:3].isdigit():  # Závěrečný řádek "211 End"
+            continue
+        name, _, params = line.strip().partition(' ')
+        if name:
+            features[name.upper()] = params.strip()
+    return features
+
+
+def unsupported_reply(error) -> bool:
+    """Odpověď 500/502/504 = server příkaz nezná (550 apod. se týká cesty)"""
+    return str(error)[:3] in ('500', '502', '504')
+
+
+def parse_facts(text: str) -> Dict[str, str]:
+    """Rozebere fakta MLSD/MLST "fakt=hodnota;..." (klíče malými písmeny)"""
+    facts = {}
+    for fact in text.rstrip(';').split(';'):
+        key, _, value = fact.partition('=')
+        if key:
+            facts[key.lower()] = value
+    return facts
+
+
+def parse_mlsd(lines: Iterable[str]) -> Listing:
+    """Rozebere výpis MLSD ("fakt=hodnota;...; název"), bez "." a ".." (cdir/pdir)"""
+    entries = []
+    for line in lines:
+        facts_text, _, name = line.rstrip('\r\n').partition(' ')
+        if not name:
+            continue
+        facts = parse_facts(facts_text)
+        if name not in ('.', '..') and facts.get('type') not in ('cdir', 'pdir'):
+            entries.append((name, facts))
+    return entries
+
+
+def parse_mlst(response: str) -> Dict[str, str]:
+    """
+    Rozebere odpověď na MLST ("250-...", " fakta; /cesta", "250 End")
+    Typ cdir (některé servery jej vrací pro složku samotnou) se hlásí jako dir.
+    """
+    for line in response.splitlines()[1:]:
+        if line.startswith(' '):
+            facts = parse_facts(line.strip().partition(' ')[0])
+            if facts.get('type') in ('cdir', 'pdir'):
+                facts['type'] = 'dir'
+            return facts
+    return {}
+
+
+def _modify(year: int, month: int, day: int, hour: int = 0, minute: int = 0) -> str:
+    return f"{year:04d}{month:02d}{day:02d}{hour:02d}{minute:02d}00"
+
+
+def parse_unix_line(line: str, now: Optional[float] = None) -> Optional[Tuple[str, Dict[str, str]]]:
+    """Řádek výpisu ve stylu ls -l. Returns: (název, fakta) nebo None"""
+    match = _UNIX_RE.match(line)
+    if not match:
+        return None
+    
+    mode = match.group('mode')
+    name = match.group('name')
+    facts = {'unix.mode': mode}
+    if mode[0] == 'd':
+        facts['type'] = 'dir'
+    elif mode[0] == 'l':
+        facts['type'] = 'OS.unix=slink'
+        name, _, target = name.partition(' -> ')
+        facts['target'] = target
+    else:
+        facts['type'] = 'file'
+        facts['size'] = match.group('size')
+    
+    month = MONTHS.get(match.group('month')[:3].lower())
+    if month:
+        day = int(match.group('day'))
+        if match.group('year'):
+            facts['modify'] = _modify(int(match.group('year')), month, day)
+        else:
+            # Bez roku = posledních ~6 měsíců; datum v budoucnosti patří do loňska
+            current = time.gmtime(now)
+            year = current.tm_year
+            if (month, day) > (current.tm_mon, current.tm_mday + 1):
+                year -= 1
+            facts['modify'] = _modify(year, month, day, int(match.group('hour')), int(match.group('minute')))
+    return name, facts
+
+
+def parse_dos_line(line: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """Řádek výpisu ve stylu Windows/IIS. Returns: (název, fakta) nebo None"""
+    match = _DOS_RE.match(line)
+    if not match:
+        return None
+    
+    year = int(match.group('year'))
+    if year < 100:
+        year += 2000 if year < 70 else 1900
+    hour = int(match.group('hour'))
+    ampm = (match.group('ampm') or '').upper()
+    if ampm == 'PM' and hour < 12:
+        hour += 12
+    elif ampm == 'AM' and hour == 12:
+        hour = 0
+    
+    facts = {'modify': _modify(year, int(match.group('month')), int(match.group('day')),
+                               hour, int(match.group('minute')))}
+    if match.group('size') == '<DIR>':
+        facts['type'] = 'dir'
+    else:
+        facts['type'] = 'file'
+        facts['size'] = match.group('size')
+    return match.group('name'), facts
+
+
+def parse_list(lines: Iterable[str], now: Optional[float] = None) -> Listing:
+    """
+    Rozebere výpis LIST (Unix i DOS formát, řádky lze míchat)
+    Řádky "total N", "." a ".." a nerozpoznané řádky se vynechají.
+    """
+    entries = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line or line.startswith('total '):
+            continue
+        entry = parse_unix_line(line, now) or parse_dos_line(line)
+        if entry and entry[0] not in ('.', '..'):
+            entries.append(entry)
+    return entries
@@ -1,96 +1,595 @@
-from PIL import Image
+from PIL import Image, features
+from contextlib import nullcontext
 from io import BytesIO
 import os
-from typing import Tuple, Optional
+import time
+from typing import Tuple, Optional, List, Union
+from core.image_quality import ssim
+from core.perceptual_hash import dhash
+
+
+# Zakódovaná data: memoryview nad bufferem kodéru (bez kopie), nebo bytes
+EncodedData = Union[bytes, memoryview]
 
 
 class ImageProcessor:
     """Třída pro zpracování obrázků - vytváření thumbnailů a komprimace"""
     
     # Podporované formáty
-    SUPPORTED_FORMATS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+    SUPPORTED_FORMATS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.avif')
+    
+    # Výstupní formáty: název -> (formát pro Pillow, přípona souboru)
+    OUTPUT_FORMATS = {
+        'jpeg': ('JPEG', '.jpg'),
+        'png': ('PNG', '.png'),
+        'webp': ('WEBP', '.webp'),
+        'avif': ('AVIF', '.avif'),
+    }
+    
+    # Formáty, ke kterým má smysl nahrávat JPEG zálohu pro starší prohlížeče
+    MODERN_FORMATS = ('webp', 'avif')
+    
+    # Úsilí kodéru: extra Huffmanův průchod (optimize), progresivní JPEG,
+    # podvzorkování barev (0 = 4:4:4, 1 = 4:2:2, 2 = 4:2:0), úroveň PNG,
+    # WebP method a AVIF speed (None = podle format_settings)
+    EFFORT_PRESETS = {
+        'fast': {'optimize': False, 'progressive': False, 'subsampling': 2,
+                 'compress_level': 3, 'method': 2, 'speed': 8},
+        'balanced': {'optimize': True, 'progressive': False, 'subsampling': 2,
+                     'compress_level': 6, 'method': None, 'speed': None},
+        'max': {'optimize': True, 'progressive': True, 'subsampling': 2,
+                'compress_level': 9, 'method': 6, 'speed': 4},
+    }
+    
+    SUBSAMPLING = {'4:4:4': 0, '4:2:2': 1, '4:2:0': 2}
+    
+    # EXIF Orientation -> transpozice, která obrázek narovná
+    ORIENTATION_TAG = 0x0112
+    ORIENTATION_TRANSPOSE = {
+        2: Image.Transpose.FLIP_LEFT_RIGHT,
+        3: Image.Transpose.ROTATE_180,
+        4: Image.Transpose.FLIP_TOP_BOTTOM,
+        5: Image.Transpose.TRANSPOSE,
+        6: Image.Transpose.ROTATE_270,
+        7: Image.Transpose.TRANSVERSE,
+        8: Image.Transpose.ROTATE_90,
+    }
     
-    def __init__(self, thumbnail_size: int = 400, compress_quality: int = 85):
+    # EXIF tagy ponechané v režimu 'minimal' - popis snímku bez GPS,
+    # MakerNote a vloženého náhledu (IFD0 a Exif IFD)
+    EXIF_IFD = 0x8769
+    MINIMAL_EXIF_TAGS = (0x010F, 0x0110, 0x0132, 0x013B, 0x8298)  # Make, Model, DateTime, Artist, Copyright
+    MINIMAL_EXIF_IFD_TAGS = (0x829A, 0x829D, 0x8827, 0x9003, 0x920A, 0xA434)  # expozice, clona, ISO, datum, ohnisko, objektiv
+    
+    def __init__(self, thumbnail_size: int = 400, compress_quality: int = 85,
+                 output_format: str = 'auto', jpeg_fallback: bool = False):
         """
         Args:
             thumbnail_size: maximální rozměr thumbnailů (px)
             compress_quality: kvalita komprimace (1-100)
+            output_format: výstupní formát ('auto', 'jpeg', 'png', 'webp', 'avif');
+                'auto' zachová JPEG, resp. PNG pro .png soubory
+            jpeg_fallback: u WebP/AVIF nahrávat navíc i JPEG verzi
         """
         self.thumbnail_size = thumbnail_size
         self.compress_quality = compress_quality
+        self.output_format = output_format
+        self.jpeg_fallback = jpeg_fallback
+        
+        # Nastavení moderních formátů (JPEG používá compress_quality)
+        # method: 0 (nejrychlejší) - 6 (nejmenší soubory)
+        # speed: 0 (nejpomalejší, nejmenší soubory) - 10 (nejrychlejší)
+        self.format_settings = {
+            'webp': {'quality': 80, 'method': 4},
+            'avif': {'quality': 60, 'speed': 6},
+        }
+        
+        # Komprimace PNG - časový limit pro zkoušení kandidátů (s)
+        # a zda je povoleno ztrátové kódování (paleta, WebP, JPEG)
+        self.png_time_budget = 2.0
+        self.png_allow_lossy = True
+        
+        # Adaptivní kvalita JPEG: 'fixed' (compress_quality), 'target_size'
+        # (cílová velikost v kB) nebo 'ssim' (minimální SSIM vůči originálu)
+        self.quality_mode = 'fixed'
+        self.target_size_kb = 500
+        self.min_ssim = 0.95
+        self.quality_range = (40, 95)
+        self.probe_size = 768  # max. rozměr zmenšené sondy pro hledání kvality
+        
+        # Úsilí kodéru pro jednotlivé varianty; progressive/subsampling
+        # None = podle presetu, jinak přepíše preset
+        self.encoder_settings = {
+            'thumbnail': {'effort': 'fast', 'progressive': None, 'subsampling': None},
+            'compress': {'effort': 'balanced', 'progressive': None, 'subsampling': None},
+        }
+        
+        # Orientace komprimované verze: 'rotate' (otočí pixely, Orientation = 1)
+        # nebo 'tag' (pixely beze změny, Orientation se zachová v EXIF)
+        self.orientation_mode = 'rotate'
+        
+        # Volitelný sběr metrik (core.metrics.TransferMetrics), None = neměřit
+        self.metrics = None
+        # Metadata komprimované verze: EXIF 'strip' / 'minimal' / 'keep', ICC profil ano/ne
+        # (thumbnaily dostávají jen ICC profil)
+        self.exif_policy = 'minimal'
+        self.keep_icc = True
     
     @staticmethod
     def is_image(filename: str) -> bool:
         """Zkontroluje, zda je soubor obrázek"""
         return filename.lower().endswith(ImageProcessor.SUPPORTED_FORMATS)
     
-    def create_thumbnail(self, image_path: str) -> Tuple[bool, Optional[bytes], str]:
+    @staticmethod
+    def is_format_available(output_format: str) -> bool:
+        """Zkontroluje, zda Pillow umí zapisovat daný výstupní formát"""
+        if output_format in ('jpeg', 'png'):
+            return True
+        if output_format in ('webp', 'avif'):
+            try:
+                return bool(features.check(output_format))
+            except Exception:
+                return False
+        return False
+    
+    @staticmethod
+    def get_available_formats() -> List[str]:
+        """Vrátí seznam výstupních formátů podporovaných touto instalací Pillow"""
+        return [fmt for fmt in ImageProcessor.OUTPUT_FORMATS
+                if ImageProcessor.is_format_available(fmt)]
+    
+    def resolve_format(self, image_path: str, output_format: Optional[str] = None) -> str:
+        """
+        Určí skutečný výstupní formát pro daný soubor
+        Returns: 'jpeg', 'png', 'webp' nebo 'avif'
+        """
+        output_format = output_format or self.output_format
+        if output_format == 'auto' or not self.is_format_available(output_format):
+            return 'png' if image_path.lower().endswith('.png') else 'jpeg'
+        return output_format
+    
+    def get_output_formats(self, image_path: str) -> List[str]:
+        """
+        Vrátí seznam formátů, které se mají pro soubor vytvořit
+        Primární formát je vždy první, případná JPEG záloha následuje.
+        """
+        primary = self.resolve_format(image_path)
+        formats = [primary]
+        if self.jpeg_fallback and primary in self.MODERN_FORMATS:
+            formats.append('jpeg')
+        return formats
+    
+    def output_filename(self, filename: str, output_format: str) -> str:
+        """
+        Vrátí název souboru pro danou variantu
+        Soubory v automatickém formátu si ponechávají původní název,
+        ostatní dostanou příponu podle výstupního formátu.
+        """
+        if output_format == self.resolve_format(filename, 'auto'):
+            return filename
+        stem = os.path.splitext(filename)[0]
+        return stem + self.OUTPUT_FORMATS[output_format][1]
+    
+    @staticmethod
+    def format_from_filename(filename: str) -> str:
+        """Určí výstupní formát podle přípony souboru (neznámé přípony vrací bez tečky)"""
+        ext = os.path.splitext(filename)[1].lower()
+        if ext in ('.jpg', '.jpeg'):
+            return 'jpeg'
+        return ext.lstrip('.')
+    
+    @staticmethod
+    def format_priority(filename: str) -> int:
+        """Pořadí pro řazení variant - moderní formáty mají přednost"""
+        output_format = ImageProcessor.format_from_filename(filename)
+        if output_format in ImageProcessor.MODERN_FORMATS:
+            return ImageProcessor.MODERN_FORMATS.index(output_format)
+        return len(ImageProcessor.MODERN_FORMATS)
+    
+    def _prepare_image(self, img: Image.Image, output_format: str) -> Image.Image:
+        """Převede obrázek do režimu vhodného pro výstupní formát"""
+        # WebP a AVIF umí průhlednost, není třeba ji zahazovat
+        if output_format in self.MODERN_FORMATS:
+            if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+                return img.convert('RGBA') if img.mode != 'RGBA' else img
+            if img.mode not in ('RGB', 'L'):
+                return img.convert('RGB')
+            return img
+        
+        # Konverze RGBA na RGB pokud potřeba (kvůli JPEG)
+        if img.mode == 'RGBA':
+            # Vytvoř bílé pozadí
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[3])  # Alpha channel jako maska
+            return background
+        if img.mode not in ('RGB', 'L'):
+            return img.convert('RGB')
+        return img
+    
+    def encoder_params(self, output_format: str, variant: str = 'compress',
+                       quality: Optional[int] = None) -> dict:
+        """
+        Sestaví parametry pro Image.save() podle formátu a úsilí kodéru varianty
+        variant: 'thumbnail' nebo 'compress'
+        quality: přepíše kvalitu JPEG (jinak compress_quality)
+        """
+        settings = self.encoder_settings.get(variant, self.encoder_settings['compress'])
+        preset = self.EFFORT_PRESETS[settings['effort']]
+        
+        if output_format == 'jpeg':
+            progressive = settings['progressive']
+            subsampling = settings['subsampling']
+            return {
+                'quality': quality or self.compress_quality,
+                'optimize': preset['optimize'],
+                'progressive': preset['progressive'] if progressive is None else progressive,
+                'subsampling': preset['subsampling'] if subsampling is None else subsampling,
+            }
+        if output_format == 'png':
+            if settings['effort'] == 'max':
+                return {'optimize': True}
+            return {'compress_level': preset['compress_level']}
+        
+        params = dict(self.format_settings[output_format])
+        key = 'method' if output_format == 'webp' else 'speed'
+        if preset[key] is not None:
+            params[key] = preset[key]
+        return params
+    
+    def _save_image(self, img: Image.Image, output: BytesIO, output_format: str,
+                    quality: Optional[int] = None, variant: str = 'compress',
+                    metadata: Optional[dict] = None):
+        """
+        Uloží obrázek ve zvoleném formátu s nastavením pro daný formát
+        quality: přepíše kvalitu JPEG (jinak compress_quality)
+        variant: určuje úsilí kodéru ('thumbnail' nebo 'compress')
+        metadata: parametry exif/icc_profile z _metadata_params()
+        """
+        pil_format = self.OUTPUT_FORMATS[output_format][0]
+        params = self.encoder_params(output_format, variant, quality)
+        params.update(metadata or {})
+        img.save(output, format=pil_format, **params)
+    
+    @classmethod
+    def get_orientation(cls, img: Image.Image) -> int:
+        """Vrátí hodnotu EXIF Orientation (1 = bez otočení)"""
+        try:
+            orientation = img.getexif().get(cls.ORIENTATION_TAG, 1)
+        except Exception:
+            return 1
+        return orientation if orientation in cls.ORIENTATION_TRANSPOSE else 1
+    
+    @classmethod
+    def apply_orientation(cls, img: Image.Image, orientation: int) -> Image.Image:
+        """Narovná obrázek podle EXIF Orientation (transpozice pixelů je bezeztrátová)"""
+        method = cls.ORIENTATION_TRANSPOSE.get(orientation)
+        return img.transpose(method) if method is not None else img
+    
+    def _metadata_params(self, img: Image.Image, variant: str, orientation: int) -> dict:
+        """
+        Sestaví parametry exif/icc_profile pro uložení podle nastavení metadat
+        Musí se volat na původním obrázku (konverze režimu metadata zahodí).
+        orientation: hodnota Orientation, která se má zapsat (1 = tag vynechat)
+        """
+        params = {}
+        icc_profile = img.info.get('icc_profile')
+        if icc_profile and self.keep_icc:
+            params['icc_profile'] = icc_profile
+        
+        if variant == 'thumbnail':
+            return params
+        
+        # 'strip' = prázdné EXIF, nanejvýš s Orientation v režimu 'tag'
+        source = img.getexif()
+        exif = Image.Exif()
+        if self.exif_policy == 'keep':
+            exif.load(source.tobytes())
+        elif self.exif_policy == 'minimal':
+            for tag in self.MINIMAL_EXIF_TAGS:
+                if tag in source:
+                    exif[tag] = source[tag]
+            source_ifd = source.get_ifd(self.EXIF_IFD)
+            exif_ifd = {tag: source_ifd[tag] for tag in self.MINIMAL_EXIF_IFD_TAGS if tag in source_ifd}
+            if exif_ifd:
+                exif.get_ifd(self.EXIF_IFD).update(exif_ifd)
+        
+        if orientation != 1:
+            exif[self.ORIENTATION_TAG] = orientation
+        elif self.ORIENTATION_TAG in exif:
+            del exif[self.ORIENTATION_TAG]
+        
+        if len(exif) or exif.get_ifd(self.EXIF_IFD):
+            params['exif'] = exif.tobytes()
+        return params
+    
+    def _make_probe(self, img: Image.Image) -> Image.Image:
+        """Vytvoří zmenšenou sondu pro hledání kvality"""
+        probe = img.copy()
+        probe.thumbnail((self.probe_size, self.probe_size), Image.Resampling.BILINEAR)
+        return probe
+    
+    def find_adaptive_quality(self, img: Image.Image, probe: Optional[Image.Image] = None,
+                              size_scale: Optional[float] = None) -> int:
+        """
+        Najde kvalitu JPEG pro daný obrázek podle quality_mode
+        Binární hledání běží na zmenšené sondě, takže je levné i pro velké fotky:
+        - 'target_size': nejvyšší kvalita, při které odhad plné velikosti nepřekročí cíl
+        - 'ssim': nejnižší kvalita, při které SSIM sondy dosáhne min_ssim
+        size_scale: poměr velikosti plné verze a sondy (jinak odhad z počtu pixelů)
+        Returns: kvalita (1-100)
+        """
+        if self.quality_mode not in ('target_size', 'ssim'):
+            return self.compress_quality
+        
+        if probe is None:
+            probe = self._make_probe(img)
+        # Velikost souboru roste zhruba s počtem pixelů
+        scale = size_scale or (img.width * img.height) / float(probe.width * probe.height)
+        target_bytes = self.target_size_kb * 1024
+        
+        low, high = self.quality_range
+        best = low if self.quality_mode == 'target_size' else high
+        while low <= high:
+            quality = (low + high) // 2
+            output = BytesIO()
+            probe.save(output, format='JPEG', quality=quality)
+            
+            if self.quality_mode == 'target_size':
+                # Hledáme nejvyšší kvalitu, která se vejde
+                if output.tell() * scale <= target_bytes:
+                    best, low = quality, quality + 1
+                else:
+                    high = quality - 1
+            else:
+                # Hledáme nejnižší kvalitu, která splní SSIM
+                output.seek(0)
+                with Image.open(output) as decoded:
+                    score = ssim(probe, decoded)
+                if score >= self.min_ssim:
+                    best, high = quality, quality - 1
+                else:
+                    low = quality + 1
+        
+        return best
+    
+    def create_thumbnail(self, image_path: str,
+                         output_format: Optional[str] = None) -> Tuple[bool, Optional[EncodedData], str]:
         """
         Vytvoří thumbnail z obrázku
+        Args:
+            output_format: výstupní formát, None = podle nastavení
         Returns: (success, thumbnail_bytes, message)
         """
+        success, data, perceptual_hash, message = self.create_thumbnail_with_hash(image_path, output_format)
+        return success, data, message
+    
+    def create_thumbnail_with_hash(self, image_path: str,
+                                   output_format: Optional[str] = None) -> Tuple[bool, Optional[EncodedData], Optional[int], str]:
+        """
+        Vytvoří thumbnail a z již zmenšeného obrázku spočítá perceptuální hash
+        Args:
+            output_format: výstupní formát, None = podle nastavení
+        Returns: (success, thumbnail_bytes, dhash, message)
+        """
         try:
             with Image.open(image_path) as img:
-                # Konverze RGBA na RGB pokud potřeba (kvůli JPEG)
-                if img.mode == 'RGBA':
-                    # Vytvoř bílé pozadí
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3])  # Alpha channel jako maska
-                    img = background
-                elif img.mode not in ('RGB', 'L'):
-                    img = img.convert('RGB')
+                with self._stage('thumbnail.decode'):
+                    # JPEG se dekóduje rovnou zmenšený (škálování DCT, 1/2 až 1/8) -
+                    # draft() musí přijít před load(), jinak nemá účinek. Rezerva
+                    # 2x (jako reducing_gap v Image.thumbnail) zachová kvalitu LANCZOS.
+                    img.draft(None, (self.thumbnail_size * 2, self.thumbnail_size * 2))
+                    img.load()
+                
+                # Urči formát
+                output_format = self.resolve_format(image_path, output_format)
+                orientation = self.get_orientation(img)
+                metadata = self._metadata_params(img, 'thumbnail', 1)
                 
-                # Vypočítej nové rozměry (zachovej poměr stran)
-                img.thumbnail((self.thumbnail_size, self.thumbnail_size), Image.Resampling.LANCZOS)
+                with self._stage('thumbnail.resize'):
+                    img = self._prepare_image(img, output_format)
+                    
+                    # Vypočítej nové rozměry (zachovej poměr stran)
+                    img.thumbnail((self.thumbnail_size, self.thumbnail_size), Image.Resampling.LANCZOS)
+                    
+                    # Otoč až zmenšený obrázek - transpozice thumbnailu je levná
+                    img = self.apply_orientation(img, orientation)
+                    perceptual_hash = dhash(img)
                 
                 # Ulož do BytesIO
                 output = BytesIO()
+                with self._stage('thumbnail.encode') as stage:
+                    self._save_image(img, output, output_format, variant='thumbnail', metadata=metadata)
+                    stage['bytes'] = output.tell()
                 
-                # Urči formát
-                format_to_save = 'JPEG'
-                if image_path.lower().endswith('.png'):
-                    format_to_save = 'PNG'
-                
-                img.save(output, format=format_to_save, quality=self.compress_quality, optimize=True)
-                
-                return True, output.getvalue(), "Thumbnail vytvořen"
+                # getbuffer() místo getvalue() - data se nekopírují
+                return True, output.getbuffer(), perceptual_hash, "Thumbnail vytvořen"
         
         except Exception as e:
-            return False, None, f"Chyba při vytváření thumbnailů: {str(e)}"
+            return False, None, None, f"Chyba při vytváření thumbnailů: {str(e)}"
     
-    def compress_image(self, image_path: str) -> Tuple[bool, Optional[bytes], str]:
+    def compress_image(self, image_path: str,
+                       output_format: Optional[str] = None) -> Tuple[bool, Optional[EncodedData], str]:
         """
         Zkomprimuje obrázek
+        Args:
+            output_format: výstupní formát, None = podle nastavení
         Returns: (success, compressed_bytes, message)
         """
+        success, data, output_format, message = self.compress_variant(image_path, output_format)
+        return success, data, message
+    
+    def compress_variant(self, image_path: str,
+                         output_format: Optional[str] = None) -> Tuple[bool, Optional[EncodedData], str, str]:
+        """
+        Zkomprimuje obrázek a vrátí i skutečně použitý formát
+        U PNG se může výsledný formát lišit od požadovaného (vyhraje nejmenší kandidát).
+        Pokud komprimace nic neušetří a metadata se mají zachovat celá (exif_policy
+        'keep'), vrátí původní data souboru; jinak zůstane překódovaná verze, aby
+        se do komprimované verze nedostalo EXIF (např. GPS), které nastavení vyřazuje.
+        Returns: (success, compressed_bytes, output_format, message)
+        """
         try:
             with Image.open(image_path) as img:
-                # Konverze RGBA na RGB pokud potřeba
-                if img.mode == 'RGBA':
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3])
-                    img = background
-                elif img.mode not in ('RGB', 'L'):
-                    img = img.convert('RGB')
-                
-                output = BytesIO()
+                with self._stage('compress.decode'):
+                    img.load()
                 
                 # Urči formát
-                format_to_save = 'JPEG'
-                if image_path.lower().endswith('.png'):
-                    format_to_save = 'PNG'
+                output_format = self.resolve_format(image_path, output_format)
+                original_size = os.path.getsize(image_path)
                 
-                # Komprimuj
-                img.save(output, format=format_to_save, quality=self.compress_quality, optimize=True)
+                # Orientace: buď otoč pixely, nebo zachovej tag v EXIF
+                orientation = self.get_orientation(img)
+                rotate = self.orientation_mode == 'rotate'
+                metadata = self._metadata_params(img, 'compress', 1 if rotate else orientation)
+                # Původní soubor nese všechna metadata - použitelný jen pokud je nastavení ponechává
+                keep_original = self.exif_policy == 'keep' and (self.keep_icc or 'icc_profile' not in img.info)
                 
-                original_size = os.path.getsize(image_path)
-                compressed_size = len(output.getvalue())
-                saved_percent = int((1 - compressed_size / original_size) * 100)
+                quality = None
+                with self._stage('compress.encode') as stage:
+                    if output_format == 'png':
+                        data, output_format = self._compress_png(img, original_size,
+                                                                 orientation if rotate else 1, metadata,
+                                                                 must_beat_original=keep_original)
+                    else:
+                        img = self._prepare_image(img, output_format)
+                        if rotate:
+                            img = self.apply_orientation(img, orientation)
+                        
+                        # Adaptivní kvalita (jen JPEG)
+                        probe = None
+                        if output_format == 'jpeg' and self.quality_mode != 'fixed':
+                            probe = self._make_probe(img)
+                            quality = self.find_adaptive_quality(img, probe)
+                        
+                        output = BytesIO()
+                        
+                        # Komprimuj
+                        self._save_image(img, output, output_format, quality, metadata=metadata)
+                        data = output.getbuffer()
+                        
+                        # Odhad velikosti z počtu pixelů může ujet - změř skutečný poměr
+                        # plné verze a sondy a hledej znovu (jedna korekce)
+                        if probe is not None and self.quality_mode == 'target_size':
+                            data, quality = self._correct_target_size(img, probe, data, quality, metadata)
+                    stage['bytes'] = len(data) if data is not None else 0
+                
+                # Nic neušetřeno a formát odpovídá originálu - nahraj původní soubor
+                if keep_original and (data is None or (len(data) >= original_size and
+                                                       self.format_from_filename(image_path) == output_format)):
+                    with open(image_path, 'rb') as f:
+                        data = f.read()
+                    return True, data, output_format, "Originál ponechán (komprimace nic neušetřila)"
+                
+                saved_percent = int((1 - len(data) / original_size) * 100)
+                if saved_percent < 0:
+                    # Originál nešlo ponechat kvůli metadatům (exif_policy)
+                    return True, data, output_format, f"Překódováno bez vyřazených metadat (větší o {-saved_percent}%)"
                 
-                return True, output.getvalue(), f"Komprimováno (ušetřeno {saved_percent}%)"
+                if quality:
+                    return True, data, output_format, f"Komprimováno (kvalita {quality}, ušetřeno {saved_percent}%)"
+                return True, data, output_format, f"Komprimováno (ušetřeno {saved_percent}%)"
         
         except Exception as e:
-            return False, None, f"Chyba při komprimaci: {str(e)}"
+            return False, None, output_format or 'jpeg', f"Chyba při komprimaci: {str(e)}"
+    
+    def _stage(self, name: str):
+        """Měření fáze, pokud je nastaven sběr metrik"""
+        if self.metrics is None:
+            return nullcontext({'bytes': 0})
+        return self.metrics.stage(name)
+    
+    def _compress_png(self, img: Image.Image, original_size: int, orientation: int = 1,
+                      metadata: Optional[dict] = None,
+                      must_beat_original: bool = True) -> Tuple[Optional[EncodedData], str]:
+        """
+        Vyzkouší kandidátní kódování PNG v časovém limitu a vrátí nejmenší
+        Ztrátoví kandidáti jsou první (u fotek vyhrávají nejčastěji), pomalé
+        bezeztrátové PNG úrovně se zkusí jen pokud se ještě vejdou do limitu.
+        Pokud nic nepřekoná originál, vrací (None, 'png'); s must_beat_original=False
+        vrátí nejmenšího kandidáta i tak (originál nelze použít kvůli metadatům).
+        Returns: (data, output_format)
+        """
+        deadline = time.perf_counter() + self.png_time_budget
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        base = img.convert('RGBA' if has_alpha else 'RGB') if img.mode not in ('RGB', 'RGBA') else img
+        base = self.apply_orientation(base, orientation)
+        metadata = metadata or {}
+        
+        def palette():
+            # Paleta je bezeztrátová jen pokud má obrázek nejvýše 256 barev
+            if not self.png_allow_lossy and base.getcolors(256) is None:
+                return None
+            method = Image.Quantize.FASTOCTREE if has_alpha else Image.Quantize.MEDIANCUT
+            return self._encode(base.quantize(256, method=method), 'PNG', optimize=False, compress_level=9,
+                                **metadata)
+        
+        def webp():
+            if not self.png_allow_lossy or not self.is_format_available('webp'):
+                return None
+            return self._encode(base, 'WEBP', **self.encoder_params('webp'), **metadata)
+        
+        def jpeg():
+            if not self.png_allow_lossy or has_alpha:
+                return None
+            return self._encode(base, 'JPEG', **self.encoder_params('jpeg'), **metadata)
+        
+        # (formát, kódování, odhad ceny jako násobek ceny předchozího kandidáta)
+        # PNG úroveň 9 je zhruba 5x pomalejší než výchozí úroveň 6
+        candidates = [
+            ('webp', webp, 0),
+            ('jpeg', jpeg, 0),
+            ('png', palette, 0),
+            ('png', lambda: self._encode(base, 'PNG', compress_level=6, **metadata), 0),
+            ('png', lambda: self._encode(base, 'PNG', compress_level=9, **metadata), 5),
+            ('png', lambda: self._encode(base, 'PNG', optimize=True, **metadata), 1.2),
+        ]
+        
+        best, best_format = None, 'png'
+        last_cost = 0.0
+        for output_format, encode, cost_factor in candidates:
+            start = time.perf_counter()
+            # Kandidát by se do limitu nejspíš nevešel
+            if start + last_cost * cost_factor > deadline:
+                break
+            data = encode()
+            if data is None:
+                continue
+            last_cost = time.perf_counter() - start
+            if (len(data) < original_size or not must_beat_original) and (best is None or len(data) < len(best)):
+                best, best_format = data, output_format
+        
+        if best is None and not must_beat_original:
+            best = self._encode(base, 'PNG', compress_level=6, **metadata)
+        return best, best_format
+    
+    def _correct_target_size(self, img: Image.Image, probe: Image.Image, data: EncodedData,
+                             quality: int, metadata: Optional[dict] = None) -> Tuple[EncodedData, int]:
+        """
+        Upraví kvalitu, pokud výsledek není v pásmu 85-100 % cílové velikosti
+        Returns: (data, quality)
+        """
+        target_bytes = self.target_size_kb * 1024
+        if 0.85 * target_bytes <= len(data) <= target_bytes:
+            return data, quality
+        
+        probe_bytes = len(self._encode(probe, 'JPEG', quality=quality))
+        corrected = self.find_adaptive_quality(img, probe, len(data) / float(probe_bytes))
+        if corrected == quality:
+            return data, quality
+        
+        output = BytesIO()
+        self._save_image(img, output, 'jpeg', corrected, metadata=metadata)
+        # Vyšší kvalitu přijmi jen pokud se opravdu vejde do cíle
+        if output.tell() > target_bytes and len(data) <= target_bytes:
+            return data, quality
+        return output.getbuffer(), corrected
+    
+    @staticmethod
+    def _encode(img: Image.Image, pil_format: str, **params) -> memoryview:
+        """Zakóduje obrázek (memoryview nad bufferem, bez kopie)"""
+        output = BytesIO()
+        img.save(output, format=pil_format, **params)
+        return output.getbuffer()
     
     def get_image_info(self, image_path: str) -> Tuple[bool, dict]:
         """
@@ -117,6 +616,7 @@ class ImageProcessor:
         """
         try:
             img = Image.open(BytesIO(image_bytes))
+            orientation = self.get_orientation(img)
             
             # Konverze RGBA na RGB pokud potřeba
             if img.mode == 'RGBA':
@@ -127,9 +627,10 @@ class ImageProcessor:
                 img = img.convert('RGB')
             
             img.thumbnail((self.thumbnail_size, self.thumbnail_size), Image.Resampling.LANCZOS)
+            img = self.apply_orientation(img, orientation)
             
             output = BytesIO()
-            img.save(output, format='JPEG', quality=self.compress_quality, optimize=True)
+            img.save(output, format='JPEG', **self.encoder_params('jpeg', 'thumbnail'))
             
             return True, output.getvalue(), "Thumbnail vytvořen"
         
@@ -144,3 +645,78 @@ class ImageProcessor:
         """Nastaví kvalitu komprimace (1-100)"""
         if 1 <= quality <= 100:
             self.compress_quality = quality
+    
+    def set_quality_mode(self, mode: str, target_size_kb: Optional[int] = None,
+                         min_ssim: Optional[float] = None) -> bool:
+        """Nastaví režim kvality ('fixed', 'target_size', 'ssim') a jeho cíl"""
+        if mode not in ('fixed', 'target_size', 'ssim'):
+            return False
+        self.quality_mode = mode
+        if target_size_kb is not None and target_size_kb > 0:
+            self.target_size_kb = target_size_kb
+        if min_ssim is not None and 0 < min_ssim < 1:
+            self.min_ssim = min_ssim
+        return True
+    
+    def set_encoder_effort(self, variant: str, effort: str, progressive: Optional[bool] = None,
+                           subsampling: Optional[str] = None) -> bool:
+        """
+        Nastaví úsilí kodéru pro variantu ('thumbnail' / 'compress')
+        effort: 'fast', 'balanced' nebo 'max'
+        subsampling: '4:4:4', '4:2:2', '4:2:0' nebo None (podle úsilí)
+        """
+        if variant not in self.encoder_settings or effort not in self.EFFORT_PRESETS:
+            return False
+        if subsampling is not None and subsampling not in self.SUBSAMPLING:
+            return False
+        
+        self.encoder_settings[variant] = {
+            'effort': effort,
+            'progressive': progressive,
+            'subsampling': self.SUBSAMPLING.get(subsampling),
+        }
+        return True
+    
+    def set_metadata_policy(self, exif_policy: str, keep_icc: bool = True,
+                            orientation_mode: str = 'rotate') -> bool:
+        """
+        Nastaví zacházení s metadaty komprimované verze
+        exif_policy: 'strip', 'minimal' nebo 'keep'
+        orientation_mode: 'rotate' (otočit pixely) nebo 'tag' (ponechat EXIF Orientation)
+        """
+        if exif_policy not in ('strip', 'minimal', 'keep') or orientation_mode not in ('rotate', 'tag'):
+            return False
+        self.exif_policy = exif_policy
+        self.keep_icc = keep_icc
+        self.orientation_mode = orientation_mode
+        return True
+    
+    def set_output_format(self, output_format: str, jpeg_fallback: bool = False) -> bool:
+        """Nastaví výstupní formát ('auto' nebo jeden z OUTPUT_FORMATS)"""
+        if output_format != 'auto' and not self.is_format_available(output_format):
+            return False
+        self.output_format = output_format
+        self.jpeg_fallback = jpeg_fallback
+        return True
+    
+    def set_format_settings(self, output_format: str, quality: Optional[int] = None,
+                            speed: Optional[int] = None):
+        """
+        Nastaví kvalitu a rychlost kódování pro WebP/AVIF
+        speed: u WebP 'method' (0-6), u AVIF 'speed' (0-10)
+        """
+        settings = self.format_settings.get(output_format)
+        if settings is None:
+            return
+        if quality is not None and 1 <= quality <= 100:
+            settings['quality'] = quality
+        if speed is not None:
+            if output_format == 'webp' and 0 <= speed <= 6:
+                settings['method'] = speed
+            elif output_format == 'avif' and 0 <= speed <= 10:
+                settings['speed'] = speed
+    
+    def get_format_speed(self, output_format: str) -> Optional[int]:
+        """Vrátí nastavenou rychlost/úsilí kodéru pro WebP/AVIF"""
+        settings = self.format_settings.get(output_format, {})
+        return settings.get('method', settings.get('speed'))
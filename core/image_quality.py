@@ -0,0 +1,41 @@
+"""
+Metriky kvality obrázků pro adaptivní volbu kvality komprimace
+SSIM se počítá čistě v Pillow: lokální statistiky v blocích window x window
+získáme pomocí Image.reduce() nad obrázky v režimu 'F'.
+"""
+
+from PIL import Image, ImageMath
+
+
+# Konstanty SSIM pro 8bitová data (K1 = 0.01, K2 = 0.03)
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+
+def ssim(reference: Image.Image, distorted: Image.Image, window: int = 8) -> float:
+    """
+    Spočítá průměrné blokové SSIM jasové složky dvou stejně velkých obrázků
+    Returns: hodnota 0-1 (1 = identické)
+    """
+    x = reference.convert('L').convert('F')
+    y = distorted.convert('L').convert('F')
+    window = max(1, min(window, *x.size))
+    
+    # Lokální průměry E[x], E[y], E[x^2], E[y^2], E[xy] v blocích
+    mu_x = x.reduce(window)
+    mu_y = y.reduce(window)
+    xx = ImageMath.lambda_eval(lambda a: a['x'] * a['x'], x=x).reduce(window)
+    yy = ImageMath.lambda_eval(lambda a: a['y'] * a['y'], y=y).reduce(window)
+    xy = ImageMath.lambda_eval(lambda a: a['x'] * a['y'], x=x, y=y).reduce(window)
+    
+    def ssim_map(a):
+        mx, my = a['mx'], a['my']
+        sigma_x = a['xx'] - mx * mx
+        sigma_y = a['yy'] - my * my
+        sigma_xy = a['xy'] - mx * my
+        return ((mx * my * 2 + _C1) * (sigma_xy * 2 + _C2)) / \
+               ((mx * mx + my * my + _C1) * (sigma_x + sigma_y + _C2))
+    
+    result = ImageMath.lambda_eval(ssim_map, mx=mu_x, my=mu_y, xx=xx, yy=yy, xy=xy)
+    # Průměr přes všechny bloky (ImageStat s režimem 'F' nepočítá přesně)
+    return result.reduce(result.size).getpixel((0, 0))
@@ -0,0 +1,71 @@
+from typing import Collection, Dict, List, Optional
+
+
+def build_index_php(filenames: List[str],
+                    variants: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None,
+                    pending: Optional[Collection[str]] = None) -> str:
+    """
+    Sestaví obsah index.php s cestami k fotkám
+    Args:
+        filenames: názvy fotek (originálů)
+        variants: {filename: {'thumbnail'|'compress': {formát: název souboru}}},
+            první formát je primární; bez variant mají všechny složky stejný název
+        pending: fotky, které ještě nemají nahrané všechny varianty (průběžný
+            index během nahrávání) - original a compress ukazují na nejlepší
+            už nahranou variantu a mají 'complete' => false; index tak nikdy
+            neodkazuje na soubor, který na serveru ještě není
+    Returns: PHP kód
+    """
+    pending = pending or ()
+    php_code = "<?php\n"
+    php_code += "// Auto-generated photo index\n"
+    php_code += "// Generated by FTP Photo Manager\n\n"
+    php_code += "// Get base URL\n"
+    php_code += "$protocol = (!empty($_SERVER['HTTPS']) && $_SERVER['HTTPS'] !== 'off') ? 'https://' : 'http://';\n"
+    php_code += "$host = $_SERVER['HTTP_HOST'];\n"
+    php_code += "$scriptPath = dirname($_SERVER['SCRIPT_NAME']);\n"
+    php_code += "$scriptPath = rtrim($scriptPath, '/') . '/';\n"
+    php_code += "$baseUrl = $protocol . $host . $scriptPath;\n\n"
+    php_code += "$photos = [\n"
+    
+    for filename in filenames:
+        # Escapuj uvozovky v názvu souboru
+        safe_filename = filename.replace("'", "\\'")
+        photo_variants = (variants or {}).get(filename) or {}
+        
+        php_code += "    [\n"
+        for folder in ('thumbnail', 'original', 'compress'):
+            # Fotka se ještě nahrává - zatím ukazuje na nejlepší hotovou variantu
+            source = folder
+            if filename in pending and folder != 'thumbnail':
+                source = 'compress' if photo_variants.get('compress') else 'thumbnail'
+            names = photo_variants.get(source) or {None: filename}
+            safe_names = {fmt: name.replace("'", "\\'") for fmt, name in names.items()}
+            primary = next(iter(safe_names.values()))
+            
+            php_code += f"        '{folder}' => '{source}/{primary}',\n"
+            php_code += f"        '{folder}_url' => $baseUrl . '{source}/{primary}',\n"
+            
+            # Více formátů (např. WebP + JPEG záloha) - vypiš všechny
+            if len(safe_names) > 1:
+                php_code += f"        '{folder}_formats' => [\n"
+                for fmt, name in safe_names.items():
+                    php_code += f"            '{fmt}' => $baseUrl . '{source}/{name}',\n"
+                php_code += "        ],\n"
+        if filename in pending:
+            php_code += "        'complete' => false,\n"
+        php_code += f"        'filename' => '{safe_filename}'\n"
+        php_code += "    ],\n"
+    
+    php_code += "];\n\n"
+    php_code += "$result = [\n"
+    php_code += "    'success' => true,\n"
+    php_code += "    'count' => count($photos),\n"
+    php_code += "    'base_url' => $baseUrl,\n"
+    php_code += "    'photos' => $photos\n"
+    php_code += "];\n\n"
+    php_code += "// Return JSON\n"
+    php_code += "header('Content-Type: application/json');\n"
+    php_code += "echo json_encode($result, JSON_UNESCAPED_SLASHES | JSON_PRETTY_PRINT);\n"
+    php_code += "?>"
+    return php_code
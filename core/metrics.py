@@ -0,0 +1,172 @@
+import csv
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+class TransferMetrics:
+    """
+    Metriky jednoho běhu nahrávání
+    Sbírá časy jednotlivých fází (dekódování, zmenšení, kódování, STOR podle
+    varianty), přenesené bajty, hloubky front a vytížení spojení.
+    Je bezpečná pro použití z více vláken.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Začne nový běh"""
+        with self.lock:
+            self.started = time.time()
+            self.finished = None
+            self.photos = 0
+            self.errors = 0
+            self.stages: Dict[str, Dict[str, float]] = {}
+            self.queues: Dict[str, Dict[str, int]] = {}
+            self.connections: Dict[str, Dict[str, float]] = {}
+    
+    def finish(self):
+        """Ukončí běh (zastaví čas pro výpočet rychlostí)"""
+        with self.lock:
+            self.finished = time.time()
+    
+    @contextmanager
+    def stage(self, name: str, size: int = 0, connection: Optional[str] = None):
+        """
+        Změří dobu trvání fáze
+        Args:
+            name: název fáze (např. 'thumbnail.encode', 'stor.original')
+            size: počet zpracovaných bajtů
+            connection: název spojení, jehož vytížení se má započítat
+        Uvnitř bloku lze počet bajtů doplnit přes vrácený slovník: info['bytes'] = n
+        """
+        info = {'bytes': size}
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.record(name, time.perf_counter() - start, info['bytes'], connection)
+    
+    def record(self, name: str, seconds: float, size: int = 0, connection: Optional[str] = None):
+        """Zaznamená jedno provedení fáze"""
+        with self.lock:
+            stage = self.stages.setdefault(name, {'count': 0, 'seconds': 0.0, 'bytes': 0, 'max': 0.0})
+            stage['count'] += 1
+            stage['seconds'] += seconds
+            stage['bytes'] += size
+            stage['max'] = max(stage['max'], seconds)
+            
+            if connection:
+                conn = self.connections.setdefault(connection, {'busy': 0.0, 'operations': 0, 'bytes': 0})
+                conn['busy'] += seconds
+                conn['operations'] += 1
+                conn['bytes'] += size
+    
+    def set_queue_depth(self, name: str, depth: int):
+        """Zaznamená aktuální hloubku fronty (a její maximum)"""
+        with self.lock:
+            queue = self.queues.setdefault(name, {'depth': 0, 'max': 0})
+            queue['depth'] = depth
+            queue['max'] = max(queue['max'], depth)
+    
+    def photo_done(self, success: bool = True):
+        """Započítá zpracovanou fotku"""
+        with self.lock:
+            if success:
+                self.photos += 1
+            else:
+                self.errors += 1
+    
+    def elapsed(self) -> float:
+        """Doba běhu v sekundách"""
+        return max((self.finished or time.time()) - self.started, 1e-9)
+    
+    def snapshot(self) -> Dict:
+        """Vrátí kopii metrik včetně odvozených hodnot (průměry, rychlosti, vytížení)"""
+        with self.lock:
+            elapsed = self.elapsed()
+            stages = {}
+            for name, stage in sorted(self.stages.items()):
+                stages[name] = {
+                    'count': stage['count'],
+                    'seconds': round(stage['seconds'], 4),
+                    'avg_ms': round(stage['seconds'] / stage['count'] * 1000, 2) if stage['count'] else 0.0,
+                    'max_ms': round(stage['max'] * 1000, 2),
+                    'bytes': stage['bytes'],
+                    'bytes_per_s': round(stage['bytes'] / stage['seconds']) if stage['seconds'] > 0 else 0,
+                }
+            connections = {
+                name: {
+                    'busy_seconds': round(conn['busy'], 4),
+                    'utilization': round(min(conn['busy'] / elapsed, 1.0), 4),
+                    'operations': conn['operations'],
+                    'bytes': conn['bytes'],
+                }
+                for name, conn in sorted(self.connections.items())
+            }
+            uploaded = sum(stage['bytes'] for name, stage in self.stages.items() if name.startswith('stor.'))
+            return {
+                'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                'elapsed_seconds': round(elapsed, 3),
+                'photos': self.photos,
+                'errors': self.errors,
+                'photos_per_s': round(self.photos / elapsed, 3),
+                'uploaded_bytes': uploaded,
+                'upload_bytes_per_s': round(uploaded / elapsed),
+                'stages': stages,
+                'queues': {name: dict(queue) for name, queue in sorted(self.queues.items())},
+                'connections': connections,
+            }
+    
+    def summary(self) -> str:
+        """Krátký textový přehled pro zobrazení v GUI"""
+        data = self.snapshot()
+        parts = [f"{data['photos_per_s']:.2f} fotek/s",
+                 f"{data['upload_bytes_per_s'] / 1024 / 1024:.2f} MB/s"]
+        
+        # Kde se tráví nejvíc času
+        busiest = sorted(data['stages'].items(), key=lambda item: item[1]['seconds'], reverse=True)[:3]
+        if busiest:
+            parts.append("nejdelší: " + ", ".join(
+                f"{name} {stage['avg_ms']:.0f} ms" for name, stage in busiest))
+        
+        for name, conn in data['connections'].items():
+            parts.append(f"{name} {conn['utilization'] * 100:.0f} %")
+        for name, queue in data['queues'].items():
+            parts.append(f"fronta {name}: {queue['depth']}")
+        return " | ".join(parts)
+    
+    def export_json(self, path: str) -> Tuple[bool, str]:
+        """Uloží report běhu jako JSON"""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=4, ensure_ascii=False)
+            return True, "Metriky uloženy"
+        except Exception as e:
+            return False, f"Chyba při ukládání metrik: {str(e)}"
+    
+    def export_csv(self, path: str) -> Tuple[bool, str]:
+        """Uloží report běhu jako CSV (jeden řádek na fázi / spojení / frontu)"""
+        try:
+            data = self.snapshot()
+            rows: List[List] = [['kind', 'name', 'count', 'seconds', 'avg_ms', 'max_ms', 'bytes', 'bytes_per_s', 'value']]
+            rows.append(['run', 'elapsed_seconds', '', data['elapsed_seconds'], '', '', data['uploaded_bytes'],
+                         data['upload_bytes_per_s'], data['photos_per_s']])
+            for name, stage in data['stages'].items():
+                rows.append(['stage', name, stage['count'], stage['seconds'], stage['avg_ms'],
+                             stage['max_ms'], stage['bytes'], stage['bytes_per_s'], ''])
+            for name, conn in data['connections'].items():
+                rows.append(['connection', name, conn['operations'], conn['busy_seconds'], '', '',
+                             conn['bytes'], '', conn['utilization']])
+            for name, queue in data['queues'].items():
+                rows.append(['queue', name, '', '', '', '', '', '', queue['max']])
+            
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                csv.writer(f).writerows(rows)
+            return True, "Metriky uloženy"
+        except Exception as e:
+            return False, f"Chyba při ukládání metrik: {str(e)}"
@@ -0,0 +1,144 @@
+from PIL import Image
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy je volitelný - bez něj se kandidáti hledají v pásmech bitů (kbelíky)
+    np = None
+
+
+def dhash(img: Image.Image, hash_size: int = 8) -> int:
+    """
+    Rozdílový perceptuální hash (dHash) obrázku
+    Obrázek se zmenší na (hash_size + 1) x hash_size ve stupních šedi a každý bit
+    říká, zda je pixel světlejší než jeho pravý soused.
+    Returns: hash jako celé číslo (hash_size * hash_size bitů)
+    """
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BOX)
+    pixels = small.tobytes()
+    
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    """Počet rozdílných bitů dvou hashů"""
+    return bin(a ^ b).count('1')
+
+
+class PerceptualIndex:
+    """
+    Kompaktní index perceptuálních hashů se shlukováním téměř stejných fotek
+    S NumPy se vzdálenosti počítají vektorově po blocích (XOR + popcount),
+    bez NumPy přes rozdělení hashe na pásma: dvojice ve vzdálenosti nejvýše d
+    se musí shodovat alespoň v jednom z d + 1 pásem, takže se porovnávají jen
+    hashe ze stejných přihrádek.
+    """
+    
+    BLOCK_SIZE = 256
+    
+    def __init__(self):
+        self.keys: List[str] = []
+        self.hashes: List[int] = []
+    
+    def add(self, key: str, value: int):
+        """Přidá hash fotky"""
+        self.keys.append(key)
+        self.hashes.append(value)
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def clusters(self, max_distance: int = 6) -> List[List[str]]:
+        """
+        Seskupí téměř stejné fotky (úplné propojení)
+        Každé dvě fotky shluku jsou od sebe nejvýše max_distance - ať se ze shluku
+        ponechá kterákoli, ostatní jsou jejími téměř kopiemi. Spojování přes
+        nejbližší sousedy by řetězilo (A~B~C~...) i fotky, které si podobné nejsou.
+        Dvojice se spojují od nejbližších, shluky jen pokud jsou si blízké všechny
+        jejich dvojice.
+        Args:
+            max_distance: maximální Hammingova vzdálenost v rámci shluku (z 64 bitů)
+        Returns: seznam shluků (jen shluky s více než jednou fotkou)
+        """
+        neighbours: List[set] = [set() for _ in self.keys]
+        pairs = []
+        for i, j in self._close_pairs(max_distance):
+            neighbours[i].add(j)
+            neighbours[j].add(i)
+            pairs.append((hamming(self.hashes[i], self.hashes[j]), min(i, j), max(i, j)))
+        
+        cluster_of = list(range(len(self.keys)))
+        members: Dict[int, List[int]] = {i: [i] for i in range(len(self.keys))}
+        for distance, i, j in sorted(pairs):
+            a, b = cluster_of[i], cluster_of[j]
+            if a == b:
+                continue
+            if not all(y in neighbours[x] for x in members[a] for y in members[b]):
+                continue
+            if len(members[a]) < len(members[b]):
+                a, b = b, a
+            for x in members.pop(b):
+                cluster_of[x] = a
+                members[a].append(x)
+        
+        return [[self.keys[i] for i in sorted(group)] for group in members.values() if len(group) > 1]
+    
+    def _close_pairs(self, max_distance: int):
+        """Generuje dvojice indexů (i, j), i < j, ve vzdálenosti nejvýše max_distance"""
+        if np is not None:
+            yield from self._close_pairs_numpy(max_distance)
+            return
+        
+        bands = max_distance + 1
+        bits = 64
+        bounds = [bits * band // bands for band in range(bands + 1)]
+        buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        
+        for i, value in enumerate(self.hashes):
+            candidates = set()
+            for band in range(bands):
+                width = bounds[band + 1] - bounds[band]
+                part = (value >> bounds[band]) & ((1 << width) - 1)
+                bucket = buckets[band].setdefault(part, [])
+                candidates.update(bucket)
+                bucket.append(i)
+            for j in candidates:
+                if hamming(value, self.hashes[j]) <= max_distance:
+                    yield j, i
+    
+    def _close_pairs_numpy(self, max_distance: int):
+        """Blokový výpočet vzdáleností přes NumPy"""
+        hashes = np.array(self.hashes, dtype=np.uint64)
+        popcount = getattr(np, 'bitwise_count', None)
+        if popcount is None:
+            table = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+            popcount = lambda x: table[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1)
+        
+        for start in range(0, len(hashes), self.BLOCK_SIZE):
+            block = hashes[start:start + self.BLOCK_SIZE]
+            # Stačí porovnat s hashi od začátku bloku dál (horní trojúhelník)
+            distances = popcount(block[:, None] ^ hashes[None, start:])
+            rows, cols = np.nonzero(distances <= max_distance)
+            cols = cols + start
+            rows = rows + start
+            mask = cols > rows
+            for i, j in zip(rows[mask].tolist(), cols[mask].tolist()):
+                yield i, j
+    
+    @staticmethod
+    def to_hex(value: int) -> str:
+        """Hash pro uložení do JSON"""
+        return f"{value:016x}"
+    
+    @staticmethod
+    def from_hex(text: Optional[str]) -> Optional[int]:
+        """Hash z JSON"""
+        try:
+            return int(text, 16) if text else None
+        except ValueError:
+            return None
@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket pro omezení rychlosti přenosu (bajty/s)
+    Dvě priority: 'interactive' (náhledy, index.php) má přednost před 'bulk'
+    (hromadné nahrávání) - bulk čeká, dokud na tokeny čeká interaktivní přenos.
+    """
+    
+    MIN_BURST = 64 * 1024
+    
+    def __init__(self, rate: float = 0, burst: Optional[int] = None):
+        """
+        Args:
+            rate: povolená rychlost v bajtech/s, 0 = bez omezení
+            burst: kapacita bucketu v bajtech (None = 1 s provozu)
+        """
+        self.condition = threading.Condition()
+        self.rate = 0
+        self.burst = self.MIN_BURST
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.waiting = {'interactive': 0, 'bulk': 0}
+        self.set_rate(rate, burst)
+    
+    def set_rate(self, rate: float, burst: Optional[int] = None):
+        """Změní rychlost za běhu (čekající přenosy se hned přepočítají)"""
+        with self.condition:
+            self._refill()
+            self.rate = max(rate or 0, 0)
+            self.burst = burst or max(int(self.rate), self.MIN_BURST)
+            self.tokens = min(self.tokens, self.burst)
+            self.condition.notify_all()
+    
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def consume(self, amount: int, priority: str = 'bulk'):
+        """Počká, dokud není k dispozici amount bajtů"""
+        if not self.rate:
+            return
+        
+        with self.condition:
+            self.waiting[priority] += 1
+            try:
+                while self.rate:
+                    self._refill()
+                    blocked = priority == 'bulk' and self.waiting['interactive'] > 0
+                    # Blok větší než bucket může jít do mínusu - další přenosy si počkají
+                    needed = min(amount, self.burst)
+                    if not blocked and self.tokens >= needed:
+                        self.tokens -= amount
+                        return
+                    timeout = 0.05 if blocked else (needed - self.tokens) / self.rate
+                    self.condition.wait(max(timeout, 0.001))
+            finally:
+                self.waiting[priority] -= 1
+                self.condition.notify_all()
+
+
+class RateLimiter:
+    """Omezení rychlosti globálně (všechna spojení dohromady) i pro každé spojení zvlášť"""
+    
+    def __init__(self, global_rate: float = 0, connection_rate: float = 0):
+        """
+        Args:
+            global_rate: limit všech přenosů dohromady (bajty/s), 0 = bez omezení
+            connection_rate: limit jednoho spojení (bajty/s), 0 = bez omezení
+        """
+        self.lock = threading.Lock()
+        self.global_bucket = TokenBucket(global_rate)
+        self.connection_rate = connection_rate
+        self.connection_buckets: Dict[str, TokenBucket] = {}
+    
+    def set_limits(self, global_rate: float, connection_rate: float):
+        """Nastaví limity (lze volat za běhu z GUI)"""
+        self.global_bucket.set_rate(global_rate)
+        with self.lock:
+            self.connection_rate = connection_rate
+            for bucket in self.connection_buckets.values():
+                bucket.set_rate(connection_rate)
+    
+    def get_limits(self):
+        """Returns: (global_rate, connection_rate) v bajtech/s"""
+        return self.global_bucket.rate, self.connection_rate
+    
+    def _connection_bucket(self, connection: str) -> TokenBucket:
+        with self.lock:
+            bucket = self.connection_buckets.get(connection)
+            if bucket is None:
+                bucket = self.connection_buckets[connection] = TokenBucket(self.connection_rate)
+            return bucket
+    
+    def consume(self, amount: int, connection: Optional[str] = None, priority: str = 'bulk'):
+        """Počká, dokud přenos amount bajtů nepřekročí globální ani spojení limit"""
+        if connection is not None:
+            self._connection_bucket(connection).consume(amount, priority)
+        self.global_bucket.consume(amount, priority)
+    
+    def release(self, connection: str):
+        """Zapomene bucket ukončeného spojení"""
+        with self.lock:
+            self.connection_buckets.pop(connection, None)
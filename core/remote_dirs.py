@@ -0,0 +1,68 @@
+import posixpath
+from typing import Iterable, List, Set
+
+
+class RemoteDirCache:
+    """
+    Množina vzdálených složek, o kterých víme, že existují
+    Plní se z aktuálního adresáře, výpisů složek a úspěšných MKD; makedirs
+    pak posílá MKD jen pro neznámé úrovně. Handler ji vyprázdní při každém
+    připojení, takže platí pro jedno spojení k jednomu serveru.
+    """
+    
+    def __init__(self):
+        self.known: Set[str] = {'/'}
+    
+    @staticmethod
+    def absolute(path: str, cwd: str) -> str:
+        """Absolutní normalizovaná cesta (relativní cesty vůči cwd)"""
+        path = posixpath.normpath(posixpath.join(cwd or '/', path))
+        return '/' + path.lstrip('/')
+    
+    def clear(self):
+        """Zapomene všechny složky (nové spojení)"""
+        self.known = {'/'}
+    
+    def add(self, path: str, cwd: str = '/'):
+        """Označí složku a všechny její rodiče jako existující"""
+        path = self.absolute(path, cwd)
+        while path not in self.known:
+            self.known.add(path)
+            path = posixpath.dirname(path)
+    
+    def add_listing(self, parent: str, items: Iterable, cwd: str = '/'):
+        """Zaznamená podsložky z výpisu složky parent (položky (název, je_složka))"""
+        parent = self.absolute(parent, cwd)
+        self.add(parent)
+        for name, is_dir in items:
+            if is_dir:
+                self.known.add(posixpath.join(parent, name))
+    
+    def discard(self, path: str, cwd: str = '/'):
+        """Zapomene složku i celý její podstrom (po smazání)"""
+        path = self.absolute(path, cwd)
+        prefix = path.rstrip('/') + '/'
+        self.known = {known for known in self.known
+                      if known != path and not known.startswith(prefix)} | {'/'}
+    
+    def is_known(self, path: str, cwd: str = '/') -> bool:
+        return self.absolute(path, cwd) in self.known
+    
+    def missing(self, paths: Iterable[str], cwd: str = '/') -> List[str]:
+        """
+        Neznámé složky potřebné pro vytvoření paths, seřazené od kořene
+        (rodič vždy před potomkem, každá složka jen jednou)
+        """
+        result = []
+        planned = set()
+        for path in paths:
+            path = self.absolute(path, cwd)
+            chain = []
+            while path not in self.known and path not in planned:
+                chain.append(path)
+                path = posixpath.dirname(path)
+            for path in reversed(chain):
+                planned.add(path)
+                result.append(path)
+        # Řazení podle hloubky zachová pořadí rodič -> potomek i napříč cestami
+        return sorted(result, key=lambda path: path.count('/'))
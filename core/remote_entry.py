@@ -0,0 +1,100 @@
+import calendar
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class RemoteEntry:
+    """
+    Jedna položka výpisu vzdálené složky se všemi fakty z jednoho výpisu
+    Pro zpětnou kompatibilitu se rozbalí jako dvojice (název, je_složka).
+    """
+    
+    __slots__ = ('name', 'type', 'size', 'modify', 'facts')
+    
+    def __init__(self, name: str, facts: Dict[str, str]):
+        self.name = name
+        self.type = facts.get('type', 'file').lower()
+        size = facts.get('size')
+        self.size = int(size) if size and size.isdigit() else None
+        self.modify = facts.get('modify')  # YYYYMMDDHHMMSS (UTC) nebo None
+        self.facts = facts
+    
+    @property
+    def is_dir(self) -> bool:
+        return self.type == 'dir'
+    
+    @property
+    def is_file(self) -> bool:
+        return self.type == 'file'
+    
+    @property
+    def is_link(self) -> bool:
+        return self.type.startswith('os.unix=slink')
+    
+    @property
+    def mtime(self) -> Optional[float]:
+        """Čas změny jako unixový timestamp (nebo None, pokud jej server nevrátil)"""
+        if not self.modify:
+            return None
+        try:
+            return float(calendar.timegm(time.strptime(self.modify[:14], '%Y%m%d%H%M%S')))
+        except ValueError:
+            return None
+    
+    @property
+    def unique(self) -> Optional[str]:
+        """Identita souboru na serveru (fakt MLSD 'unique'), pokud ji server posílá"""
+        return self.facts.get('unique')
+    
+    def signature(self) -> Tuple[Optional[int], Optional[str]]:
+        """(velikost, čas změny) - změna signatury znamená změněný soubor"""
+        return self.size, self.modify
+    
+    def __iter__(self) -> Iterator:
+        return iter((self.name, self.is_dir))
+    
+    def __repr__(self) -> str:
+        return f"RemoteEntry({self.name!r}, type={self.type!r}, size={self.size}, modify={self.modify})"
+
+
+class RemoteListing(list):
+    """Seznam RemoteEntry; řazení a filtrování bez dalších dotazů na server"""
+    
+    @classmethod
+    def from_listing(cls, listing: Iterable[Tuple[str, Dict[str, str]]]) -> 'RemoteListing':
+        """Vytvoří výpis z dvojic (název, fakta)"""
+        return cls(RemoteEntry(name, facts) for name, facts in listing)
+    
+    def dirs(self) -> 'RemoteListing':
+        return RemoteListing(entry for entry in self if entry.is_dir)
+    
+    def files(self) -> 'RemoteListing':
+        return RemoteListing(entry for entry in self if entry.is_file)
+    
+    def filter(self, predicate: Callable[[RemoteEntry], bool]) -> 'RemoteListing':
+        return RemoteListing(entry for entry in self if predicate(entry))
+    
+    def sorted_by(self, key: str = 'name', reverse: bool = False) -> 'RemoteListing':
+        """
+        Seřadí výpis (složky vždy první)
+        Args:
+            key: 'name', 'size' nebo 'modify'
+        """
+        if key == 'name':
+            entries = sorted(self, key=lambda entry: entry.name.lower(), reverse=reverse)
+        else:
+            # Položky bez daného faktu vždy na konec
+            entries = sorted((entry for entry in self if getattr(entry, key) is not None),
+                             key=lambda entry: getattr(entry, key), reverse=reverse)
+            entries += [entry for entry in self if getattr(entry, key) is None]
+        return RemoteListing(sorted(entries, key=lambda entry: not entry.is_dir))
+    
+    def names(self) -> List[str]:
+        return [entry.name for entry in self]
+    
+    def by_name(self) -> Dict[str, RemoteEntry]:
+        return {entry.name: entry for entry in self}
+    
+    def total_size(self) -> int:
+        """Součet velikostí souborů (bajty)"""
+        return sum(entry.size or 0 for entry in self if entry.is_file)
@@ -0,0 +1,52 @@
+import posixpath
+from typing import Dict, Iterable, List, Tuple
+from core.image_processor import ImageProcessor
+from core.remote_walk import VARIANT_FOLDERS
+
+
+def list_files(handler, path: str) -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Soubory složky path včetně všech podsložek (nahrávání zachovává strukturu
+    zdroje, např. thumbnail/DCIM/100CANON/IMG_1.jpg)
+    Skryté soubory a složky (rozpracované .název.part) se vynechají.
+    Returns: [(relativní cesta vůči path, fakta)]
+    Raises: chybu výpisu kterékoli složky (neúplný výpis by vypadal jako smazané fotky)
+    """
+    files = []
+    pending = ['']
+    while pending:
+        relative_dir = pending.pop()
+        directory = posixpath.join(path, relative_dir) if relative_dir else path
+        for name, facts in handler.fetch_entries(directory):
+            if name.startswith('.'):
+                continue
+            relative = f"{relative_dir}/{name}" if relative_dir else name
+            if facts.get('type') == 'dir':
+                pending.append(relative)
+            elif facts.get('type') == 'file':
+                files.append((relative, facts))
+    return files
+
+
+def group_photos(by_folder: Dict[str, Iterable[str]]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Seskupí soubory složek thumbnail/original/compress podle fotky
+    Varianty jedné fotky mají stejný název bez přípony, ale formát se může
+    lišit (original/IMG_1.jpg, thumbnail/IMG_1.webp + JPEG záloha IMG_1.jpg).
+    Args:
+        by_folder: {složka: názvy souborů (i relativní cesty) v ní}
+    Returns: {název fotky: {složka: [soubory, moderní formáty první]}}, seřazeno
+        podle názvu; název fotky je název originálu (bez něj thumbnailu,
+        nakonec komprimované verze)
+    """
+    photos = {}
+    stems = {}  # {název bez přípony: název fotky}
+    for folder in ('original', 'thumbnail', 'compress'):
+        names = [name for name in by_folder.get(folder, ()) if ImageProcessor.is_image(name)]
+        for name in sorted(names, key=ImageProcessor.format_priority):
+            stem = posixpath.splitext(name)[0]
+            if stem not in stems:
+                stems[stem] = name
+                photos[name] = {variant: [] for variant in VARIANT_FOLDERS}
+            photos[stems[stem]][folder].append(name)
+    return {name: photos[name] for name in sorted(photos, key=str.lower)}
@@ -0,0 +1,160 @@
+import posixpath
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+from core.image_processor import ImageProcessor
+from core.remote_entry import RemoteListing
+
+VARIANT_FOLDERS = ('thumbnail', 'original', 'compress')
+
+
+class RemoteWalker:
+    """
+    Paralelní procházení vzdáleného webu do šířky
+    Složky se vypisují absolutními cestami přes několik dalších spojení
+    (handler.spawn()), takže výchozí spojení ani jeho current_path se nemění.
+    Nepovolí-li server žádné další spojení, vypisuje se přes výchozí.
+    Složky, jejichž výpis selhal, se počítají do stats['errors'].
+    Výsledkem jsou galerie se strukturou thumbnail/original/compress.
+    """
+    
+    def __init__(self, handler, connections: int = 4, max_depth: Optional[int] = None):
+        """
+        Args:
+            handler: připojený handler (vzor pro další spojení)
+            connections: počet souběžných spojení
+            max_depth: maximální hloubka pod kořenem (None = bez omezení)
+        """
+        self.handler = handler
+        self.connections = max(1, connections)
+        self.max_depth = max_depth
+        self.listings = {}  # {absolutní cesta: RemoteListing}
+        self.stats = {}
+        self._lock = threading.Lock()
+    
+    def walk(self, root: str = '/', progress_callback=None) -> List[Dict]:
+        """
+        Projde strom od root a vrátí nalezené galerie
+        progress_callback: funkce(vypsaných_složek, nalezených_složek)
+        Returns: [{'path', 'photos', 'files', 'bytes', 'cover', 'updated',
+                   'variants': {složka: {'files', 'bytes'}}}]
+        """
+        root = self.handler.dir_cache.absolute(root, self.handler.get_current_path())
+        start = time.perf_counter()
+        self.listings = {}
+        self.stats = {'directories': 0, 'files': 0, 'bytes': 0, 'errors': 0, 'connections': 0}
+        
+        pending = queue.Queue()  # FIFO = do šířky
+        pending.put((root, 0))
+        discovered = [1]
+        
+        def worker(handler):
+            while True:
+                path, depth = pending.get()
+                if path is None:
+                    pending.task_done()
+                    break
+                try:
+                    items = RemoteListing.from_listing(handler.fetch_entries(path))
+                    with self._lock:
+                        self.listings[path] = items
+                        self.stats['directories'] += 1
+                        self.stats['files'] += len(items.files())
+                        self.stats['bytes'] += items.total_size()
+                        if self.max_depth is None or depth < self.max_depth:
+                            for entry in items.dirs():
+                                discovered[0] += 1
+                                pending.put((posixpath.join(path, entry.name), depth + 1))
+                        done, found = self.stats['directories'], discovered[0]
+                    if progress_callback:
+                        progress_callback(done, found)
+                except Exception as e:
+                    print(f"Chyba při procházení {path}: {e}")
+                    with self._lock:
+                        self.stats['errors'] += 1
+                finally:
+                    pending.task_done()
+        
+        handlers = self._open_connections()
+        borrowed = not handlers
+        if borrowed:
+            # Hosting s limitem spojení na uživatele - projdi web přes výchozí spojení
+            print("Procházení: další spojení se nepodařilo otevřít, použije se výchozí")
+            handlers = [self.handler]
+        
+        threads = [threading.Thread(target=worker, args=(handler,), daemon=True) for handler in handlers]
+        for thread in threads:
+            thread.start()
+        pending.join()
+        for _ in threads:
+            pending.put((None, 0))
+        for thread in threads:
+            thread.join()
+        if not borrowed:
+            for handler in handlers:
+                handler.disconnect()
+        
+        self.stats['connections'] = len(handlers)
+        self.stats['seconds'] = time.perf_counter() - start
+        return self.galleries()
+    
+    def _open_connections(self) -> list:
+        """Otevře až self.connections dalších spojení (souběžně - každé stojí přihlášení)"""
+        handlers = []
+        
+        def open_one():
+            handler = self.handler.spawn()
+            if handler:
+                with self._lock:
+                    handlers.append(handler)
+        
+        threads = [threading.Thread(target=open_one, daemon=True) for _ in range(self.connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return handlers
+    
+    def _subtree_files(self, path: str):
+        """
+        Soubory složky path a všech jejích podsložek z již načtených výpisů: (cesta, položka)
+        Skryté soubory (např. rozpracované .název.part) se nepočítají.
+        """
+        prefix = path.rstrip('/') + '/'
+        for folder, items in self.listings.items():
+            if folder == path or folder.startswith(prefix):
+                for entry in items.files():
+                    if not entry.name.startswith('.'):
+                        yield posixpath.join(folder, entry.name), entry
+    
+    def galleries(self) -> List[Dict]:
+        """Galerie (složky s thumbnail/original/compress) z posledního procházení"""
+        result = []
+        for path, items in sorted(self.listings.items()):
+            folders = {entry.name.lower(): entry.name for entry in items.dirs()}
+            if not all(folder in folders for folder in VARIANT_FOLDERS):
+                continue
+            
+            variants = {}
+            files = {}
+            for folder in VARIANT_FOLDERS:
+                files[folder] = sorted(self._subtree_files(posixpath.join(path, folders[folder])))
+                variants[folder] = {'files': len(files[folder]),
+                                    'bytes': sum(entry.size or 0 for name, entry in files[folder])}
+            
+            # Titulní obrázek = první thumbnail podle cesty, poslední změna = nejnovější soubor
+            thumbnails = [name for name, entry in files['thumbnail'] if ImageProcessor.is_image(name)]
+            modified = [entry.modify for folder_files in files.values() for name, entry in folder_files
+                        if entry.modify]
+            
+            result.append({
+                'path': path,
+                'photos': variants['original']['files'],
+                'files': sum(variant['files'] for variant in variants.values()),
+                'bytes': sum(variant['bytes'] for variant in variants.values()),
+                'cover': posixpath.relpath(thumbnails[0], path) if thumbnails else None,
+                'updated': max(modified) if modified else None,
+                'variants': variants,
+            })
+        return result
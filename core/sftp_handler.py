@@ -0,0 +1,270 @@
+import os
+import socket
+import stat
+import time
+from typing import Dict, Tuple, Callable, Optional, Union
+from core.ftp_handler import FTPHandler
+from core.ftp_listing import Listing
+from core.rate_limiter import RateLimiter
+
+try:
+    import paramiko
+except ImportError:  # paramiko je volitelný - bez něj SFTP není k dispozici
+    paramiko = None
+
+
+class SFTPHandler(FTPHandler):
+    """
+    SFTP backend (paramiko) se stejným rozhraním jako FTPHandler
+    Všechny operace běží nad jedním SSH kanálem. Zápisy jsou pipelinované
+    (nečeká se na potvrzení každého bloku), čtení používá prefetch.
+    Klíče serverů se ukládají do known_hosts_file (důvěra při prvním připojení).
+    """
+    
+    backend = 'sftp'
+    
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None,
+                 known_hosts_file: str = "sftp_known_hosts"):
+        super().__init__(rate_limiter)
+        self.client = None
+        self.sftp = None
+        self.known_hosts_file = known_hosts_file
+        
+        # Pipelinované zápisy (bez čekání na potvrzení každého bloku)
+        self.pipelined = True
+    
+    def connect(self, host: str, port: int, username: str, password: str) -> Tuple[bool, str]:
+        """
+        Připojí se k SFTP serveru
+        Returns: (success, message)
+        """
+        if paramiko is None:
+            return False, "SFTP vyžaduje balíček paramiko (pip install paramiko)"
+        
+        try:
+            self.client = paramiko.SSHClient()
+            # Nové klíče se uloží (AutoAddPolicy zapisuje do načteného souboru)
+            if not os.path.exists(self.known_hosts_file):
+                open(self.known_hosts_file, 'a').close()
+            self.client.load_host_keys(self.known_hosts_file)
+            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            self.client.connect(host, port, username, password, timeout=10,
+                                allow_agent=False, look_for_keys=False)
+            self.credentials = (host, port, username, password)
+            
+            # SFTP je dotaz/odpověď - malé požadavky nesmí čekat na zpožděný ACK (Nagle)
+            self.client.get_transport().sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sftp = self.client.open_sftp()
+            # Domovská složka; dál se posílají jen absolutní cesty (bez chdir)
+            self.current_path = self.sftp.normalize('.')
+            self.dir_cache.clear()
+            self.dir_cache.add(self.current_path)
+            self.connected = True
+            return True, "Připojeno úspěšně"
+        except paramiko.AuthenticationException as e:
+            self.client.close()
+            return False, f"Chyba přihlášení: {str(e)}"
+        except Exception as e:
+            if self.client:
+                self.client.close()
+            return False, f"Chyba připojení: {str(e)}"
+    
+    def _clone(self) -> 'SFTPHandler':
+        handler = super()._clone()
+        handler.known_hosts_file = self.known_hosts_file
+        handler.pipelined = self.pipelined
+        return handler
+    
+    def disconnect(self):
+        """Odpojí se od SFTP serveru"""
+        if self.client and self.connected:
+            try:
+                self.sftp.close()
+                self.client.close()
+            except:
+                pass
+            finally:
+                self.connected = False
+                if self.rate_limiter:
+                    self.rate_limiter.release(self.connection_name)
+                self.sftp = None
+                self.client = None
+    
+    @staticmethod
+    def _facts(attr) -> Dict[str, str]:
+        """Atributy SFTP jako fakta ve tvaru MLSD ('type', 'size', 'modify')"""
+        mode = attr.st_mode or 0
+        if stat.S_ISDIR(mode):
+            facts = {'type': 'dir'}
+        elif stat.S_ISLNK(mode):
+            facts = {'type': 'OS.unix=slink'}
+        else:
+            facts = {'type': 'file', 'size': str(attr.st_size or 0)}
+        if attr.st_mtime is not None:
+            facts['modify'] = time.strftime('%Y%m%d%H%M%S', time.gmtime(attr.st_mtime))
+        return facts
+    
+    def fetch_entries(self, path: str = None) -> Listing:
+        """
+        Obsah adresáře i s metadaty (jeden požadavek READDIR, bez dalších STAT)
+        Chybu hlásí výjimkou (list_entries z FTPHandler ji převede na []).
+        """
+        if not self.connected:
+            raise ConnectionError("Nepřipojeno")
+        
+        directory = self._absolute(path)
+        entries = [(attr.filename, self._facts(attr)) for attr in self.sftp.listdir_attr(directory)]
+        self.dir_cache.add_listing(directory, [(name, facts['type'] == 'dir') for name, facts in entries])
+        return entries
+    
+    def _stat(self, path: str) -> Optional[Dict[str, str]]:
+        """Fakta jedné položky (jeden požadavek STAT). Returns: fakta nebo None"""
+        try:
+            return self._facts(self.sftp.stat(self._absolute(path)))
+        except IOError:
+            return None
+    
+    def create_directory(self, dirname: str) -> Tuple[bool, str]:
+        """Vytvoří nový adresář"""
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        path = self._absolute(dirname)
+        try:
+            self.sftp.mkdir(path)
+            self.dir_cache.add(path)
+            return True, f"Složka '{dirname}' vytvořena"
+        except IOError as e:
+            # SFTP vrací u existující složky jen obecné "Failure"
+            if (self._stat(path) or {}).get('type') == 'dir':
+                self.dir_cache.add(path)
+                return True, f"Složka '{dirname}' již existuje"
+            return False, f"Chyba při vytváření složky: {str(e)}"
+    
+    def _write_blocks(self, remote_path: str, blocks, report, priority: str):
+        """Zapíše bloky do vzdáleného souboru bez čekání na potvrzení každého zápisu"""
+        with self.sftp.open(remote_path, 'wb') as f:
+            f.set_pipelined(self.pipelined)
+            done = 0
+            for block in blocks:
+                f.write(block)
+                done += len(block)
+                self._throttle(len(block), priority)
+                if report:
+                    report(done)
+    
+    def upload_file(self, local_path: str, remote_path: str,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    priority: str = 'bulk') -> Tuple[bool, str]:
+        """
+        Nahraje soubor na SFTP
+        progress_callback: funkce(bytes_uploaded, total_bytes)
+        """
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        staging_path = self._staging_path(remote_path)
+        try:
+            report = self._progress_reporter(progress_callback, os.path.getsize(local_path))
+            with open(local_path, 'rb') as f:
+                self._write_blocks(staging_path, iter(lambda: f.read(self.blocksize), b''), report, priority)
+            return self._publish_staged(staging_path, remote_path)
+        except Exception as e:
+            self._discard_staged(staging_path, remote_path)
+            return False, f"Chyba při nahrávání: {str(e)}"
+    
+    def upload_bytes(self, data: Union[bytes, memoryview], remote_path: str,
+                     progress_callback: Optional[Callable[[int, int], None]] = None,
+                     priority: str = 'bulk') -> Tuple[bool, str]:
+        """
+        Nahraje data (bytes nebo memoryview) na SFTP
+        """
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        staging_path = self._staging_path(remote_path)
+        try:
+            view = memoryview(data).cast('B')
+            report = self._progress_reporter(progress_callback, view.nbytes)
+            # paramiko přijímá jen bytes - kopíruje se vždy jen jeden blok
+            blocks = (bytes(view[offset:offset + self.blocksize])
+                      for offset in range(0, view.nbytes, self.blocksize))
+            self._write_blocks(staging_path, blocks, report, priority)
+            return self._publish_staged(staging_path, remote_path)
+        except Exception as e:
+            self._discard_staged(staging_path, remote_path)
+            return False, f"Chyba při nahrávání: {str(e)}"
+    
+    def download_file(self, remote_path: str, local_path: str = None,
+                      priority: str = 'interactive') -> Tuple[bool, bytes, str]:
+        """
+        Stáhne soubor ze SFTP
+        Returns: (success, data, message)
+        """
+        if not self.connected:
+            return False, b"", "Nepřipojeno"
+        
+        try:
+            chunks = []
+            with self.sftp.open(self._absolute(remote_path), 'rb') as f:
+                f.prefetch()
+                for chunk in iter(lambda: f.read(self.blocksize), b''):
+                    self._throttle(len(chunk), priority)
+                    chunks.append(chunk)
+            data = b"".join(chunks)
+            
+            if local_path:
+                with open(local_path, 'wb') as f:
+                    f.write(data)
+            
+            return True, data, "Staženo"
+        except Exception as e:
+            return False, b"", f"Chyba při stahování: {str(e)}"
+    
+    def rename(self, from_path: str, to_path: str) -> Tuple[bool, str]:
+        """
+        Přejmenuje soubor; existující cíl se přepíše
+        posix-rename@openssh.com cíl nahradí atomicky, jinak se cíl nejdřív
+        smaže - ale jen pokud zdroj existuje (jinak by zmizela poslední dobrá kopie).
+        """
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        source, target = self._absolute(from_path), self._absolute(to_path)
+        try:
+            try:
+                self.sftp.posix_rename(source, target)
+            except IOError:
+                # Server bez rozšíření posix-rename - obyčejný RENAME cíl nepřepíše
+                if self._stat(source) is None:
+                    raise
+                if self._stat(target) is not None:
+                    self.sftp.remove(target)
+                self.sftp.rename(source, target)
+            return True, "Přejmenováno"
+        except Exception as e:
+            return False, f"Chyba při přejmenování: {str(e)}"
+    
+    def delete_file(self, remote_path: str) -> Tuple[bool, str]:
+        """Smaže soubor ze SFTP"""
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        try:
+            self.sftp.remove(self._absolute(remote_path))
+            return True, "Smazáno"
+        except Exception as e:
+            return False, f"Chyba při mazání: {str(e)}"
+    
+    def delete_directory(self, dirname: str) -> Tuple[bool, str]:
+        """Smaže prázdný adresář"""
+        if not self.connected:
+            return False, "Nepřipojeno"
+        
+        try:
+            path = self._absolute(dirname)
+            self.sftp.rmdir(path)
+            self.dir_cache.discard(path)
+            return True, "Složka smazána"
+        except Exception as e:
+            return False, f"Chyba při mazání složky: {str(e)}"
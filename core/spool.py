@@ -0,0 +1,96 @@
+import mmap
+import tempfile
+import threading
+import time
+from typing import Optional, Union
+
+
+class SpooledVariant:
+    """
+    Zakódovaná varianta čekající na nahrání
+    Data jsou buď v paměti (memoryview nad bufferem kodéru), nebo v dočasném
+    souboru namapovaném přes mmap. V obou případech je data memoryview,
+    takže je uploader čte bez kopie. Deskriptor dočasného souboru se zavírá
+    hned po namapování - soubor drží jen mmap a smaže se s ním.
+    """
+    
+    def __init__(self, spool: 'VariantSpool', size: int, data: Union[bytes, memoryview, None] = None,
+                 mapping: Optional[mmap.mmap] = None):
+        self.spool = spool
+        self.size = size
+        self.mapping = mapping
+        self.spilled = mapping is not None  # Jsou data na disku?
+        self.data = memoryview(mapping) if mapping is not None else data
+    
+    def release(self):
+        """Uvolní data (a smaže dočasný soubor)"""
+        if self.data is None:
+            return
+        if isinstance(self.data, memoryview):
+            self.data.release()
+        self.data = None
+        
+        if self.mapping is not None:
+            try:
+                self.mapping.close()
+            except BufferError:
+                # Někdo ještě drží pohled na data - mmap zavře garbage collector
+                pass
+            self.mapping = None
+        if not self.spilled:
+            self.spool._release_memory(self.size)
+
+
+class VariantSpool:
+    """
+    Paměťový rozpočet pro frontu kódování → nahrávání
+    Dokud se varianty vejdou do memory_budget, zůstávají v paměti. Další se
+    zapisují do dočasných souborů a čtou se zpět přes mmap.
+    """
+    
+    def __init__(self, memory_budget: int = 256 * 1024 * 1024, spill_dir: Optional[str] = None):
+        """
+        Args:
+            memory_budget: kolik bajtů smí být v paměti
+            spill_dir: složka pro dočasné soubory (None = systémová)
+        """
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.lock = threading.Lock()
+        self.memory_used = 0
+        self.spilled_bytes = 0
+        
+        # Volitelný sběr metrik (core.metrics.TransferMetrics)
+        self.metrics = None
+    
+    def store(self, data: Union[bytes, memoryview]) -> SpooledVariant:
+        """Uloží zakódovaná data do paměti, nebo (při překročení rozpočtu) na disk"""
+        size = memoryview(data).nbytes
+        with self.lock:
+            in_memory = size == 0 or self.memory_used + size <= self.memory_budget
+            if in_memory:
+                self.memory_used += size
+        if in_memory:
+            return SpooledVariant(self, size, data=data)
+        
+        start = time.perf_counter()
+        # TemporaryFile se smaže při zavření; mmap si drží vlastní odkaz
+        # na soubor, takže data zůstanou dostupná až do mapping.close()
+        with tempfile.TemporaryFile(prefix="photo_upload_", dir=self.spill_dir) as file:
+            file.write(data)
+            file.flush()
+            mapping = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+        
+        with self.lock:
+            self.spilled_bytes += size
+        if self.metrics is not None:
+            self.metrics.record('spool.spill', time.perf_counter() - start, size)
+        return SpooledVariant(self, size, mapping=mapping)
+    
+    def _release_memory(self, size: int):
+        with self.lock:
+            self.memory_used -= size
+    
+    def set_memory_budget(self, memory_budget: int):
+        """Nastaví paměťový rozpočet (bajty)"""
+        self.memory_budget = max(int(memory_budget), 0)
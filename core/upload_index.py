@@ -0,0 +1,57 @@
+import json
+import os
+from typing import Dict, Optional
+
+
+class UploadIndex:
+    """
+    Lokální evidence souborů nahraných na servery
+    Struktura: {server: {cílová složka: {název souboru: {'size', 'partial', 'hash', 'variants'}}}}
+    """
+    
+    def __init__(self, index_file: str = "upload_index.json"):
+        self.index_file = index_file
+        self.index = self._load_index()
+        self.current_server = ''  # Klíč serveru, ke kterému je aplikace připojena
+    
+    def _load_index(self) -> Dict:
+        """Načte index ze souboru"""
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Chyba při načítání indexu nahraných souborů: {e}")
+                return {}
+        return {}
+    
+    def save(self):
+        """Uloží index do souboru"""
+        try:
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, indent=1, ensure_ascii=False)
+        except Exception as e:
+            print(f"Chyba při ukládání indexu nahraných souborů: {e}")
+    
+    @staticmethod
+    def server_key(config: Optional[Dict]) -> str:
+        """Klíč serveru z FTP konfigurace"""
+        if not config:
+            return ''
+        return f"{config.get('username', '')}@{config.get('host', '')}:{config.get('port', 21)}"
+    
+    def get_gallery(self, server: str, base_path: str) -> Dict[str, dict]:
+        """Vrátí záznamy souborů nahraných do dané složky (živý slovník)"""
+        return self.index.setdefault(server, {}).setdefault(base_path, {})
+    
+    def record(self, server: str, base_path: str, filename: str, fingerprint: dict,
+               variants: Optional[Dict] = None):
+        """Zaeviduje nahraný soubor"""
+        entry = dict(fingerprint)
+        if variants:
+            entry['variants'] = variants
+        self.get_gallery(server, base_path)[filename] = entry
+    
+    def remove(self, server: str, base_path: str, filename: str):
+        """Odstraní záznam (soubor na serveru již neexistuje)"""
+        self.index.get(server, {}).get(base_path, {}).pop(filename, None)
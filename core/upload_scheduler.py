@@ -0,0 +1,101 @@
+import heapq
+import itertools
+import queue
+import threading
+from typing import Any, List, Optional
+
+
+class UploadScheduler:
+    """
+    Prioritní fronta přenosů jedné galerie
+    Nahrávací vlákno vždy dostane nejdůležitější připravený přenos: nejdřív
+    thumbnaily, pak průběžný index.php, komprimované verze a originály až
+    nakonec. Přenosy se stejnou prioritou jdou v pořadí vložení.
+    Po dobu hold() se méně důležité přenosy vůbec nezačnou, ani když je
+    spojení volné - jinak by se mezi každé dva thumbnaily vešel originál.
+    """
+    
+    THUMBNAIL = 0
+    INDEX = 1
+    COMPRESS = 2
+    ORIGINAL = 3
+    
+    def __init__(self):
+        self._heap = []
+        self._order = itertools.count()
+        self._pending = {}  # {priorita: počet čekajících přenosů}
+        self._held = None  # Přenosy s prioritou >= _held se zatím nevydávají
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def put(self, priority: int, task: Any):
+        """Zařadí přenos s danou prioritou (nižší číslo = dřív)"""
+        with self._condition:
+            heapq.heappush(self._heap, (priority, next(self._order), task))
+            self._pending[priority] = self._pending.get(priority, 0) + 1
+            self._condition.notify_all()
+    
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Vyjme nejdůležitější přenos
+        Returns: úloha, nebo None, pokud je fronta uzavřená a prázdná
+        Raises: queue.Empty, pokud do timeout nic nepřišlo
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._ready() or (self._closed and not self._heap), timeout):
+                raise queue.Empty
+            if not self._heap:
+                return None
+            priority, order, task = heapq.heappop(self._heap)
+            self._pending[priority] -= 1
+            self._condition.notify_all()
+            return task
+    
+    def _ready(self) -> bool:
+        return bool(self._heap) and (self._held is None or self._heap[0][0] < self._held)
+    
+    def hold(self, priority: int):
+        """Pozdrží přenosy s prioritou priority a nižší (do release)"""
+        with self._condition:
+            self._held = priority
+    
+    def release(self):
+        """Zruší hold()"""
+        with self._condition:
+            self._held = None
+            self._condition.notify_all()
+    
+    def pending(self, priority: int) -> int:
+        """Počet čekajících přenosů s danou prioritou"""
+        with self._condition:
+            return self._pending.get(priority, 0)
+    
+    def wait_below(self, priority: int, limit: int, timeout: Optional[float] = None) -> bool:
+        """
+        Počká, až bude čekajících přenosů s prioritou méně než limit
+        (omezuje, kolik zakódovaných dat smí ležet ve spoolu)
+        Returns: True, pokud je místo
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending.get(priority, 0) < limit or self._closed, timeout)
+    
+    def qsize(self) -> int:
+        with self._condition:
+            return len(self._heap)
+    
+    def close(self):
+        """Další přenosy už nepřibudou - get() po vyprázdnění vrátí None"""
+        with self._condition:
+            self._closed = True
+            self._held = None
+            self._condition.notify_all()
+    
+    def drain(self) -> List[Any]:
+        """Vyjme všechny čekající přenosy (při zrušení nahrávání)"""
+        with self._condition:
+            tasks = [task for priority, order, task in sorted(self._heap)]
+            self._heap = []
+            self._pending = {}
+            self._condition.notify_all()
+            return tasks
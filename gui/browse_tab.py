@@ -2,29 +2,82 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 from io import BytesIO
+import posixpath
 import threading
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
+from core.catalog import SiteCatalog
 from core.ftp_handler import FTPHandler
 from core.image_processor import ImageProcessor
+from core.perceptual_hash import PerceptualIndex, dhash
+from core.remote_entry import RemoteListing
+from core.remote_gallery import group_photos, list_files
+from core.remote_walk import RemoteWalker
+from core.upload_index import UploadIndex
 
 
 class BrowseTab(ttk.Frame):
     """Záložka pro procházení a mazání fotek z FTP"""
     
-    def __init__(self, parent, ftp_handler: FTPHandler, image_processor: ImageProcessor, status_callback):
+    # Vlastní spojení záložky se po tolika sekundách nečinnosti otevře znovu
+    # (servery nečinná spojení zavírají, typicky po 300 s)
+    CONNECTION_IDLE = 60.0
+    
+    def __init__(self, parent, ftp_handler: FTPHandler, image_processor: ImageProcessor,
+                 upload_index: UploadIndex, catalog: SiteCatalog, status_callback):
         super().__init__(parent)
         
         self.ftp_handler = ftp_handler
         self.image_processor = image_processor
+        self.upload_index = upload_index
+        self.catalog = catalog
         self.status_callback = status_callback
         
         self.current_folder = None
         self.photos = []  # List of (filename, has_structure)
+        self.photo_files = {}  # {filename: {složka: [soubory všech formátů]}} (jen se strukturou)
         self.photo_thumbnails = {}  # Cache pro thumbnaily
+        self.photo_hashes = {}  # Cache perceptuálních hashů
         self.selected_photos = set()
         
+        # Vlastní spojení pro náhledy, výpisy a mazání (viz _connection)
+        self._connection_lock = threading.Lock()
+        self._own_handler = None
+        self._own_source = None  # (hlavní handler, přihlašovací údaje), pro které bylo otevřeno
+        self._own_used = 0.0
+        
         self._create_widgets()
     
+    def _connection(self):
+        """
+        Spojení pro práci záložky
+        Hlavní spojení je během nahrávání obsazené celým přenosem (řídicí spojení
+        nepřijme další příkaz, dokud STOR neskončí, a čekání na omezení rychlosti
+        je součástí přenosu), takže náhledy a mazání mají vlastní spojení.
+        Nepovolí-li server další spojení, pracuje se přes hlavní.
+        """
+        with self._connection_lock:
+            now = time.monotonic()
+            current = (self.ftp_handler, self.ftp_handler.credentials) if self.ftp_handler.connected else None
+            if current != self._own_source or now - self._own_used > self.CONNECTION_IDLE:
+                self._close_own_handler()
+                if current is not None:
+                    self._own_handler = self.ftp_handler.spawn()
+                    self._own_source = current
+            self._own_used = now
+            return self._own_handler or self.ftp_handler
+    
+    def _close_own_handler(self):
+        if self._own_handler is not None:
+            self._own_handler.disconnect()
+        self._own_handler = None
+        self._own_source = None
+    
+    def close_connection(self):
+        """Zavře vlastní spojení záložky (při odpojení hlavního)"""
+        with self._connection_lock:
+            self._close_own_handler()
+    
     def _create_widgets(self):
         """Vytvoří widgety"""
         
@@ -47,6 +100,12 @@ class BrowseTab(ttk.Frame):
         ttk.Button(control_frame, text="☐ Zrušit výběr", 
                   command=self._deselect_all).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(control_frame, text="🧬 Vybrat duplicity", 
+                  command=self._select_near_duplicates).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(control_frame, text="🌐 Galerie webu", 
+                  command=self._inventory_site).pack(side=tk.LEFT, padx=5)
+        
         self.folder_label = ttk.Label(control_frame, text="Žádná složka", foreground="gray")
         self.folder_label.pack(side=tk.LEFT, padx=20)
         
@@ -130,17 +189,18 @@ class BrowseTab(ttk.Frame):
         """Načte fotky ve vlákně"""
         try:
             # Zkontroluj zda složka má strukturu
-            has_structure, found = self.ftp_handler.has_photo_structure(self.current_folder)
+            handler = self._connection()
+            has_structure, found = handler.has_photo_structure(self.current_folder)
             
             if has_structure:
-                # Načti z thumbnail složky
-                self.ftp_handler.change_directory(self.current_folder + "/thumbnail")
-                items = self.ftp_handler.list_directory()
-                
-                self.photos = []
-                for name, is_dir in items:
-                    if not is_dir and self.image_processor.is_image(name):
-                        self.photos.append((name, True))
+                # Varianty jedné fotky se mohou lišit formátem - seskup je podle názvu bez přípony;
+                # včetně podsložek (klíčem je relativní cesta, např. DCIM/100CANON/IMG_1.jpg)
+                listings = {folder: list_files(handler, f"{self.current_folder}/{folder}")
+                            for folder in ('thumbnail', 'original', 'compress')}
+                self.photo_files = group_photos({folder: [name for name, facts in files]
+                                                 for folder, files in listings.items()})
+                self.photos = [(filename, True) for filename in self.photo_files]
+                total_size = sum(int(facts.get('size') or 0) for name, facts in listings['original'])
                 
                 self.after(0, lambda: self.structure_label.config(
                     text="✓ Detekována struktura (thumbnail/original/compress)", 
@@ -148,12 +208,10 @@ class BrowseTab(ttk.Frame):
                 ))
             else:
                 # Načti přímo ze složky
-                items = self.ftp_handler.list_directory(self.current_folder)
-                
-                self.photos = []
-                for name, is_dir in items:
-                    if not is_dir and self.image_processor.is_image(name):
-                        self.photos.append((name, False))
+                images = self._remote_images(handler.list_directory(self.current_folder))
+                total_size = images.total_size()
+                self.photo_files = {}
+                self.photos = [(entry.name, False) for entry in images]
                 
                 self.after(0, lambda: self.structure_label.config(
                     text="⚠ Není detekována struktura", 
@@ -162,12 +220,17 @@ class BrowseTab(ttk.Frame):
             
             # Aktualizuj UI
             self.after(0, self._update_photo_list)
-            self.after(0, lambda: self.status_callback(f"Načteno {len(self.photos)} fotek"))
+            total_mb = total_size / 1024 / 1024
+            self.after(0, lambda: self.status_callback(f"Načteno {len(self.photos)} fotek ({total_mb:.1f} MB)"))
             
         except Exception as e:
             self.after(0, lambda: messagebox.showerror("Chyba", f"Chyba při načítání: {e}"))
             self.after(0, lambda: self.status_callback("Chyba při načítání"))
     
+    def _remote_images(self, items: RemoteListing) -> RemoteListing:
+        """Obrázky z výpisu složky (velikost a datum už jsou ve výpisu)"""
+        return items.files().filter(lambda entry: self.image_processor.is_image(entry.name))
+    
     def _update_photo_list(self):
         """Aktualizuje seznam fotek"""
         self.photo_listbox.delete(0, tk.END)
@@ -210,30 +273,13 @@ class BrowseTab(ttk.Frame):
     def _load_preview_thread(self, filename: str, has_structure: bool):
         """Načte náhled ve vlákně"""
         try:
-            # Zkus načíst z cache
-            if filename in self.photo_thumbnails:
-                img_data = self.photo_thumbnails[filename]
-            else:
-                # Stáhni thumbnail
-                if has_structure:
-                    remote_path = f"{self.current_folder}/thumbnail/{filename}"
-                else:
-                    remote_path = f"{self.current_folder}/{filename}"
-                
-                success, img_data, msg = self.ftp_handler.download_file(remote_path)
-                
-                if not success:
-                    self.after(0, lambda: self.preview_label.config(
-                        text=f"Chyba načítání: {msg}"
-                    ))
-                    return
-                
-                # Pokud nemá strukturu, vytvoř thumbnail
-                if not has_structure:
-                    success, img_data, msg = self.image_processor.create_thumbnail_from_bytes(img_data)
-                
-                # Ulož do cache
-                self.photo_thumbnails[filename] = img_data
+            success, img_data, msg = self._get_thumbnail(filename, has_structure)
+            
+            if not success:
+                self.after(0, lambda: self.preview_label.config(
+                    text=f"Chyba načítání: {msg}"
+                ))
+                return
             
             # Zobraz
             image = Image.open(BytesIO(img_data))
@@ -250,6 +296,39 @@ class BrowseTab(ttk.Frame):
                 text=f"Chyba zobrazení: {str(e)}"
             ))
     
+    def _get_thumbnail(self, filename: str, has_structure: bool):
+        """
+        Vrátí data thumbnailu (z cache, jinak stáhne z FTP)
+        Returns: (success, thumbnail_bytes, message)
+        """
+        # Zkus načíst z cache
+        if filename in self.photo_thumbnails:
+            return True, self.photo_thumbnails[filename], "Z cache"
+        
+        # Stáhni thumbnail (bez thumbnailu aspoň komprimovanou verzi)
+        if has_structure:
+            files = self.photo_files.get(filename, {})
+            name = next(iter(files.get('thumbnail') or files.get('compress') or []), None)
+            if name is None:
+                return False, None, "Fotka nemá thumbnail"
+            remote_path = f"{self.current_folder}/{'thumbnail' if files.get('thumbnail') else 'compress'}/{name}"
+        else:
+            remote_path = f"{self.current_folder}/{filename}"
+        
+        success, img_data, msg = self._connection().download_file(remote_path)
+        if not success:
+            return False, None, msg
+        
+        # Pokud nemá strukturu, vytvoř thumbnail
+        if not has_structure:
+            success, img_data, msg = self.image_processor.create_thumbnail_from_bytes(img_data)
+            if not success:
+                return False, None, msg
+        
+        # Ulož do cache
+        self.photo_thumbnails[filename] = img_data
+        return True, img_data, "Staženo"
+    
     def _display_preview(self, photo, filename: str, image):
         """Zobrazí náhled"""
         self.preview_label.config(image=photo, text='')
@@ -276,6 +355,109 @@ class BrowseTab(ttk.Frame):
         self.selected_photos.clear()
         self._update_counts()
     
+    def _select_near_duplicates(self):
+        """Vybere téměř stejné fotky (např. snímky ze sériové fotografie) kromě nejlepší z každé skupiny"""
+        if not self.photos:
+            messagebox.showwarning("Upozornění", "Žádné načtené fotky")
+            return
+        
+        self.status_callback("Hledám podobné fotky...")
+        thread = threading.Thread(target=self._near_duplicates_thread, args=(list(self.photos),), daemon=True)
+        thread.start()
+    
+    def _near_duplicates_thread(self, photos: List):
+        """
+        Spočítá perceptuální hashe a seskupí podobné fotky ve vlákně
+        Soubory se stejným názvem bez přípony (IMG_1.jpg + IMG_1.webp v souborech
+        bez struktury) jsou jedna fotka - hashuje se jen jeden z nich a ve shluku
+        zůstanou všechny formáty ponechané fotky.
+        """
+        try:
+            known = self._indexed_photos()
+            index = PerceptualIndex()
+            
+            variants: Dict[str, List[int]] = {}  # {soubor hashované fotky: pozice všech jejích formátů}
+            stems: Dict[str, str] = {}
+            order = sorted(range(len(photos)), key=lambda i: ImageProcessor.format_priority(photos[i][0]))
+            for i in order:
+                filename = photos[i][0]
+                stem = posixpath.splitext(filename)[0]
+                stems.setdefault(stem, filename)
+                variants.setdefault(stems[stem], []).append(i)
+            
+            for done, (filename, positions) in enumerate(variants.items()):
+                has_structure = photos[positions[0]][1]
+                perceptual_hash = self._get_perceptual_hash(filename, has_structure, known.get(filename))
+                if perceptual_hash is not None:
+                    index.add(filename, perceptual_hash)
+                if done % 50 == 0:
+                    self.after(0, lambda done=done: self.status_callback(
+                        f"Hledám podobné fotky... {done}/{len(variants)}"))
+            
+            # Každá fotka shluku je téměř kopií ponechané (úplné propojení)
+            clusters = index.clusters()
+            
+            duplicates = []
+            for cluster in clusters:
+                best = max(cluster, key=lambda name: self._quality_score(
+                    name, photos[variants[name][0]][1], known.get(name), cluster, known))
+                for name in cluster:
+                    if name != best:
+                        duplicates.extend(variants[name])
+            duplicates.sort()
+            
+            self.after(0, lambda: self._apply_duplicate_selection(duplicates, len(clusters)))
+            
+        except Exception as e:
+            self.after(0, lambda: messagebox.showerror("Chyba", f"Chyba při hledání duplicit: {e}"))
+            self.after(0, lambda: self.status_callback("Chyba při hledání duplicit"))
+    
+    def _indexed_photos(self) -> Dict[str, dict]:
+        """Záznamy z indexu nahraných souborů pro aktuální složku (klíčem je název thumbnailu)"""
+        gallery = self.upload_index.get_gallery(self.upload_index.current_server, self.current_folder)
+        by_thumbnail = {}
+        for filename, entry in gallery.items():
+            by_thumbnail[filename] = entry
+            for name in (entry.get('variants') or {}).get('thumbnail', {}).values():
+                by_thumbnail[name] = entry
+        return by_thumbnail
+    
+    def _get_perceptual_hash(self, filename: str, has_structure: bool,
+                             entry: Optional[dict]) -> Optional[int]:
+        """Perceptuální hash fotky - z indexu, z cache, nebo ze staženého thumbnailu"""
+        perceptual_hash = PerceptualIndex.from_hex(entry.get('phash')) if entry else None
+        if perceptual_hash is None:
+            perceptual_hash = self.photo_hashes.get(filename)
+        if perceptual_hash is None:
+            success, img_data, msg = self._get_thumbnail(filename, has_structure)
+            if not success:
+                return None
+            with Image.open(BytesIO(img_data)) as image:
+                perceptual_hash = dhash(image)
+            self.photo_hashes[filename] = perceptual_hash
+        return perceptual_hash
+    
+    def _quality_score(self, filename: str, has_structure: bool, entry: Optional[dict],
+                       cluster: List[str], known: Dict[str, dict]) -> int:
+        """
+        Skóre pro výběr nejlepší fotky ze skupiny
+        Pokud index zná velikost originálů celé skupiny, vyhrává největší originál,
+        jinak největší thumbnail (ostřejší snímek se hůř komprimuje).
+        """
+        if all(known.get(name, {}).get('size') for name in cluster):
+            return entry['size']
+        success, img_data, msg = self._get_thumbnail(filename, has_structure)
+        return len(img_data) if success else 0
+    
+    def _apply_duplicate_selection(self, duplicates: List[int], cluster_count: int):
+        """Označí nalezené duplicity v seznamu"""
+        self.photo_listbox.selection_clear(0, tk.END)
+        for idx in duplicates:
+            self.photo_listbox.selection_set(idx)
+        self.selected_photos = set(duplicates)
+        self._update_counts()
+        self.status_callback(f"Vybráno {len(duplicates)} duplicit v {cluster_count} skupinách")
+    
     def _delete_selected(self):
         """Smaže vybrané fotky"""
         if not self.selected_photos:
@@ -339,23 +521,39 @@ class BrowseTab(ttk.Frame):
             for filename, has_structure in photos_list:
                 try:
                     if has_structure:
-                        # Smaž ze všech tří složek
-                        self.ftp_handler.delete_file(f"{self.current_folder}/thumbnail/{filename}")
-                        self.ftp_handler.delete_file(f"{self.current_folder}/original/{filename}")
-                        self.ftp_handler.delete_file(f"{self.current_folder}/compress/{filename}")
+                        # Smaž všechny varianty (všechny formáty) ze všech tří složek
+                        files = self.photo_files.get(filename, {})
+                        paths = [f"{self.current_folder}/{folder}/{name}"
+                                 for folder, names in files.items() for name in names]
                     else:
                         # Smaž přímo
-                        self.ftp_handler.delete_file(f"{self.current_folder}/{filename}")
+                        paths = [f"{self.current_folder}/{filename}"]
+                    
+                    failed = []
+                    for path in paths:
+                        success, msg = self._connection().delete_file(path)
+                        if not success:
+                            failed.append(f"{path}: {msg}")
+                    if failed:
+                        errors.extend(failed)
+                        continue
                     
                     deleted += 1
                     
                     # Odstraň z cache
                     if filename in self.photo_thumbnails:
                         del self.photo_thumbnails[filename]
+                    self.photo_hashes.pop(filename, None)
                     
                 except Exception as e:
                     errors.append(f"{filename}: {str(e)}")
             
+            # Katalog webu - jen tato galerie
+            if deleted and any(has_structure for filename, has_structure in photos_list):
+                success, msg = self.catalog.refresh(self._connection(), self.current_folder)
+                if not success:
+                    print(f"Chyba při aktualizaci katalogu: {msg}")
+            
             # Znovu načti
             self.after(0, self._reload_current_folder)
             
@@ -377,6 +575,101 @@ class BrowseTab(ttk.Frame):
         """Znovu načte aktuální složku"""
         if self.current_folder:
             self._on_folder_selected(self.current_folder)
+    
+    def _inventory_site(self):
+        """Najde všechny galerie na webu (paralelně, přes další spojení)"""
+        if not self.ftp_handler.connected:
+            messagebox.showwarning("Upozornění", "Nejprve se připojte k FTP (záložka Nahrát)")
+            return
+        
+        self.status_callback("Procházím web...")
+        thread = threading.Thread(target=self._inventory_thread, daemon=True)
+        thread.start()
+    
+    def _inventory_thread(self):
+        """Vlákno pro procházení webu (od kořene katalogu - výchozí složky po připojení)"""
+        walker = RemoteWalker(self._connection(), connections=8)
+        
+        def progress(done, found):
+            self.after(0, lambda: self.status_callback(f"Procházím web... {done}/{found} složek"))
+        
+        galleries = walker.walk(self.catalog.root, progress)
+        stats = walker.stats
+        errors = f", nevypsáno: {stats['errors']}" if stats.get('errors') else ""
+        self.after(0, lambda: self.status_callback(
+            f"Nalezeno {len(galleries)} galerií ({stats.get('directories', 0)} složek "
+            f"za {stats.get('seconds', 0):.1f} s{errors})"
+        ))
+        self.after(0, lambda: SiteGalleriesDialog(self, galleries, self._on_folder_selected,
+                                                  lambda found: self._publish_catalog(found, stats)))
+    
+    def _publish_catalog(self, galleries: List[Dict], stats: Optional[Dict] = None):
+        """
+        Nahraje katalog sestavený z právě prošlého webu (bez dalšího procházení)
+        stats: statistiky procházení - po chybách výpisu se katalog nenahraje
+        """
+        def publish():
+            success, msg = self.catalog.rebuild(self._connection(), galleries, stats)
+            if success:
+                self.after(0, lambda: self.status_callback(f"Katalog nahrán ({self.catalog.remote_path})"))
+            else:
+                self.after(0, lambda: messagebox.showerror("Chyba", f"Katalog se nepodařilo nahrát: {msg}"))
+        
+        threading.Thread(target=publish, daemon=True).start()
+
+
+class SiteGalleriesDialog(tk.Toplevel):
+    """Seznam galerií nalezených na webu; dvojklik galerii otevře"""
+    
+    def __init__(self, parent, galleries: List[Dict], callback, publish_callback):
+        super().__init__(parent)
+        
+        self.galleries = galleries
+        self.callback = callback
+        self.publish_callback = publish_callback
+        
+        self.title(f"Galerie webu ({len(galleries)})")
+        self.geometry("600x400")
+        self.transient(parent)
+        
+        list_frame = ttk.Frame(self)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        scrollbar = ttk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.tree = ttk.Treeview(list_frame, columns=('photos', 'size'), yscrollcommand=scrollbar.set)
+        self.tree.heading('#0', text="Galerie")
+        self.tree.heading('photos', text="Fotek")
+        self.tree.heading('size', text="Velikost")
+        self.tree.column('photos', width=70, anchor=tk.E)
+        self.tree.column('size', width=90, anchor=tk.E)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.bind('<Double-Button-1>', lambda e: self._open())
+        scrollbar.config(command=self.tree.yview)
+        
+        for index, gallery in enumerate(galleries):
+            self.tree.insert('', tk.END, iid=str(index), text=gallery['path'],
+                             values=(gallery['photos'], f"{gallery['bytes'] / 1024 / 1024:.1f} MB"))
+        
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        total_mb = sum(gallery['bytes'] for gallery in galleries) / 1024 / 1024
+        total_photos = sum(gallery['photos'] for gallery in galleries)
+        ttk.Label(button_frame, text=f"Celkem {total_photos} fotek, {total_mb:.1f} MB").pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Zavřít", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Otevřít", command=self._open).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Publikovat katalog",
+                   command=lambda: self.publish_callback(self.galleries)).pack(side=tk.RIGHT, padx=5)
+    
+    def _open(self):
+        """Otevře vybranou galerii v záložce Procházet"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        self.callback(self.galleries[int(selection[0])]['path'])
+        self.destroy()
 
 
 class FolderBrowserDialog(tk.Toplevel):
@@ -430,11 +723,8 @@ class FolderBrowserDialog(tk.Toplevel):
     def _refresh_list(self):
         """Obnoví seznam"""
         self.folder_listbox.delete(0, tk.END)
-        items = self.ftp_handler.list_directory()
-        
-        for name, is_dir in items:
-            if is_dir:
-                self.folder_listbox.insert(tk.END, f"📁 {name}")
+        for entry in self.ftp_handler.list_directory().dirs():
+            self.folder_listbox.insert(tk.END, f"📁 {entry.name}")
         
         self.current_path = self.ftp_handler.get_current_path()
         self.path_label.config(text=self.current_path)
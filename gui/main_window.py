@@ -1,8 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+from core.catalog import SiteCatalog
 from core.config_manager import FTPConfig
-from core.ftp_handler import FTPHandler
+from core.ftp_handler import create_ftp_handler
 from core.image_processor import ImageProcessor
+from core.rate_limiter import RateLimiter
+from core.upload_index import UploadIndex
 from gui.upload_tab import UploadTab
 from gui.browse_tab import BrowseTab
 
@@ -18,8 +21,11 @@ class MainApplication(tk.Tk):
         
         # Inicializace komponent
         self.config_manager = FTPConfig()
-        self.ftp_handler = FTPHandler()
+        self.rate_limiter = RateLimiter()
+        self.ftp_handler = create_ftp_handler(rate_limiter=self.rate_limiter)
         self.image_processor = ImageProcessor()
+        self.upload_index = UploadIndex()
+        self.catalog = SiteCatalog()
         
         # Vytvoř hlavní menu
         self._create_menu()
@@ -42,12 +48,17 @@ class MainApplication(tk.Tk):
             self.config_manager, 
             self.ftp_handler, 
             self.image_processor,
+            self.upload_index,
+            self.catalog,
             self.update_status
         )
+        self.upload_tab.backend_callback = self._switch_ftp_handler
         self.browse_tab = BrowseTab(
             self.notebook,
             self.ftp_handler,
             self.image_processor,
+            self.upload_index,
+            self.catalog,
             self.update_status
         )
         
@@ -74,6 +85,14 @@ class MainApplication(tk.Tk):
         menubar.add_cascade(label="Nastavení", menu=settings_menu)
         settings_menu.add_command(label="Velikost thumbnailů", command=self._set_thumbnail_size)
         settings_menu.add_command(label="Kvalita komprimace", command=self._set_compress_quality)
+        settings_menu.add_command(label="Adaptivní kvalita", command=self._set_quality_mode)
+        settings_menu.add_command(label="Výstupní formát", command=self._set_output_format)
+        settings_menu.add_command(label="Komprimace PNG", command=self._set_png_policy)
+        settings_menu.add_command(label="Úsilí kodéru", command=self._set_encoder_effort)
+        settings_menu.add_command(label="Metadata a orientace", command=self._set_metadata_policy)
+        settings_menu.add_command(label="Velikost bloku přenosu", command=self._set_transfer_blocksize)
+        settings_menu.add_command(label="Atomické zveřejnění", command=self._set_atomic_publish)
+        settings_menu.add_command(label="Paměť fronty nahrávání", command=self._set_spool_budget)
         
         # O aplikaci
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -84,8 +103,26 @@ class MainApplication(tk.Tk):
         """Otevře okno pro správu FTP konfigurací"""
         ConfigManagerWindow(self, self.config_manager)
     
+    def _switch_ftp_handler(self, backend: str):
+        """
+        Vymění FTP handler za jiný backend (ftplib / asyncio / ftps / sftp)
+        Volá se před připojením, pokud konfigurace požaduje jiný backend.
+        """
+        if self.ftp_handler.connected:
+            self.ftp_handler.disconnect()
+        self.browse_tab.close_connection()
+        
+        handler = create_ftp_handler(backend, self.rate_limiter)
+        handler.set_blocksize(self.ftp_handler.blocksize)
+        handler.atomic_publish = self.ftp_handler.atomic_publish
+        self.ftp_handler = handler
+        self.upload_tab.ftp_handler = handler
+        self.browse_tab.ftp_handler = handler
+        return handler
+    
     def _disconnect_ftp(self):
         """Odpojí FTP spojení"""
+        self.browse_tab.close_connection()
         if self.ftp_handler.connected:
             self.ftp_handler.disconnect()
             self.update_status("Odpojeno")
@@ -119,6 +156,101 @@ class MainApplication(tk.Tk):
             self.image_processor.set_compress_quality(quality)
             messagebox.showinfo("Nastavení", f"Kvalita komprimace nastavena na {quality}")
     
+    def _set_quality_mode(self):
+        """Nastaví adaptivní volbu kvality JPEG"""
+        dialog = QualityModeDialog(self, self.image_processor)
+        self.wait_window(dialog)
+        
+        if dialog.result:
+            messagebox.showinfo("Nastavení", f"Režim kvality nastaven na {dialog.result}")
+    
+    def _set_output_format(self):
+        """Nastaví výstupní formát thumbnailů a komprimovaných fotek"""
+        dialog = OutputFormatDialog(self, self.image_processor)
+        self.wait_window(dialog)
+        
+        if dialog.result:
+            messagebox.showinfo("Nastavení", f"Výstupní formát nastaven na {dialog.result}")
+    
+    def _set_png_policy(self):
+        """Nastaví časový limit a ztrátové kandidáty pro komprimaci PNG"""
+        budget = simpledialog.askfloat(
+            "Komprimace PNG",
+            "Časový limit pro hledání nejmenšího kódování PNG (s):",
+            initialvalue=self.image_processor.png_time_budget,
+            minvalue=0.1,
+            maxvalue=60
+        )
+        if budget is None:
+            return
+        
+        allow_lossy = messagebox.askyesno(
+            "Komprimace PNG",
+            "Povolit ztrátové kandidáty (paleta, WebP, JPEG u obrázků bez průhlednosti)?"
+        )
+        self.image_processor.png_time_budget = budget
+        self.image_processor.png_allow_lossy = allow_lossy
+        messagebox.showinfo(
+            "Nastavení",
+            f"Limit komprimace PNG nastaven na {budget:g} s, "
+            f"ztrátové kandidáty {'povoleny' if allow_lossy else 'zakázány'}"
+        )
+    
+    def _set_transfer_blocksize(self):
+        """Nastaví velikost bloku FTP přenosu"""
+        blocksize = simpledialog.askinteger(
+            "Velikost bloku přenosu",
+            "Velikost bloku při nahrávání a stahování (KiB):",
+            initialvalue=self.ftp_handler.blocksize // 1024,
+            minvalue=4,
+            maxvalue=16384
+        )
+        if blocksize:
+            self.ftp_handler.set_blocksize(blocksize * 1024)
+            messagebox.showinfo("Nastavení", f"Velikost bloku přenosu nastavena na {blocksize} KiB")
+    
+    def _set_atomic_publish(self):
+        """Zapne/vypne nahrávání pod dočasným názvem s následným přejmenováním"""
+        atomic = messagebox.askyesno(
+            "Atomické zveřejnění",
+            "Nahrávat soubory pod dočasným názvem a po dokončení je přejmenovat?\n\n"
+            "Návštěvníci ani CDN pak nikdy nedostanou napůl nahraný obrázek\n"
+            "nebo index.php (stojí jeden příkaz přejmenování na soubor)."
+        )
+        self.ftp_handler.atomic_publish = atomic
+        messagebox.showinfo("Nastavení", f"Atomické zveřejnění {'zapnuto' if atomic else 'vypnuto'}")
+    
+    def _set_spool_budget(self):
+        """Nastaví paměťový rozpočet pro zakódované varianty čekající na nahrání"""
+        spool = self.upload_tab.spool
+        budget = simpledialog.askinteger(
+            "Paměť fronty nahrávání",
+            "Kolik MB smí zabírat zakódované varianty čekající na nahrání\n"
+            "(nad limitem se odkládají do dočasných souborů):",
+            initialvalue=spool.memory_budget // (1024 * 1024),
+            minvalue=0,
+            maxvalue=65536
+        )
+        if budget is not None:
+            spool.set_memory_budget(budget * 1024 * 1024)
+            messagebox.showinfo("Nastavení", f"Paměť fronty nahrávání nastavena na {budget} MB")
+    
+    def _set_encoder_effort(self):
+        """Nastaví úsilí kodéru pro thumbnaily a komprimované fotky"""
+        dialog = EncoderEffortDialog(self, self.image_processor)
+        self.wait_window(dialog)
+        
+        if dialog.result:
+            messagebox.showinfo("Nastavení", "Úsilí kodéru uloženo")
+    
+    def _set_metadata_policy(self):
+        """Nastaví zacházení s EXIF/ICC a orientací komprimovaných fotek"""
+        dialog = MetadataDialog(self, self.image_processor)
+        self.wait_window(dialog)
+        
+        if dialog.result:
+            messagebox.showinfo("Nastavení", "Nastavení metadat uloženo")
+    
     def _show_about(self):
         """Zobrazí informace o aplikaci"""
         messagebox.showinfo(
@@ -139,6 +271,7 @@ class MainApplication(tk.Tk):
     
     def on_closing(self):
         """Handler při zavírání aplikace"""
+        self.browse_tab.close_connection()
         if self.ftp_handler.connected:
             self.ftp_handler.disconnect()
         self.destroy()
@@ -244,7 +377,7 @@ class ConfigDialog(tk.Toplevel):
         
         self.result = None
         self.title(title)
-        self.geometry("400x250")
+        self.geometry("400x290")
         self.transient(parent)
         self.grab_set()
         
@@ -278,6 +411,15 @@ class ConfigDialog(tk.Toplevel):
         self.password_entry = ttk.Entry(form_frame, width=30, show="*")
         self.password_entry.grid(row=4, column=1, pady=5)
         
+        # Backend (ftplib = vlákna, asyncio = jedna smyčka událostí, ftps = FTP přes TLS,
+        # sftp = SSH, vyžaduje paramiko)
+        ttk.Label(form_frame, text="Backend:").grid(row=5, column=0, sticky=tk.W, pady=5)
+        self.backend_combo = ttk.Combobox(form_frame, values=['ftplib', 'asyncio', 'ftps', 'sftp'],
+                                          state='readonly', width=27)
+        self.backend_combo.grid(row=5, column=1, pady=5)
+        self.backend_combo.set('ftplib')
+        self.backend_combo.bind('<<ComboboxSelected>>', lambda e: self._backend_changed())
+        
         # Pokud upravujeme, předvyplň hodnoty
         if config:
             self.name_entry.insert(0, config['name'])
@@ -286,6 +428,7 @@ class ConfigDialog(tk.Toplevel):
             self.port_entry.insert(0, str(config['port']))
             self.username_entry.insert(0, config['username'])
             self.password_entry.insert(0, config['password'])
+            self.backend_combo.set(config.get('backend', 'ftplib'))
         
         # Tlačítka
         button_frame = ttk.Frame(self)
@@ -294,6 +437,14 @@ class ConfigDialog(tk.Toplevel):
         ttk.Button(button_frame, text="Uložit", command=self._save).pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Zrušit", command=self.destroy).pack(side=tk.RIGHT, padx=5)
     
+    def _backend_changed(self):
+        """Přepne výchozí port mezi FTP (21) a SFTP (22)"""
+        port = self.port_entry.get().strip()
+        default = "22" if self.backend_combo.get() == 'sftp' else "21"
+        if port in ("21", "22") and port != default:
+            self.port_entry.delete(0, tk.END)
+            self.port_entry.insert(0, default)
+    
     def _save(self):
         """Uloží konfiguraci"""
         name = self.name_entry.get().strip()
@@ -317,7 +468,293 @@ class ConfigDialog(tk.Toplevel):
             'host': host,
             'port': port,
             'username': username,
-            'password': password
+            'password': password,
+            'backend': self.backend_combo.get()
         }
         
         self.destroy()
+
+
+
+class OutputFormatDialog(tk.Toplevel):
+    """Dialog pro nastavení výstupního formátu (JPEG/WebP/AVIF)"""
+    
+    def __init__(self, parent, image_processor: ImageProcessor):
+        super().__init__(parent)
+        
+        self.image_processor = image_processor
+        self.result = None
+        self.title("Výstupní formát")
+        self.geometry("420x300")
+        self.transient(parent)
+        self.grab_set()
+        
+        form_frame = ttk.Frame(self, padding=20)
+        form_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Formát (nabízíme jen formáty, které Pillow umí zapsat)
+        ttk.Label(form_frame, text="Formát:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        formats = ['auto'] + [fmt for fmt in image_processor.get_available_formats()
+                              if fmt in ('jpeg', 'webp', 'avif')]
+        self.format_combo = ttk.Combobox(form_frame, values=formats, state='readonly', width=27)
+        self.format_combo.grid(row=0, column=1, pady=5)
+        self.format_combo.set(image_processor.output_format)
+        self.format_combo.bind('<<ComboboxSelected>>', lambda e: self._load_format_settings())
+        
+        # Kvalita a rychlost pro WebP/AVIF
+        ttk.Label(form_frame, text="Kvalita (1-100):").grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.quality_var = tk.IntVar()
+        self.quality_spin = ttk.Spinbox(form_frame, from_=1, to=100, textvariable=self.quality_var, width=28)
+        self.quality_spin.grid(row=1, column=1, pady=5)
+        
+        self.speed_label = ttk.Label(form_frame, text="Rychlost kodéru:")
+        self.speed_label.grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.speed_var = tk.IntVar()
+        self.speed_spin = ttk.Spinbox(form_frame, from_=0, to=10, textvariable=self.speed_var, width=28)
+        self.speed_spin.grid(row=2, column=1, pady=5)
+        
+        # JPEG záloha pro starší prohlížeče
+        self.fallback_var = tk.BooleanVar(value=image_processor.jpeg_fallback)
+        ttk.Checkbutton(form_frame, text="Nahrát i JPEG zálohu pro starší prohlížeče",
+                        variable=self.fallback_var).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        self._load_format_settings()
+        
+        # Tlačítka
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        ttk.Button(button_frame, text="Uložit", command=self._save).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Zrušit", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+    
+    def _load_format_settings(self):
+        """Načte kvalitu a rychlost pro vybraný formát"""
+        output_format = self.format_combo.get()
+        settings = self.image_processor.format_settings.get(output_format)
+        
+        if settings:
+            self.quality_var.set(settings['quality'])
+            self.speed_var.set(self.image_processor.get_format_speed(output_format))
+            self.speed_spin.config(to=6 if output_format == 'webp' else 10)
+            self.speed_label.config(text="Úsilí (0-6):" if output_format == 'webp' else "Rychlost (0-10):")
+            state = tk.NORMAL
+        else:
+            # JPEG používá kvalitu komprimace z nastavení
+            self.quality_var.set(self.image_processor.compress_quality)
+            state = tk.DISABLED
+        
+        self.quality_spin.config(state=state)
+        self.speed_spin.config(state=state)
+    
+    def _save(self):
+        """Uloží nastavení"""
+        output_format = self.format_combo.get()
+        
+        try:
+            quality = self.quality_var.get()
+            speed = self.speed_var.get()
+        except tk.TclError:
+            messagebox.showerror("Chyba", "Kvalita a rychlost musí být čísla")
+            return
+        
+        if not self.image_processor.set_output_format(output_format, self.fallback_var.get()):
+            messagebox.showerror("Chyba", f"Formát {output_format} není v této instalaci Pillow podporován")
+            return
+        
+        self.image_processor.set_format_settings(output_format, quality, speed)
+        self.result = output_format
+        self.destroy()
+
+
+class QualityModeDialog(tk.Toplevel):
+    """Dialog pro nastavení adaptivní kvality JPEG"""
+    
+    MODES = {
+        'fixed': "Pevná kvalita",
+        'target_size': "Cílová velikost souboru",
+        'ssim': "Minimální SSIM",
+    }
+    
+    def __init__(self, parent, image_processor: ImageProcessor):
+        super().__init__(parent)
+        
+        self.image_processor = image_processor
+        self.result = None
+        self.title("Adaptivní kvalita")
+        self.geometry("420x220")
+        self.transient(parent)
+        self.grab_set()
+        
+        form_frame = ttk.Frame(self, padding=20)
+        form_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(form_frame, text="Režim:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        self.mode_combo = ttk.Combobox(form_frame, values=list(self.MODES.values()),
+                                       state='readonly', width=27)
+        self.mode_combo.grid(row=0, column=1, pady=5)
+        self.mode_combo.set(self.MODES[image_processor.quality_mode])
+        
+        ttk.Label(form_frame, text="Cílová velikost (kB):").grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.target_var = tk.IntVar(value=image_processor.target_size_kb)
+        ttk.Spinbox(form_frame, from_=10, to=50000, textvariable=self.target_var,
+                    width=28).grid(row=1, column=1, pady=5)
+        
+        ttk.Label(form_frame, text="Minimální SSIM (0-1):").grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.ssim_var = tk.DoubleVar(value=image_processor.min_ssim)
+        ttk.Spinbox(form_frame, from_=0.5, to=0.999, increment=0.005, textvariable=self.ssim_var,
+                    width=28).grid(row=2, column=1, pady=5)
+        
+        # Tlačítka
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        ttk.Button(button_frame, text="Uložit", command=self._save).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Zrušit", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+    
+    def _save(self):
+        """Uloží nastavení"""
+        mode = next(key for key, label in self.MODES.items() if label == self.mode_combo.get())
+        
+        try:
+            target = self.target_var.get()
+            min_ssim = self.ssim_var.get()
+        except tk.TclError:
+            messagebox.showerror("Chyba", "Cílová velikost a SSIM musí být čísla")
+            return
+        
+        if not 0 < min_ssim < 1:
+            messagebox.showerror("Chyba", "SSIM musí být mezi 0 a 1")
+            return
+        
+        self.image_processor.set_quality_mode(mode, target, min_ssim)
+        self.result = self.MODES[mode]
+        self.destroy()
+
+
+class EncoderEffortDialog(tk.Toplevel):
+    """Dialog pro nastavení úsilí kodéru (fast / balanced / max) pro každou variantu"""
+    
+    VARIANTS = {'thumbnail': "Thumbnaily", 'compress': "Komprimované"}
+    PROGRESSIVE = {"podle úsilí": None, "ano": True, "ne": False}
+    
+    def __init__(self, parent, image_processor: ImageProcessor):
+        super().__init__(parent)
+        
+        self.image_processor = image_processor
+        self.result = None
+        self.title("Úsilí kodéru")
+        self.geometry("520x200")
+        self.transient(parent)
+        self.grab_set()
+        
+        form_frame = ttk.Frame(self, padding=20)
+        form_frame.pack(fill=tk.BOTH, expand=True)
+        
+        for column, text in enumerate(("", "Úsilí", "Progresivní JPEG", "Podvzorkování")):
+            ttk.Label(form_frame, text=text).grid(row=0, column=column, sticky=tk.W, padx=5, pady=5)
+        
+        self.widgets = {}
+        subsampling_names = {value: name for name, value in image_processor.SUBSAMPLING.items()}
+        for row, (variant, label) in enumerate(self.VARIANTS.items(), start=1):
+            settings = image_processor.encoder_settings[variant]
+            ttk.Label(form_frame, text=label).grid(row=row, column=0, sticky=tk.W, padx=5, pady=5)
+            
+            effort = ttk.Combobox(form_frame, values=list(image_processor.EFFORT_PRESETS),
+                                  state='readonly', width=10)
+            effort.set(settings['effort'])
+            effort.grid(row=row, column=1, padx=5, pady=5)
+            
+            progressive = ttk.Combobox(form_frame, values=list(self.PROGRESSIVE),
+                                       state='readonly', width=12)
+            progressive.set(next(name for name, value in self.PROGRESSIVE.items()
+                                 if value == settings['progressive']))
+            progressive.grid(row=row, column=2, padx=5, pady=5)
+            
+            subsampling = ttk.Combobox(form_frame, values=["podle úsilí"] + list(image_processor.SUBSAMPLING),
+                                       state='readonly', width=12)
+            subsampling.set(subsampling_names.get(settings['subsampling'], "podle úsilí"))
+            subsampling.grid(row=row, column=3, padx=5, pady=5)
+            
+            self.widgets[variant] = (effort, progressive, subsampling)
+        
+        # Tlačítka
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        ttk.Button(button_frame, text="Uložit", command=self._save).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Zrušit", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+    
+    def _save(self):
+        """Uloží nastavení"""
+        for variant, (effort, progressive, subsampling) in self.widgets.items():
+            subsampling_value = subsampling.get()
+            self.image_processor.set_encoder_effort(
+                variant,
+                effort.get(),
+                self.PROGRESSIVE[progressive.get()],
+                None if subsampling_value == "podle úsilí" else subsampling_value
+            )
+        
+        self.result = True
+        self.destroy()
+
+
+class MetadataDialog(tk.Toplevel):
+    """Dialog pro nastavení EXIF/ICC metadat a orientace komprimovaných fotek"""
+    
+    EXIF_POLICIES = {
+        'strip': "Odstranit",
+        'minimal': "Jen popis snímku (bez GPS)",
+        'keep': "Ponechat vše",
+    }
+    ORIENTATION_MODES = {
+        'rotate': "Otočit pixely",
+        'tag': "Ponechat EXIF Orientation",
+    }
+    
+    def __init__(self, parent, image_processor: ImageProcessor):
+        super().__init__(parent)
+        
+        self.image_processor = image_processor
+        self.result = None
+        self.title("Metadata a orientace")
+        self.geometry("440x200")
+        self.transient(parent)
+        self.grab_set()
+        
+        form_frame = ttk.Frame(self, padding=20)
+        form_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(form_frame, text="EXIF:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        self.exif_combo = ttk.Combobox(form_frame, values=list(self.EXIF_POLICIES.values()),
+                                       state='readonly', width=30)
+        self.exif_combo.grid(row=0, column=1, pady=5)
+        self.exif_combo.set(self.EXIF_POLICIES[image_processor.exif_policy])
+        
+        ttk.Label(form_frame, text="Orientace:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.orientation_combo = ttk.Combobox(form_frame, values=list(self.ORIENTATION_MODES.values()),
+                                              state='readonly', width=30)
+        self.orientation_combo.grid(row=1, column=1, pady=5)
+        self.orientation_combo.set(self.ORIENTATION_MODES[image_processor.orientation_mode])
+        
+        self.icc_var = tk.BooleanVar(value=image_processor.keep_icc)
+        ttk.Checkbutton(form_frame, text="Zachovat barevný profil (ICC)",
+                        variable=self.icc_var).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        # Tlačítka
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        ttk.Button(button_frame, text="Uložit", command=self._save).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Zrušit", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+    
+    def _save(self):
+        """Uloží nastavení"""
+        exif_policy = next(key for key, label in self.EXIF_POLICIES.items()
+                           if label == self.exif_combo.get())
+        orientation_mode = next(key for key, label in self.ORIENTATION_MODES.items()
+                                if label == self.orientation_combo.get())
+        
+        self.image_processor.set_metadata_policy(exif_policy, self.icc_var.get(), orientation_mode)
+        self.result = True
+        self.destroy()
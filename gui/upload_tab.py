@@ -1,29 +1,76 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import collections
 import os
+import posixpath
+import queue
 import threading
-from typing import List
+import time
+from typing import Iterable, List, Dict, Optional, Set
+from core.catalog import SiteCatalog
 from core.config_manager import FTPConfig
+from core.dedup import DuplicateDetector
+from core.file_scanner import FolderScanner
+from core.folder_watcher import FolderWatcher
 from core.ftp_handler import FTPHandler
 from core.image_processor import ImageProcessor
+from core.index_builder import build_index_php
+from core.metrics import TransferMetrics
+from core.perceptual_hash import PerceptualIndex
+from core.remote_gallery import group_photos, list_files
+from core.spool import VariantSpool
+from core.upload_index import UploadIndex
+from core.upload_scheduler import UploadScheduler
 
 
 class UploadTab(ttk.Frame):
     """Záložka pro nahrávání fotek na FTP"""
     
+    # Kolik zakódovaných fotek smí čekat na nahrání (komprimovaných verzí,
+    # thumbnailů - ty jsou malé, ale u tisíců fotek by se spool zaplnil také)
+    PIPELINE_DEPTH = 8
+    THUMBNAIL_PIPELINE_DEPTH = 64
+    
+    # Sledování složky: index.php se zveřejní, když fronta stojí tolik sekund,
+    # katalog webu nejvýše jednou za WATCH_CATALOG_INTERVAL sekund
+    WATCH_PUBLISH_DELAY = 2.0
+    WATCH_CATALOG_INTERVAL = 60.0
+    
     def __init__(self, parent, config_manager: FTPConfig, ftp_handler: FTPHandler, 
-                 image_processor: ImageProcessor, status_callback):
+                 image_processor: ImageProcessor, upload_index: UploadIndex, catalog: SiteCatalog,
+                 status_callback):
         super().__init__(parent)
         
         self.config_manager = config_manager
         self.ftp_handler = ftp_handler
         self.image_processor = image_processor
+        self.upload_index = upload_index
+        self.catalog = catalog
         self.status_callback = status_callback
         
+        # Volá se s názvem backendu, pokud konfigurace požaduje jiný FTP backend;
+        # vrací nový handler (nastavuje MainApplication)
+        self.backend_callback = None
+        
         self.source_folder = None
-        self.selected_images = []
+        self.selected_images = []  # Relativní cesty vůči source_folder (oddělovač '/')
         self.uploading = False
         
+        # Skenování zdrojové složky běží ve vlákně a plní seznam po dávkách
+        self.scanner = FolderScanner()
+        self.scanning = False
+        self.scan_id = 0
+        
+        # Sledování zdrojové složky - nové fotky se rovnou nahrávají
+        self.watcher = FolderWatcher()
+        self.watching = False
+        
+        # Metriky posledního běhu nahrávání
+        self.metrics = TransferMetrics()
+        
+        # Zakódované varianty čekající na nahrání (nad rozpočtem se odkládají na disk)
+        self.spool = VariantSpool()
+        
         self._create_widgets()
     
     def _create_widgets(self):
@@ -66,8 +113,19 @@ class UploadTab(ttk.Frame):
         source_frame = ttk.LabelFrame(self, text="3. Zdrojové fotky", padding=10)
         source_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        ttk.Button(source_frame, text="📂 Vybrat složku s fotkami", 
-                  command=self._select_source_folder).pack(anchor=tk.W, padx=5, pady=5)
+        source_buttons = ttk.Frame(source_frame)
+        source_buttons.pack(fill=tk.X)
+        
+        ttk.Button(source_buttons, text="📂 Vybrat složku s fotkami", 
+                  command=self._select_source_folder).pack(side=tk.LEFT, padx=5, pady=5)
+        
+        self.recursive_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(source_buttons, text="Včetně podsložek",
+                        variable=self.recursive_var).pack(side=tk.LEFT, padx=5, pady=5)
+        
+        self.watch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(source_buttons, text="👁 Sledovat složku a nahrávat nové fotky",
+                        variable=self.watch_var, command=self._toggle_watch).pack(side=tk.LEFT, padx=5, pady=5)
         
         self.source_label = ttk.Label(source_frame, text="Žádná složka nevybrána", foreground="gray")
         self.source_label.pack(anchor=tk.W, padx=5, pady=5)
@@ -108,6 +166,29 @@ class UploadTab(ttk.Frame):
                                               command=self._upload_universal_php, state=tk.DISABLED)
         self.upload_universal_btn.pack(side=tk.LEFT, padx=5, pady=5)
         
+        ttk.Button(upload_frame, text="📊 Exportovat metriky", 
+                  command=self._export_metrics).pack(side=tk.LEFT, padx=5, pady=5)
+        
+        # Omezení rychlosti (lze měnit i během nahrávání)
+        limit_frame = ttk.Frame(upload_frame)
+        limit_frame.pack(side=tk.RIGHT, padx=5)
+        
+        ttk.Label(limit_frame, text="Limit kB/s celkem:").pack(side=tk.LEFT)
+        self.global_limit_var = tk.IntVar(value=0)
+        global_spin = ttk.Spinbox(limit_frame, from_=0, to=1000000, increment=128, width=8,
+                                  textvariable=self.global_limit_var, command=self._apply_rate_limits)
+        global_spin.pack(side=tk.LEFT, padx=(2, 8))
+        
+        ttk.Label(limit_frame, text="na spojení:").pack(side=tk.LEFT)
+        self.connection_limit_var = tk.IntVar(value=0)
+        connection_spin = ttk.Spinbox(limit_frame, from_=0, to=1000000, increment=128, width=8,
+                                      textvariable=self.connection_limit_var, command=self._apply_rate_limits)
+        connection_spin.pack(side=tk.LEFT, padx=2)
+        
+        for spin in (global_spin, connection_spin):
+            spin.bind('<Return>', lambda e: self._apply_rate_limits())
+            spin.bind('<FocusOut>', lambda e: self._apply_rate_limits())
+        
         # Progress
         progress_container = ttk.Frame(self)
         progress_container.pack(fill=tk.X, padx=10, pady=5)
@@ -120,6 +201,9 @@ class UploadTab(ttk.Frame):
         
         self.progress_detail = ttk.Label(progress_container, text="", font=('Arial', 8), foreground="gray")
         self.progress_detail.pack(anchor=tk.W, padx=5, pady=2)
+        
+        self.metrics_label = ttk.Label(progress_container, text="", font=('Arial', 8), foreground="gray")
+        self.metrics_label.pack(anchor=tk.W, padx=5, pady=2)
     
     def _refresh_ftp_list(self):
         """Obnoví seznam FTP serverů"""
@@ -138,6 +222,10 @@ class UploadTab(ttk.Frame):
         config = self.config_manager.get_config(config_name)
         self.status_callback("Připojování k FTP...")
         
+        backend = config.get('backend', 'ftplib')
+        if self.backend_callback and backend != self.ftp_handler.backend:
+            self.ftp_handler = self.backend_callback(backend)
+        
         success, message = self.ftp_handler.connect(
             config['host'], 
             config['port'], 
@@ -146,6 +234,8 @@ class UploadTab(ttk.Frame):
         )
         
         if success:
+            self.upload_index.current_server = UploadIndex.server_key(config)
+            self.catalog.reset(self.ftp_handler.get_current_path())
             self.connection_status.config(text="● Připojeno", foreground="green")
             self.connect_btn.config(state=tk.DISABLED)
             self.disconnect_btn.config(state=tk.NORMAL)
@@ -159,7 +249,10 @@ class UploadTab(ttk.Frame):
     
     def _disconnect_ftp(self):
         """Odpojí se od FTP"""
+        self._stop_watch()
         self.ftp_handler.disconnect()
+        self.upload_index.current_server = ''
+        self.catalog.reset()
         self.connection_status.config(text="● Odpojeno", foreground="red")
         self.connect_btn.config(state=tk.NORMAL)
         self.disconnect_btn.config(state=tk.DISABLED)
@@ -202,23 +295,104 @@ class UploadTab(ttk.Frame):
             self._update_upload_button_state()
     
     def _scan_images(self):
-        """Naskenuje obrázky ve složce"""
+        """Naskenuje obrázky ve složce (ve vlákně, výsledky přichází po dávkách)"""
         if not self.source_folder:
             return
         
+        if not os.path.isdir(self.source_folder):
+            messagebox.showerror("Chyba", f"Složka neexistuje: {self.source_folder}")
+            return
+        
+        # Nový seznam - běžící nahrávání si drží referenci na ten starý
+        self._stop_watch()
         self.selected_images = []
         self.image_listbox.delete(0, tk.END)
+        self.scan_id += 1
+        scan_id = self.scan_id
+        images = self.selected_images
+        self.scanning = True
+        self.image_count_label.config(text="Skenuji...")
         
-        try:
-            for filename in os.listdir(self.source_folder):
-                if self.image_processor.is_image(filename):
-                    self.selected_images.append(filename)
-                    self.image_listbox.insert(tk.END, filename)
-            
-            count = len(self.selected_images)
-            self.image_count_label.config(text=f"{count} {'obrázek' if count == 1 else 'obrázků'}")
-        except Exception as e:
-            messagebox.showerror("Chyba", f"Chyba při načítání obrázků: {e}")
+        def on_batch(batch: List[str]):
+            # Seznam rozšiřujeme hned ve vlákně skeneru, aby je nahrávání vidělo co nejdřív
+            images.extend(batch)
+            self.after(0, lambda: self._add_scanned_images(scan_id, batch))
+        
+        def on_done(total: int):
+            self.after(0, lambda: self._scan_finished(scan_id))
+        
+        self.scanner.start(self.source_folder, on_batch, on_done, recursive=self.recursive_var.get())
+    
+    def _add_scanned_images(self, scan_id: int, batch: List[str]):
+        """Vloží dávku naskenovaných obrázků do seznamu (UI vlákno)"""
+        if scan_id != self.scan_id:
+            return
+        
+        self.image_listbox.insert(tk.END, *batch)
+        count = len(self.selected_images)
+        self.image_count_label.config(text=f"{count} {'obrázek' if count == 1 else 'obrázků'} (skenuji...)")
+        self._update_upload_button_state()
+    
+    def _scan_finished(self, scan_id: int):
+        """Dokončení skenování (UI vlákno)"""
+        if scan_id != self.scan_id:
+            return
+        
+        self.scanning = False
+        count = len(self.selected_images)
+        self.image_count_label.config(text=f"{count} {'obrázek' if count == 1 else 'obrázků'}")
+        self._update_upload_button_state()
+    
+    def _toggle_watch(self):
+        """Zapne/vypne sledování zdrojové složky (nové fotky se nahrají automaticky)"""
+        if not self.watch_var.get():
+            self._stop_watch()
+            return
+        
+        if not self.ftp_handler.connected or not self.source_folder:
+            messagebox.showwarning("Upozornění", "Nejprve se připojte k FTP a vyberte složku s fotkami")
+            self.watch_var.set(False)
+            return
+        if self.scanning:
+            messagebox.showwarning("Upozornění", "Počkejte na dokončení skenování složky")
+            self.watch_var.set(False)
+            return
+        
+        images = self.selected_images
+        
+        def on_batch(batch: List[str]):
+            # Stejně jako u skeneru se seznam rozšiřuje hned ve vlákně sledování
+            if images is not self.selected_images:
+                return
+            start = len(images)
+            images.extend(batch)
+            self.after(0, lambda: self._add_watched_images(start, batch))
+        
+        # Ohlásí se jen fotky, které ve složce ještě nejsou vybrané
+        self.watching = True
+        self.watcher.start(self.source_folder, on_batch, known=list(images),
+                           recursive=self.recursive_var.get())
+        self.status_callback(f"Sledování složky zapnuto ({self.watcher.backend})")
+        if not self.uploading:
+            self._start_upload(len(images))
+    
+    def _stop_watch(self):
+        """Vypne sledování; běžící nahrávání dokončí fotky, které už přibyly"""
+        if not self.watching:
+            return
+        self.watcher.stop()
+        self.watching = False
+        self.watch_var.set(False)
+        self.status_callback("Sledování složky vypnuto")
+    
+    def _add_watched_images(self, start: int, batch: List[str]):
+        """Nové fotky ze sledované složky (UI vlákno) - doplní seznam a případně spustí nahrávání"""
+        self.image_listbox.insert(tk.END, *batch)
+        count = len(self.selected_images)
+        self.image_count_label.config(text=f"{count} {'obrázek' if count == 1 else 'obrázků'} "
+                                           f"(sledování: +{len(batch)})")
+        if self.watching and not self.uploading:
+            self._start_upload(start)
     
     def _update_upload_button_state(self):
         """Aktualizuje stav tlačítka pro nahrávání"""
@@ -267,12 +441,10 @@ class UploadTab(ttk.Frame):
             with open(universal_php_path, 'rb') as f:
                 php_content = f.read()
             
-            # Ujisti se že jsme ve správné složce
-            self.ftp_handler.change_directory(current_path)
-            
             # Nahrát na FTP
             self.status_callback("Nahrávám universal_index.php...")
-            success, msg = self.ftp_handler.upload_bytes(php_content, "index.php")
+            success, msg = self.ftp_handler.upload_bytes(php_content, f"{current_path}/index.php",
+                                                         priority='interactive')
             
             if success:
                 messagebox.showinfo(
@@ -298,7 +470,7 @@ class UploadTab(ttk.Frame):
         current_path = self.ftp_handler.get_current_path()
         
         # Zkontroluj zda má složka strukturu
-        has_structure, found = self.ftp_handler.has_photo_structure()
+        has_structure, found = self.ftp_handler.has_photo_structure(current_path)
         
         if not has_structure:
             if not messagebox.askyesno(
@@ -322,19 +494,15 @@ class UploadTab(ttk.Frame):
         """Vlákno pro ruční generování index.php"""
         try:
             filenames = []
+            variants = None
             
             if has_structure:
-                # Načti z thumbnail složky
-                items = self.ftp_handler.list_directory(base_path + "/thumbnail")
-                for name, is_dir in items:
-                    if not is_dir and self.image_processor.is_image(name):
-                        filenames.append(name)
+                # Načti ze složek thumbnail/original/compress
+                filenames, variants = self._collect_remote_variants(base_path)
             else:
                 # Načti přímo ze složky
-                items = self.ftp_handler.list_directory(base_path)
-                for name, is_dir in items:
-                    if not is_dir and self.image_processor.is_image(name):
-                        filenames.append(name)
+                items = self.ftp_handler.list_directory(base_path).files()
+                filenames = [name for name in items.names() if self.image_processor.is_image(name)]
             
             if not filenames:
                 self.after(0, lambda: messagebox.showwarning(
@@ -344,12 +512,10 @@ class UploadTab(ttk.Frame):
                 self.after(0, lambda: self.status_callback("Žádné fotky k indexování"))
                 return
             
-            # Ujisti se že jsme ve správné složce
-            self.ftp_handler.change_directory(base_path)
-            
             # Generuj index.php
             self.after(0, lambda: self.status_callback(f"Generuji index.php pro {len(filenames)} fotek..."))
-            self._generate_index_php(base_path, filenames)
+            self._generate_index_php(base_path, filenames, variants)
+            self._refresh_catalog(base_path)
             
             self.after(0, lambda: messagebox.showinfo(
                 "Hotovo", 
@@ -364,9 +530,38 @@ class UploadTab(ttk.Frame):
             ))
             self.after(0, lambda: self.status_callback("Chyba při generování"))
     
-    def _start_upload(self):
-        """Zahájí nahrávání"""
-        if not self.ftp_handler.connected or not self.selected_images:
+    def _collect_remote_variants(self, base_path: str):
+        """
+        Sestaví seznam fotek a jejich variant (formátů) ze složek na FTP
+        Returns: (filenames, variants)
+        """
+        by_folder = {}
+        for folder in ('original', 'thumbnail', 'compress'):
+            # Včetně podsložek - klíčem fotky je relativní cesta (DCIM/100CANON/IMG_1.jpg)
+            by_folder[folder] = [name for name, facts in list_files(self.ftp_handler, f"{base_path}/{folder}")]
+        
+        # Jedna fotka = originál nebo thumbnail (samotná komprimovaná verze se nepočítá)
+        filenames = []
+        variants = {}
+        for filename, files in group_photos(by_folder).items():
+            if not files['original'] and not files['thumbnail']:
+                continue
+            filenames.append(filename)
+            variants[filename] = {'thumbnail': {}, 'compress': {}}
+            for folder in ('thumbnail', 'compress'):
+                # Moderní formáty první, aby byly primární variantou
+                for name in files[folder]:
+                    output_format = self.image_processor.format_from_filename(name)
+                    variants[filename][folder].setdefault(output_format, name)
+        
+        return filenames, variants
+    
+    def _start_upload(self, start: int = 0):
+        """
+        Zahájí nahrávání
+        start: index první fotky v seznamu (při sledování složky jen nově přibylé)
+        """
+        if not self.ftp_handler.connected or not (self.selected_images or self.watching):
             return
         
         self.uploading = True
@@ -374,119 +569,416 @@ class UploadTab(ttk.Frame):
         self.cancel_btn.config(state=tk.NORMAL)
         self.connect_btn.config(state=tk.DISABLED)
         
+        # Měření fází běží po celou dobu nahrávání
+        self.metrics.reset()
+        self.image_processor.metrics = self.metrics
+        self._refresh_metrics()
+        
         # Spusť v novém vlákně
-        thread = threading.Thread(target=self._upload_thread, daemon=True)
+        thread = threading.Thread(target=self._upload_thread, args=(start,), daemon=True)
         thread.start()
     
-    def _upload_thread(self):
-        """Vlákno pro nahrávání"""
+    def _upload_thread(self, start: int = 0):
+        """
+        Vlákno pro nahrávání
+        Kódování variant běží v samostatném vlákně (_encode_worker) a přenosy
+        předává přes prioritní frontu (UploadScheduler): nejdřív se nahrají
+        thumbnaily všech fotek a průběžný index.php, pak komprimované verze
+        a originály až nakonec, takže galerie je prohlížitelná brzy po startu.
+        Při sledování složky běží, dokud se sledování nevypne, a index.php
+        zveřejňuje po každé dávce (jakmile fronta na chvíli ztichne).
+        """
+        scheduler = UploadScheduler()
         try:
-            total = len(self.selected_images)
+            # Seznam se může ještě plnit, pokud skenování neskončilo
+            images = self.selected_images
+            source_folder = self.source_folder
+            total = len(images)
             current_path = self.ftp_handler.get_current_path()
             
-            # Vytvoř složky
-            self.ftp_handler.create_directory("thumbnail")
-            self.ftp_handler.create_directory("original")
-            self.ftp_handler.create_directory("compress")
+            # Vytvoř celý strom složek najednou (pro fotky, které už jsou v seznamu)
+            self._provision_remote_tree(current_path, {''} | {os.path.dirname(name) for name in images[start:]})
             
             uploaded_files = []
+            photo_variants = {}
+            incomplete = set()  # Fotky, které ještě nemají na serveru všechny varianty
+            uploaded = 0
+            skipped = 0
+            dependents = {}  # {fotka: její duplicity z této dávky, které se přeskočily}
+            orphaned = []  # Duplicity fotek, jejichž nahrání selhalo
+            done = 0  # Dokončené fotky (průběh)
+            changes = 0  # Změny obsahu index.php (nové thumbnaily, dokončené fotky)
+            published = 0  # Hodnota changes při posledním zveřejnění index.php
+            catalog_refreshed = time.monotonic()
+            
+            # Duplicity v dávce i vůči souborům, které už v cílové složce jsou
+            server = self.upload_index.current_server
+            gallery = self.upload_index.get_gallery(server, current_path)
+            self._validate_upload_index(current_path, gallery)
+            detector = DuplicateDetector(known=gallery)
+            
+            # Při sledování složky navazuje index.php na fotky, které už v galerii jsou
+            if self.watching:
+                for name, entry in gallery.items():
+                    uploaded_files.append(name)
+                    photo_variants[name] = entry.get('variants')
+            
+            self.spool.metrics = self.metrics
+            encoder = threading.Thread(target=self._encode_worker,
+                                       args=(images, source_folder, detector, scheduler, start), daemon=True)
+            encoder.start()
             
-            for i, filename in enumerate(self.selected_images):
-                if not self.uploading:  # Kontrola zrušení
+            while True:
+                try:
+                    task = scheduler.get(timeout=self.WATCH_PUBLISH_DELAY)
+                except queue.Empty:
+                    if not encoder.is_alive():
+                        # Kodér skončil, aniž frontu uzavřel - nečekej donekonečna,
+                        # dober zbytek a skonči (jinak by zůstalo zablokované UI)
+                        scheduler.close()
+                        continue
+                    # Sledování: fronta stojí - zveřejni, co se od posledního indexu změnilo
+                    if self.watching and self.uploading and changes > published:
+                        refresh_catalog = time.monotonic() - catalog_refreshed >= self.WATCH_CATALOG_INTERVAL
+                        self._publish_gallery(current_path, uploaded_files, photo_variants, incomplete,
+                                              refresh_catalog)
+                        if refresh_catalog:
+                            catalog_refreshed = time.monotonic()
+                        published = changes
+                        self.upload_index.save()
+                        self.status_callback(f"Sledování: zveřejněno {len(uploaded_files)} fotek")
+                    continue
+                if task is None:
                     break
+                self.metrics.set_queue_depth('encoded', scheduler.qsize())
                 
-                self._update_progress(i, total, f"Zpracovávám: {filename}")
+                kind = task['kind']
+                job = task.get('job')
+                if not self.uploading or (job and job['failed']):
+                    # Zrušeno (nebo fotka už selhala) - jen uvolni připravená data
+                    if job:
+                        self._release_job(job)
+                    continue
                 
-                local_path = os.path.join(self.source_folder, filename)
+                if kind == 'index':
+                    # Průběžný index se všemi dosud nahranými thumbnaily
+                    if changes > published:
+                        self._update_progress(done, len(images), "Zveřejňuji průběžný index.php...")
+                        self._publish_gallery(current_path, uploaded_files, photo_variants, incomplete,
+                                              refresh_catalog=False)
+                        published = changes
+                    continue
                 
+                filename = job['filename']
                 try:
-                    # 1. Thumbnail
-                    success, thumb_data, msg = self.image_processor.create_thumbnail(local_path)
-                    if success:
-                        thumb_path = f"thumbnail/{filename}"
-                        self.ftp_handler.upload_bytes(thumb_data, thumb_path)
+                    if task['error']:
+                        raise task['error']
                     
-                    # 2. Compress
-                    success, comp_data, msg = self.image_processor.compress_image(local_path)
-                    if success:
-                        comp_path = f"compress/{filename}"
-                        self.ftp_handler.upload_bytes(comp_data, comp_path)
+                    if kind == 'thumbnail':
+                        duplicate_of = job['duplicate_of']
+                        if duplicate_of:
+                            skipped += 1
+                            done += 1
+                            # Fotka už na serveru je - ponech ji v indexu galerie
+                            if duplicate_of in gallery and duplicate_of not in photo_variants:
+                                uploaded_files.append(duplicate_of)
+                                photo_variants[duplicate_of] = gallery[duplicate_of].get('variants')
+                                changes += 1
+                            elif duplicate_of not in gallery:
+                                dependents.setdefault(duplicate_of, []).append(filename)
+                            continue
+                        
+                        # Podsložky zachovávají strukturu zdroje (např. DCIM/100CANON)
+                        self._update_progress(done, len(images), f"Nahrávám náhled: {filename}")
+                        remote_dir = os.path.dirname(filename)
+                        if remote_dir:
+                            self._provision_remote_tree(current_path, [remote_dir])
+                        
+                        self._upload_variants(job, 'thumbnail', current_path)
+                        if filename not in photo_variants:
+                            uploaded_files.append(filename)
+                        photo_variants[filename] = job['uploaded']
+                        incomplete.add(filename)
+                        changes += 1
+                        continue
                     
-                    # 3. Original
-                    orig_path = f"original/{filename}"
-                    self.ftp_handler.upload_file(local_path, orig_path)
+                    if kind == 'compress':
+                        self._update_progress(done, len(images), f"Nahrávám komprimovanou verzi: {filename}")
+                        self._upload_variants(job, 'compress', current_path)
+                    else:
+                        self._update_progress(done, len(images), f"Nahrávám originál: {filename}")
+                        local_path = job['local_path']
+                        orig_path = f"{current_path}/original/{filename}"
+                        with self.metrics.stage('stor.original', os.path.getsize(local_path), 'ftp'):
+                            success, msg = self.ftp_handler.upload_file(local_path, orig_path)
+                        if not success:
+                            raise IOError(msg)
                     
-                    # Přidej do seznamu úspěšně nahraných
-                    uploaded_files.append(filename)
+                    # Fotka je kompletní, až jsou nahrané všechny její varianty
+                    job['remaining'].discard(kind)
+                    if not job['remaining']:
+                        fingerprint = job['fingerprint']
+                        if job['perceptual_hash'] is not None:
+                            fingerprint['phash'] = PerceptualIndex.to_hex(job['perceptual_hash'])
+                        self.upload_index.record(server, current_path, filename, fingerprint, job['uploaded'])
+                        incomplete.discard(filename)
+                        changes += 1
+                        uploaded += 1
+                        done += 1
+                        self.metrics.photo_done()
                     
                 except Exception as e:
+                    # Zbylé přenosy fotky se přeskočí a z indexu zmizí; další stejný
+                    # soubor už za duplikát neplatí (na serveru není)
+                    job['failed'] = True
+                    detector.forget(filename)
+                    lost = dependents.pop(filename, [])
+                    if lost:
+                        skipped -= len(lost)
+                        orphaned.extend(lost)
+                        print(f"Nenahráno (duplicity {filename}): {', '.join(lost)}")
+                    if filename in incomplete:
+                        incomplete.discard(filename)
+                        uploaded_files.remove(filename)
+                        del photo_variants[filename]
+                        changes += 1
+                    done += 1
+                    self.metrics.photo_done(False)
                     print(f"Chyba při nahrávání {filename}: {e}")
+                finally:
+                    if job['failed'] or not job['remaining']:
+                        self._release_job(job)
             
-            # Generuj index.php
+            total = len(images)
+            
+            # Generuj index.php a aktualizuj katalog (bez fotek, které nestihly všechny varianty)
+            uploaded_files = [name for name in uploaded_files if name not in incomplete]
             if uploaded_files:
-                self._update_progress(total, total, "Generuji index.php...")
-                self._generate_index_php(current_path, uploaded_files)
+                self._update_progress(total, total, "Generuji index.php a katalog galerií...")
+                self._publish_gallery(current_path, uploaded_files, photo_variants)
             
             # Dokončeno
             self._update_progress(total, total, "Nahrávání dokončeno!")
-            self.after(100, lambda: messagebox.showinfo("Hotovo", f"Nahráno {total} obrázků"))
+            summary = f"Nahráno {uploaded} z {total - start} obrázků"
+            if skipped:
+                summary += f"\nPřeskočeno duplicit: {skipped}"
+            if orphaned:
+                summary += f"\nNenahrané duplicity neúspěšných fotek: {len(orphaned)} (nahrajte znovu)"
+            self.after(100, lambda: messagebox.showinfo("Hotovo", summary))
             
         except Exception as e:
             self.after(100, lambda: messagebox.showerror("Chyba", f"Chyba při nahrávání: {e}"))
         
         finally:
             self.uploading = False
+            # Kodér se zastaví; uvolni, co stihl připravit
+            scheduler.close()
+            for task in scheduler.drain():
+                if task.get('job'):
+                    self._release_job(task['job'])
+            self.metrics.finish()
+            self.image_processor.metrics = None
+            self.spool.metrics = None
+            self.upload_index.save()
             self.after(100, self._reset_upload_ui)
     
-    def _generate_index_php(self, base_path: str, filenames: List[str]):
-        """Generuje index.php soubor s cestami k fotkám"""
+    def _upload_variants(self, job: dict, folder: str, base_path: str):
+        """
+        Nahraje zakódované varianty fotky do složky folder (ze spoolu, bez kopie)
+        Do job['uploaded'] (a tím do index.php) se dostanou jen úspěšně nahrané.
+        Raises: IOError, pokud se nahrání nepodařilo
+        """
+        for variant_folder, output_format, name, spooled in job['variants']:
+            if variant_folder != folder:
+                continue
+            with self.metrics.stage(f'stor.{folder}', spooled.size, 'ftp'):
+                success, msg = self.ftp_handler.upload_bytes(spooled.data, f"{base_path}/{folder}/{name}")
+            if not success:
+                raise IOError(msg)
+            spooled.release()
+            job['uploaded'][folder][output_format] = name
+    
+    def _encode_worker(self, images: List[str], source_folder: str,
+                       detector: DuplicateDetector, scheduler: UploadScheduler, start: int = 0):
+        """
+        Vlákno kódování ve dvou průchodech. Pro každou fotku od indexu start
+        ověří duplicitu, zakóduje thumbnail a zařadí ho (spolu s originálem
+        s nejnižší prioritou). Komprimované verze kóduje, až když jsou zařazené
+        thumbnaily všech známých fotek; nově přibylé fotky mají vždy přednost.
+        Na konci frontu uzavře.
+        """
+        to_compress = collections.deque()
         try:
-            # Ujisti se že jsme ve správné složce (base_path)
-            current = self.ftp_handler.get_current_path()
-            if current != base_path:
-                self.ftp_handler.change_directory(base_path)
-            
-            # Vytvoř PHP kód
-            php_code = "<?php\n"
-            php_code += "// Auto-generated photo index\n"
-            php_code += "// Generated by FTP Photo Manager\n\n"
-            php_code += "// Get base URL\n"
-            php_code += "$protocol = (!empty($_SERVER['HTTPS']) && $_SERVER['HTTPS'] !== 'off') ? 'https://' : 'http://';\n"
-            php_code += "$host = $_SERVER['HTTP_HOST'];\n"
-            php_code += "$scriptPath = dirname($_SERVER['SCRIPT_NAME']);\n"
-            php_code += "$scriptPath = rtrim($scriptPath, '/') . '/';\n"
-            php_code += "$baseUrl = $protocol . $host . $scriptPath;\n\n"
-            php_code += "$photos = [\n"
-            
-            for filename in filenames:
-                # Escapuj uvozovky v názvu souboru
-                safe_filename = filename.replace("'", "\\'")
+            i = start
+            new_thumbnails = 0
+            while self.uploading:  # Kontrola zrušení
+                if i < len(images):
+                    # Během průchodu thumbnailů se nezačíná žádný velký přenos
+                    scheduler.hold(UploadScheduler.COMPRESS)
+                    if not scheduler.wait_below(UploadScheduler.THUMBNAIL, self.THUMBNAIL_PIPELINE_DEPTH, timeout=0.2):
+                        continue
+                    filename = images[i]
+                    i += 1
+                    self.metrics.set_queue_depth('pending', len(images) - i)
+                    
+                    job = {
+                        'filename': filename,
+                        'local_path': os.path.join(source_folder, *filename.split('/')),
+                        'duplicate_of': None,
+                        'variants': [],  # (složka, formát, název, SpooledVariant)
+                        'uploaded': {'thumbnail': {}, 'compress': {}},  # {složka: {formát: název}}
+                        'remaining': {'compress', 'original'},
+                        'perceptual_hash': None,
+                        'fingerprint': None,
+                        'failed': False,
+                    }
+                    
+                    error = None
+                    try:
+                        job['duplicate_of'] = detector.check(job['local_path'], filename)
+                        if not job['duplicate_of']:
+                            self._encode_variants(job, 'thumbnail')
+                            job['fingerprint'] = detector.fingerprint(filename)
+                    except Exception as e:
+                        error = e
+                    
+                    scheduler.put(UploadScheduler.THUMBNAIL, {'kind': 'thumbnail', 'job': job, 'error': error})
+                    if not error and not job['duplicate_of']:
+                        scheduler.put(UploadScheduler.ORIGINAL, {'kind': 'original', 'job': job, 'error': None})
+                        to_compress.append(job)
+                        new_thumbnails += 1
+                    continue
                 
-                php_code += "    [\n"
-                php_code += f"        'thumbnail' => 'thumbnail/{safe_filename}',\n"
-                php_code += f"        'thumbnail_url' => $baseUrl . 'thumbnail/{safe_filename}',\n"
-                php_code += f"        'original' => 'original/{safe_filename}',\n"
-                php_code += f"        'original_url' => $baseUrl . 'original/{safe_filename}',\n"
-                php_code += f"        'compress' => 'compress/{safe_filename}',\n"
-                php_code += f"        'compress_url' => $baseUrl . 'compress/{safe_filename}',\n"
-                php_code += f"        'filename' => '{safe_filename}'\n"
-                php_code += "    ],\n"
-            
-            php_code += "];\n\n"
-            php_code += "$result = [\n"
-            php_code += "    'success' => true,\n"
-            php_code += "    'count' => count($photos),\n"
-            php_code += "    'base_url' => $baseUrl,\n"
-            php_code += "    'photos' => $photos\n"
-            php_code += "];\n\n"
-            php_code += "// Return JSON\n"
-            php_code += "header('Content-Type: application/json');\n"
-            php_code += "echo json_encode($result, JSON_UNESCAPED_SLASHES | JSON_PRETTY_PRINT);\n"
-            php_code += "?>"
+                # Thumbnaily všech známých fotek jsou zařazené - průběžný index
+                if new_thumbnails:
+                    scheduler.put(UploadScheduler.INDEX, {'kind': 'index'})
+                    new_thumbnails = 0
+                scheduler.release()
+                
+                if to_compress:
+                    # Ve spoolu smí čekat nejvýše PIPELINE_DEPTH komprimovaných verzí
+                    if not scheduler.wait_below(UploadScheduler.COMPRESS, self.PIPELINE_DEPTH, timeout=0.2):
+                        continue
+                    job = to_compress.popleft()
+                    error = None
+                    try:
+                        self._encode_variants(job, 'compress')
+                    except Exception as e:
+                        error = e
+                    scheduler.put(UploadScheduler.COMPRESS, {'kind': 'compress', 'job': job, 'error': error})
+                    continue
+                
+                if (self.scanning or self.watching) and images is self.selected_images:
+                    # Počkej na další dávku ze skeneru nebo ze sledované složky
+                    time.sleep(0.1)
+                    continue
+                break
+        finally:
+            scheduler.close()
+    
+    def _encode_variants(self, job: dict, folder: str):
+        """Zakóduje thumbnail nebo komprimovanou verzi fotky ve všech výstupních formátech"""
+        filename = job['filename']
+        local_path = job['local_path']
+        
+        # Primární formát + případná JPEG záloha (stejné pro obě varianty)
+        if 'formats' not in job:
+            job['formats'] = self.image_processor.get_output_formats(local_path)
+        
+        if folder == 'thumbnail':
+            # Perceptuální hash se počítá ze zmenšeného obrázku
+            for output_format in job['formats']:
+                success, thumb_data, thumb_hash, msg = self.image_processor.create_thumbnail_with_hash(
+                    local_path, output_format)
+                if success:
+                    if job['perceptual_hash'] is None:
+                        job['perceptual_hash'] = thumb_hash
+                    thumb_name = self.image_processor.output_filename(filename, output_format)
+                    job['variants'].append(('thumbnail', output_format, thumb_name, self.spool.store(thumb_data)))
+            return
+        
+        for output_format in job['formats']:
+            # U PNG může vyhrát jiný formát než požadovaný
+            success, comp_data, output_format, msg = self.image_processor.compress_variant(
+                local_path, output_format)
+            if success:
+                comp_name = self.image_processor.output_filename(filename, output_format)
+                job['variants'].append(('compress', output_format, comp_name, self.spool.store(comp_data)))
+    
+    @staticmethod
+    def _release_job(job: dict):
+        """Uvolní data variant fotky (paměť / dočasné soubory)"""
+        for folder, output_format, name, spooled in job['variants']:
+            spooled.release()
+    
+    def _validate_upload_index(self, base_path: str, gallery: Dict[str, dict]):
+        """
+        Vyřadí z indexu soubory, které mezitím ze serveru zmizely
+        Složka, jejíž výpis selže, se neověřuje (přechodná chyba LIST by jinak
+        vyřadila celou galerii a vše by se nahrálo znovu) - ledaže ve výpisu
+        nadřazené složky opravdu chybí.
+        """
+        if not gallery:
+            return
+        
+        remote_dirs = {}
+        for filename in list(gallery):
+            relative_dir = os.path.dirname(filename)
+            if relative_dir not in remote_dirs:
+                folder = f"{base_path}/original/{relative_dir}" if relative_dir else f"{base_path}/original"
+                remote_dirs[relative_dir] = self._remote_file_names(folder)
+            names = remote_dirs[relative_dir]
+            if names is not None and os.path.basename(filename) not in names:
+                del gallery[filename]
+    
+    def _remote_file_names(self, folder: str) -> Optional[Set[str]]:
+        """
+        Názvy souborů ve vzdálené složce; prázdná množina, pokud složka neexistuje
+        Returns: None, pokud se to nepodařilo zjistit
+        """
+        try:
+            return {name for name, facts in self.ftp_handler.fetch_entries(folder) if facts.get('type') == 'file'}
+        except Exception as e:
+            parent, name = posixpath.split(folder.rstrip('/'))
+            try:
+                entries = self.ftp_handler.fetch_entries(parent)
+            except Exception:
+                print(f"Index nahraných souborů: {folder} nelze ověřit ({e})")
+                return None
+            if any(entry == name for entry, facts in entries):
+                print(f"Index nahraných souborů: {folder} nelze ověřit ({e})")
+                return None
+            return set()
+    
+    def _provision_remote_tree(self, base_path: str, relative_dirs: Iterable[str]):
+        """
+        Vytvoří v base_path thumbnail/original/compress a v nich podsložky relative_dirs
+        Složky potvrzené dříve (dir_cache handleru) nestojí žádný příkaz.
+        """
+        paths = [f"{base_path}/{folder}/{relative_dir}" if relative_dir else f"{base_path}/{folder}"
+                 for folder in ('thumbnail', 'original', 'compress')
+                 for relative_dir in relative_dirs]
+        success, message = self.ftp_handler.makedirs(paths)
+        if not success:
+            print(f"Chyba při vytváření složek: {message}")
+    
+    def _generate_index_php(self, base_path: str, filenames: List[str],
+                            variants: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None,
+                            pending: Optional[Set[str]] = None):
+        """
+        Generuje index.php soubor s cestami k fotkám
+        variants: {filename: {'thumbnail'|'compress': {formát: název souboru}}},
+            první formát je primární; bez variant mají všechny složky stejný název
+        pending: fotky, které ještě nemají nahrané všechny varianty (průběžný index)
+        """
+        try:
+            # Vytvoř PHP kód
+            php_code = build_index_php(filenames, variants, pending)
             
-            # Nahrát na FTP do aktuální složky (která je base_path)
+            # Nahrát na FTP do base_path (absolutní cesta, aktuální složka se nemění)
             php_bytes = php_code.encode('utf-8')
-            success, msg = self.ftp_handler.upload_bytes(php_bytes, "index.php")
+            success, msg = self.ftp_handler.upload_bytes(php_bytes, f"{base_path}/index.php",
+                                                         priority='interactive')
             
             if success:
                 print(f"index.php vygenerován a nahrán do {base_path}")
@@ -496,6 +988,24 @@ class UploadTab(ttk.Frame):
         except Exception as e:
             print(f"Chyba při generování index.php: {e}")
     
+    def _publish_gallery(self, base_path: str, filenames: List[str],
+                         variants: Dict[str, Dict[str, Dict[str, str]]],
+                         pending: Optional[Set[str]] = None, refresh_catalog: bool = True):
+        """Zveřejní index.php galerie a (volitelně) aktualizuje katalog webu"""
+        with self.metrics.stage('index', connection='ftp'):
+            self._generate_index_php(base_path, filenames, variants, pending)
+        if refresh_catalog:
+            with self.metrics.stage('catalog', connection='ftp'):
+                self._refresh_catalog(base_path)
+    
+    def _refresh_catalog(self, base_path: str):
+        """Aktualizuje v katalogu webu jen galerii base_path"""
+        success, msg = self.catalog.refresh(self.ftp_handler, base_path)
+        if success:
+            print(f"Katalog galerií aktualizován ({self.catalog.remote_path})")
+        else:
+            print(f"Chyba při aktualizaci katalogu: {msg}")
+    
     def _update_progress(self, current: int, total: int, message: str):
         """Aktualizuje progress bar"""
         def update():
@@ -507,15 +1017,63 @@ class UploadTab(ttk.Frame):
         
         self.after(0, update)
     
+    def _apply_rate_limits(self):
+        """Nastaví omezení rychlosti podle spinboxů (0 = bez omezení)"""
+        if not self.ftp_handler.rate_limiter:
+            return
+        try:
+            global_limit = max(self.global_limit_var.get(), 0)
+            connection_limit = max(self.connection_limit_var.get(), 0)
+        except tk.TclError:
+            return
+        self.ftp_handler.rate_limiter.set_limits(global_limit * 1024, connection_limit * 1024)
+        if global_limit or connection_limit:
+            self.status_callback(f"Omezení rychlosti: celkem {global_limit or '-'} kB/s, "
+                                 f"na spojení {connection_limit or '-'} kB/s")
+        else:
+            self.status_callback("Omezení rychlosti vypnuto")
+    
+    def _refresh_metrics(self):
+        """Průběžně zobrazuje metriky během nahrávání"""
+        self.metrics_label.config(text=self.metrics.summary())
+        if self.uploading:
+            self.after(500, self._refresh_metrics)
+    
+    def _export_metrics(self):
+        """Uloží report posledního běhu jako JSON nebo CSV"""
+        if not self.metrics.stages:
+            messagebox.showwarning("Upozornění", "Zatím nejsou žádné metriky (nejprve nahrajte fotky)")
+            return
+        
+        path = filedialog.asksaveasfilename(
+            title="Exportovat metriky",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")]
+        )
+        if not path:
+            return
+        
+        if path.lower().endswith('.csv'):
+            success, message = self.metrics.export_csv(path)
+        else:
+            success, message = self.metrics.export_json(path)
+        
+        if success:
+            self.status_callback(f"{message}: {path}")
+        else:
+            messagebox.showerror("Chyba", message)
+    
     def _cancel_upload(self):
         """Zruší nahrávání"""
         if messagebox.askyesno("Zrušit", "Opravdu zrušit nahrávání?"):
+            self._stop_watch()
             self.uploading = False
     
     def _reset_upload_ui(self):
         """Resetuje UI po nahrávání"""
         self.cancel_btn.config(state=tk.DISABLED)
         self.connect_btn.config(state=tk.NORMAL)
+        self.metrics_label.config(text=self.metrics.summary())
         self._update_upload_button_state()
 
 
@@ -570,11 +1128,8 @@ class FTPBrowserDialog(tk.Toplevel):
     def _refresh_list(self):
         """Obnoví seznam složek"""
         self.folder_listbox.delete(0, tk.END)
-        items = self.ftp_handler.list_directory()
-        
-        for name, is_dir in items:
-            if is_dir:
-                self.folder_listbox.insert(tk.END, f"📁 {name}")
+        for entry in self.ftp_handler.list_directory().dirs():
+            self.folder_listbox.insert(tk.END, f"📁 {entry.name}")
         
         self.current_path = self.ftp_handler.get_current_path()
         self.current_path_label.config(text=self.current_path)
@@ -11,42 +11,88 @@ header('Access-Control-Allow-Origin: *');
 $folders = ['thumbnail', 'original', 'compress'];
 
 // Podporované formáty obrázků
-$imageExtensions = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp'];
+$imageExtensions = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 'avif'];
+
+// Moderní formáty mají přednost jako primární varianta (ostatní jsou záloha)
+$preferredExtensions = ['avif', 'webp'];
 
 /**
- * Získá všechny obrázky ve složce
+ * Získá všechny obrázky ve složce včetně podsložek (např. DCIM/100CANON)
+ * Vrací relativní cesty vůči $folderPath
  */
-function getImagesInFolder($folderPath) {
+function getImagesInFolder($folderPath, $relativeDir = '') {
     global $imageExtensions;
     $images = [];
+    $path = $relativeDir === '' ? $folderPath : $folderPath . '/' . $relativeDir;
     
-    if (!is_dir($folderPath)) {
+    if (!is_dir($path)) {
         return $images;
     }
     
-    $files = scandir($folderPath);
+    $files = scandir($path);
     
     foreach ($files as $file) {
-        if ($file === '.' || $file === '..') {
+        // Skryté soubory a složky (i rozpracované .název.part) přeskoč
+        if ($file[0] === '.') {
             continue;
         }
         
-        $filePath = $folderPath . '/' . $file;
+        $relative = $relativeDir === '' ? $file : $relativeDir . '/' . $file;
+        $filePath = $folderPath . '/' . $relative;
         
-        // Pouze soubory, ne složky
-        if (is_file($filePath)) {
+        if (is_dir($filePath)) {
+            // Symbolické odkazy na složky nesledujeme (možné smyčky)
+            if (!is_link($filePath)) {
+                $images = array_merge($images, getImagesInFolder($folderPath, $relative));
+            }
+        } elseif (is_file($filePath)) {
             $extension = strtolower(pathinfo($file, PATHINFO_EXTENSION));
             
             if (in_array($extension, $imageExtensions)) {
-                $images[] = $file;
+                $images[] = $relative;
             }
         }
     }
     
-    sort($images);
+    if ($relativeDir === '') {
+        sort($images);
+    }
     return $images;
 }
 
+/**
+ * Seskupí soubory podle názvu bez přípony (foto.webp + foto.jpg = jedna fotka)
+ * Vrací [stem => [přípona => soubor]], moderní formáty jsou první
+ */
+function groupByStem($files) {
+    global $preferredExtensions;
+    $groups = [];
+    
+    foreach ($files as $file) {
+        // Klíčem je relativní cesta bez přípony (stejné názvy v různých podsložkách se nemíchají)
+        $directory = pathinfo($file, PATHINFO_DIRNAME);
+        $stem = ($directory === '.' ? '' : $directory . '/') . pathinfo($file, PATHINFO_FILENAME);
+        $extension = strtolower(pathinfo($file, PATHINFO_EXTENSION));
+        if ($extension === 'jpg') {
+            $extension = 'jpeg';
+        }
+        $groups[$stem][$extension] = $file;
+    }
+    
+    foreach ($groups as $stem => $variants) {
+        uksort($variants, function ($a, $b) use ($preferredExtensions) {
+            $pa = array_search($a, $preferredExtensions);
+            $pb = array_search($b, $preferredExtensions);
+            $pa = $pa === false ? count($preferredExtensions) : $pa;
+            $pb = $pb === false ? count($preferredExtensions) : $pb;
+            return $pa - $pb;
+        });
+        $groups[$stem] = $variants;
+    }
+    
+    return $groups;
+}
+
 /**
  * Získá base URL (protokol + doména + cesta ke složce)
  */
@@ -110,28 +156,47 @@ function buildPhotoArray() {
         ];
     }
     
+    // Varianty ve všech složkách seskupené podle názvu bez přípony
+    $groups = [];
+    foreach ($folders as $folder) {
+        $groups[$folder] = $folderExists[$folder] ? groupByStem(getImagesInFolder($folder)) : [];
+    }
+    
     // Sestav pole fotek
     $photos = [];
     
-    foreach ($allFiles as $filename) {
+    foreach (groupByStem($allFiles) as $stem => $referenceVariants) {
         $photo = [];
         
         // Pro každou složku zkontroluj zda soubor existuje a vytvoř plnou URL
         foreach ($folders as $folder) {
-            $filePath = $folder . '/' . $filename;
+            $variants = isset($groups[$folder][$stem]) ? $groups[$folder][$stem] : [];
             
-            if (file_exists($filePath)) {
+            if (!empty($variants)) {
+                $filePath = $folder . '/' . reset($variants);
                 // Relativní cesta
                 $photo[$folder] = $filePath;
                 // Plná URL
                 $photo[$folder . '_url'] = $baseUrl . $filePath;
+                
+                // Více formátů (např. WebP + JPEG záloha)
+                if (count($variants) > 1) {
+                    $photo[$folder . '_formats'] = [];
+                    foreach ($variants as $format => $file) {
+                        $photo[$folder . '_formats'][$format] = $baseUrl . $folder . '/' . $file;
+                    }
+                }
             } else {
                 $photo[$folder] = null;
                 $photo[$folder . '_url'] = null;
             }
         }
         
-        // Přidej metadata
+        // Přidej metadata (název originálu, pokud existuje)
+        $filename = reset($referenceVariants);
+        if (isset($groups['original'][$stem])) {
+            $filename = reset($groups['original'][$stem]);
+        }
         $photo['filename'] = $filename;
         
         // Získej velikost souboru z první dostupné verze